@@ -4,7 +4,7 @@ Main Flask Application
 
 from flask import Flask, jsonify
 from flask_cors import CORS
-from flask_jwt_extended import JWTManager
+from flask_jwt_extended import JWTManager, jwt_required
 from config import config
 import os
 
@@ -24,6 +24,34 @@ def create_app(config_name='development'):
     CORS(app, origins=app.config['CORS_ORIGINS'])
     jwt = JWTManager(app)
     
+    # Shared MongoDB client (one connection pool per process)
+    from pymongo.errors import PyMongoError
+    from models.mongo_models import init_mongo, Payment
+    init_mongo(app)
+    
+    # Idempotent: only creates registry indexes that are missing
+    if app.config['MONGO_ENSURE_INDEXES']:
+        from models.indexes import ensure_indexes
+        try:
+            created = [e for e in ensure_indexes() if e['action'] == 'created']
+            if created:
+                app.logger.info('Created %d MongoDB indexes', len(created))
+        except PyMongoError as e:
+            app.logger.warning('Index reconciliation skipped: %s', e)
+    
+    # Payments stored before payment_dt / year_month existed sort and bucket
+    # wrongly until backfilled; a no-op once migrate-payment-dates has run
+    try:
+        result = Payment.migrate_dates()
+        if result['updated']:
+            app.logger.info('Backfilled payment dates on %d payments', result['updated'])
+    except PyMongoError as e:
+        app.logger.warning('Payment date backfill skipped: %s', e)
+    
+    # Maintenance CLI commands
+    from commands import register_commands
+    register_commands(app)
+    
     # Register blueprints
     from routes.auth import auth_bp
     from routes.ml_predictions import ml_bp
@@ -31,6 +59,7 @@ def create_app(config_name='development'):
     from routes.complaints import complaints_bp
     from routes.payments import payments_bp
     from routes.analytics import analytics_bp
+    from routes.dashboard import dashboard_bp
     
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     app.register_blueprint(ml_bp, url_prefix='/api')
@@ -38,6 +67,7 @@ def create_app(config_name='development'):
     app.register_blueprint(complaints_bp, url_prefix='/api/complaints')
     app.register_blueprint(payments_bp, url_prefix='/api/payments')
     app.register_blueprint(analytics_bp, url_prefix='/api/analytics')
+    app.register_blueprint(dashboard_bp, url_prefix='/api/dashboard')
     
     # Health check endpoint
     @app.route('/api/health', methods=['GET'])
@@ -47,6 +77,28 @@ def create_app(config_name='development'):
             'message': 'Apartment Management System API is running'
         }), 200
     
+    # Connection pool / cache statistics for capacity planning (Admin only)
+    @app.route('/api/health/stats', methods=['GET'])
+    @jwt_required()
+    def health_stats():
+        from models.mysql_models import get_mysql_pool_stats, get_user_cache_stats
+        from utils.password_hasher import password_hasher
+        from utils.response_cache import response_cache
+        from utils.identity import get_current_identity
+        
+        if get_current_identity()['role'] != 'Admin':
+            return jsonify({
+                'error': 'Access denied',
+                'message': 'Only Admin can view service statistics'
+            }), 403
+        
+        return jsonify({
+            'mysql_pool': get_mysql_pool_stats(),
+            'user_cache': get_user_cache_stats(),
+            'password_hasher': password_hasher.get_stats(),
+            'response_cache': response_cache.get_stats()
+        }), 200
+    
     # Error handlers
     @app.errorhandler(404)
     def not_found(error):
@@ -78,6 +130,18 @@ def create_app(config_name='development'):
             'message': 'Please login to access this resource'
         }), 401
     
+    # Every protected request checks the (cached) users row, so deleted or
+    # deactivated accounts are refused even with an unexpired token
+    from utils.identity import load_token_user
+    jwt.user_lookup_loader(load_token_user)
+    
+    @jwt.user_lookup_error_loader
+    def user_lookup_error_callback(jwt_header, jwt_payload):
+        return jsonify({
+            'error': 'User not found',
+            'message': 'This account is inactive or no longer exists'
+        }), 401
+    
     return app
 
 
@@ -0,0 +1,77 @@
+"""
+CLI Commands
+Maintenance jobs run with `flask --app app <command>` from the backend directory
+"""
+
+import click
+from models.mongo_models import DashboardCounters, DefaulterTally, Payment
+from models.indexes import ensure_indexes, check_query_plans
+
+
+def register_commands(app):
+    """Attach maintenance commands to the app's CLI"""
+    
+    @app.cli.command('rebuild-counters')
+    @click.option('--dry-run', is_flag=True, help='Report drift without writing')
+    def rebuild_counters(dry_run):
+        """Rebuild dashboard counters and defaulter tallies, reporting drift"""
+        drift = DashboardCounters.rebuild(dry_run=dry_run)
+        
+        for entry in drift:
+            click.echo(f"{entry['scope']:<24} {entry['path']:<40} "
+                       f"stored={entry['stored']} actual={entry['actual']}")
+        
+        scopes = len({entry['scope'] for entry in drift})
+        click.echo(f"{len(drift)} drifted counters across {scopes} scopes"
+                   + (' (dry run, nothing written)' if dry_run else ' (rebuilt)'))
+        
+        # Overdue tally behind the defaulters leaderboards
+        tally_drift = DefaulterTally.rebuild(dry_run=dry_run)
+        for entry in tally_drift:
+            click.echo(f"defaulters:{entry['tenant_id']:<15} {entry['field']:<40} "
+                       f"stored={entry['stored']} actual={entry['actual']}")
+        click.echo(f"{len(tally_drift)} drifted defaulter tallies"
+                   + (' (dry run, nothing written)' if dry_run else ' (rebuilt)'))
+    
+    @app.cli.command('migrate-payment-dates')
+    @click.option('--batch-size', default=1000, show_default=True)
+    def migrate_payment_dates(batch_size):
+        """Backfill payment_dt / year_month from the payment_date strings"""
+        result = Payment.migrate_dates(batch_size=batch_size)
+        
+        click.echo(f"{result['updated']} payments updated")
+        if result['unparseable']:
+            click.echo(f"{len(result['unparseable'])} payments with unparseable payment_date: "
+                       + ', '.join(str(p) for p in result['unparseable'][:20])
+                       + (' ...' if len(result['unparseable']) > 20 else ''))
+    
+    @app.cli.command('ensure-indexes')
+    @click.option('--prune', is_flag=True, help='Drop undeclared indexes and rebuild conflicting ones')
+    @click.option('--dry-run', is_flag=True, help='Report changes without writing')
+    def ensure_indexes_command(prune, dry_run):
+        """Reconcile MongoDB indexes with the registry in models/indexes.py"""
+        report = ensure_indexes(prune=prune, dry_run=dry_run)
+        
+        for entry in report:
+            if entry['action'] != 'exists':
+                click.echo(f"{entry['action']:<11} {entry['collection']}.{entry['index']}")
+        
+        changed = sum(1 for entry in report if entry['action'] in ('created', 'rebuilt', 'dropped'))
+        pending = sum(1 for entry in report if entry['action'] in ('conflict', 'undeclared'))
+        click.echo(f"{changed} index changes, {pending} needing --prune"
+                   + (' (dry run, nothing written)' if dry_run else ''))
+    
+    @app.cli.command('check-query-plans')
+    def check_query_plans_command():
+        """Explain each route query shape; exits 1 on a COLLSCAN or an in-memory SORT"""
+        results = check_query_plans()
+        
+        for result in results:
+            verdict = 'COLLSCAN' if result['collscan'] else 'SORT' if result['blocking_sort'] else 'ok'
+            click.echo(f"{verdict:<9} {result['collection']:<16} "
+                       f"{result['name']:<32} {result['index'] or '-'}  ({' <- '.join(result['stages'])})")
+        
+        failed = [result['name'] for result in results if not result['ok']]
+        click.echo(f"{len(results) - len(failed)}/{len(results)} query shapes served in index order")
+        if failed:
+            raise SystemExit(1)
@@ -19,16 +19,78 @@ class Config:
     MYSQL_USER = os.environ.get('MYSQL_USER') or 'root'
     MYSQL_PASSWORD = os.environ.get('MYSQL_PASSWORD') or ''
     MYSQL_DB = os.environ.get('MYSQL_DB') or 'apartment_management'
+    MYSQL_POOL_SIZE = int(os.environ.get('MYSQL_POOL_SIZE') or 10)
+    MYSQL_POOL_MAX_OVERFLOW = int(os.environ.get('MYSQL_POOL_MAX_OVERFLOW') or 10)
+    MYSQL_POOL_TIMEOUT = float(os.environ.get('MYSQL_POOL_TIMEOUT') or 30)
+    MYSQL_POOL_PRE_PING = (os.environ.get('MYSQL_POOL_PRE_PING') or 'true').lower() == 'true'
+    
+    # Optional read replica for user lookups (unset MYSQL_READ_HOST = use primary)
+    MYSQL_READ_HOST = os.environ.get('MYSQL_READ_HOST') or ''
+    MYSQL_READ_USER = os.environ.get('MYSQL_READ_USER') or MYSQL_USER
+    MYSQL_READ_PASSWORD = os.environ.get('MYSQL_READ_PASSWORD') or MYSQL_PASSWORD
+    MYSQL_READ_DB = os.environ.get('MYSQL_READ_DB') or MYSQL_DB
+    # Reads stay on the primary this long after a write from this process
+    MYSQL_READ_AFTER_WRITE_SECONDS = float(os.environ.get('MYSQL_READ_AFTER_WRITE_SECONDS') or 5)
+    
+    # User lookup cache
+    USER_CACHE_MAX_ENTRIES = int(os.environ.get('USER_CACHE_MAX_ENTRIES') or 2048)
+    USER_CACHE_TTL = int(os.environ.get('USER_CACHE_TTL') or 60)
     
     # MongoDB Configuration
     MONGO_URI = os.environ.get('MONGO_URI') or 'mongodb://localhost:27017/'
     MONGO_DB = os.environ.get('MONGO_DB') or 'apartment_management'
+    MONGO_MAX_POOL_SIZE = int(os.environ.get('MONGO_MAX_POOL_SIZE') or 100)
+    MONGO_MIN_POOL_SIZE = int(os.environ.get('MONGO_MIN_POOL_SIZE') or 0)
+    MONGO_MAX_IDLE_TIME_MS = int(os.environ.get('MONGO_MAX_IDLE_TIME_MS') or 300000)
+    MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.environ.get('MONGO_WAIT_QUEUE_TIMEOUT_MS') or 10000)
+    MONGO_CONNECT_TIMEOUT_MS = int(os.environ.get('MONGO_CONNECT_TIMEOUT_MS') or 5000)
+    MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.environ.get('MONGO_SERVER_SELECTION_TIMEOUT_MS') or 5000)
+    MONGO_SOCKET_TIMEOUT_MS = int(os.environ.get('MONGO_SOCKET_TIMEOUT_MS') or 30000)
+    MONGO_READ_CONCERN = os.environ.get('MONGO_READ_CONCERN') or 'local'
+    MONGO_WRITE_CONCERN_W = os.environ.get('MONGO_WRITE_CONCERN_W') or '1'
+    MONGO_WRITE_CONCERN_J = (os.environ.get('MONGO_WRITE_CONCERN_J') or 'false').lower() == 'true'
+    
+    # Create missing registry indexes (models/indexes.py) when the app starts
+    MONGO_ENSURE_INDEXES = (os.environ.get('MONGO_ENSURE_INDEXES') or 'false').lower() == 'true'
+    
+    # Read routing for heavy analytics reads (primary, primaryPreferred,
+    # secondary, secondaryPreferred, nearest); -1 = no max staleness
+    MONGO_ANALYTICS_READ_PREFERENCE = os.environ.get('MONGO_ANALYTICS_READ_PREFERENCE') or 'primary'
+    MONGO_ANALYTICS_MAX_STALENESS_SECONDS = int(os.environ.get('MONGO_ANALYTICS_MAX_STALENESS_SECONDS') or -1)
+    
+    # Trend response cache (memory = per-process LRU, redis = shared); TTL 0 disables
+    RESPONSE_CACHE_BACKEND = os.environ.get('RESPONSE_CACHE_BACKEND') or 'memory'
+    RESPONSE_CACHE_URL = os.environ.get('RESPONSE_CACHE_URL') or 'redis://localhost:6379/0'
+    RESPONSE_CACHE_TTL = int(os.environ.get('RESPONSE_CACHE_TTL') or 30)
+    RESPONSE_CACHE_MAX_ENTRIES = int(os.environ.get('RESPONSE_CACHE_MAX_ENTRIES') or 512)
+    
+    # Thread pool behind async views (concurrent queries per request)
+    ASYNC_DB_WORKERS = int(os.environ.get('ASYNC_DB_WORKERS') or 32)
+    
+    # List pagination: largest page served, seconds a filtered total is reused
+    MAX_PAGE_SIZE = int(os.environ.get('MAX_PAGE_SIZE') or 200)
+    PAGE_TOTAL_TTL = int(os.environ.get('PAGE_TOTAL_TTL') or 30)
+    
+    # Rows fetched per cursor round trip when streaming NDJSON
+    STREAM_BATCH_SIZE = int(os.environ.get('STREAM_BATCH_SIZE') or 500)
     
     # JWT Configuration
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY') or 'jwt-secret-key-change-in-production'
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=24)
     JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=30)
     
+    # Password hashing (bcrypt runs on a bounded pool)
+    # Hashes with a different cost are rewritten at BCRYPT_ROUNDS after login
+    BCRYPT_ROUNDS = int(os.environ.get('BCRYPT_ROUNDS') or 12)
+    BCRYPT_MAX_WORKERS = int(os.environ.get('BCRYPT_MAX_WORKERS') or 4)
+    BCRYPT_QUEUE_DEPTH = int(os.environ.get('BCRYPT_QUEUE_DEPTH') or 32)
+    BCRYPT_RETRY_AFTER = int(os.environ.get('BCRYPT_RETRY_AFTER') or 2)
+    # Bulk registration hashes on a process pool; defaults to one process per CPU core
+    BCRYPT_BULK_PROCESSES = int(os.environ.get('BCRYPT_BULK_PROCESSES') or os.cpu_count() or 1)
+    
+    # Bulk registration
+    BULK_REGISTER_MAX_ROWS = int(os.environ.get('BULK_REGISTER_MAX_ROWS') or 1000)
+    
     # ML Models Path
     ML_MODELS_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'ml_models')
     
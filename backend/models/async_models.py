@@ -0,0 +1,99 @@
+"""
+Async Data Access
+Awaitable wrappers over the MongoDB collections and MySQL user lookups
+pymongo and mysql-connector are blocking but thread-safe, so queries run on
+a shared thread pool; independent queries awaited together overlap and an
+endpoint's latency becomes its slowest query instead of the sum
+"""
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from config import Config
+from models.mongo_models import get_mongo_db, get_analytics_db
+from models.mysql_models import User
+
+
+_executor = ThreadPoolExecutor(max_workers=Config.ASYNC_DB_WORKERS, thread_name_prefix='db-async')
+
+
+async def run_blocking(fn, *args, **kwargs):
+    """Run a blocking call on the shared DB thread pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, functools.partial(fn, *args, **kwargs))
+
+
+async def gather_dict(awaitables):
+    """Await a dict of awaitables concurrently; returns a dict of results"""
+    keys = list(awaitables)
+    results = await asyncio.gather(*(awaitables[key] for key in keys))
+    return dict(zip(keys, results))
+
+
+class AsyncCollection:
+    """Awaitable subset of pymongo's Collection API"""
+
+    def __init__(self, name, get_db=get_mongo_db):
+        self.name = name
+        self._get_db = get_db
+
+    def _collection(self):
+        return self._get_db()[self.name]
+
+    async def count_documents(self, query):
+        return await run_blocking(lambda: self._collection().count_documents(query))
+
+    async def aggregate(self, pipeline):
+        return await run_blocking(lambda: list(self._collection().aggregate(pipeline)))
+
+    async def find(self, query=None, projection=None, sort=None, limit=0):
+        def load():
+            cursor = self._collection().find(query or {}, projection)
+            if sort:
+                cursor = cursor.sort(sort)
+            if limit:
+                cursor = cursor.limit(limit)
+            return list(cursor)
+        return await run_blocking(load)
+
+    async def find_one(self, query, projection=None):
+        return await run_blocking(lambda: self._collection().find_one(query, projection))
+
+
+class AsyncDatabase:
+    """Attribute access to AsyncCollection objects (adb.complaints, adb.payments, ...)"""
+
+    def __init__(self, get_db=get_mongo_db):
+        self._get_db = get_db
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return AsyncCollection(name, self._get_db)
+
+    def __getitem__(self, name):
+        return AsyncCollection(name, self._get_db)
+
+
+def get_async_db(analytics=False):
+    """
+    Get the async MongoDB facade
+    analytics=True routes reads by the analytics read preference
+    """
+    return AsyncDatabase(get_analytics_db if analytics else get_mongo_db)
+
+
+class AsyncUser:
+    """Async variants of the User lookups used by analytics endpoints"""
+
+    @staticmethod
+    async def find_by_id(user_id):
+        return await run_blocking(User.find_by_id, user_id)
+
+    @staticmethod
+    async def get_all_users():
+        return await run_blocking(User.get_all_users)
+
+    @staticmethod
+    async def get_owners_by_building():
+        return await run_blocking(User.get_owners_by_building)
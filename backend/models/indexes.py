@@ -0,0 +1,240 @@
+"""
+Index Registry
+Every MongoDB index the app relies on, declared next to the query shape it
+serves. ensure_indexes() reconciles a database against the registry (creates
+missing indexes, reports or drops undeclared ones) and is safe to re-run:
+at startup (MONGO_ENSURE_INDEXES), via `flask --app app ensure-indexes` and
+from database/mongodb_init.py
+QUERY_SHAPES are representative filters of the role-scoped routes;
+check_query_plans() explains each one and flags collection scans and,
+for sorted shapes, in-memory sorts
+"""
+
+from datetime import datetime
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING
+from models.mongo_models import get_mongo_db
+from utils.pagination import keyset_filter
+
+
+# Compound keys follow equality -> sort -> range, so the role filter
+# (block_no / employee_id / tenant_id / room_no) leads and the list sort follows;
+# list indexes end in _id, the keyset pagination tiebreak (utils/pagination.py)
+INDEXES = {
+    'apartments': [
+        {'keys': [('block_no', ASCENDING)]},                                # owner building
+        {'keys': [('room_no', ASCENDING)]},                                 # apartment detail, tenant
+        {'keys': [('owner_id', ASCENDING)]},
+        {'keys': [('tenant_id', ASCENDING)]},
+    ],
+    'complaints': [
+        {'keys': [('complaint_id', ASCENDING)], 'unique': True},
+        {'keys': [('tenant_id', ASCENDING), ('created_at', DESCENDING), ('_id', DESCENDING)]},    # tenant list
+        {'keys': [('block_no', ASCENDING), ('created_at', DESCENDING), ('_id', DESCENDING)]},     # owner list
+        {'keys': [('block_no', ASCENDING), ('complaint_status', ASCENDING),
+                  ('created_at', DESCENDING), ('_id', DESCENDING)]},                              # owner list by status
+        {'keys': [('employee_id', ASCENDING), ('created_at', DESCENDING), ('_id', DESCENDING)]},  # employee list
+        {'keys': [('employee_id', ASCENDING), ('complaint_status', ASCENDING),
+                  ('created_at', DESCENDING), ('_id', DESCENDING)]},                              # by status, performance
+        {'keys': [('room_no', ASCENDING), ('created_at', DESCENDING)]},     # apartment detail
+        {'keys': [('complaint_category', ASCENDING)]},                      # admin filters
+        {'keys': [('complaint_status', ASCENDING)]},
+        {'keys': [('priority', ASCENDING)]},
+        {'keys': [('created_at', DESCENDING), ('_id', DESCENDING)]},        # admin list, trends window
+    ],
+    'payments': [
+        {'keys': [('payment_id', ASCENDING)], 'unique': True},
+        {'keys': [('tenant_id', ASCENDING), ('payment_dt', DESCENDING), ('_id', DESCENDING)]},   # tenant list
+        {'keys': [('block_no', ASCENDING), ('payment_dt', DESCENDING), ('_id', DESCENDING)]},    # owner list
+        {'keys': [('block_no', ASCENDING), ('risk_score', DESCENDING), ('_id', DESCENDING)]},    # owner risk alerts
+        {'keys': [('risk_score', DESCENDING), ('_id', DESCENDING)]},        # risk alerts
+        {'keys': [('room_no', ASCENDING), ('payment_dt', DESCENDING)]},     # apartment detail
+        {'keys': [('payment_status', ASCENDING), ('block_no', ASCENDING)]}, # status counts, defaulters
+        {'keys': [('payment_status', ASCENDING), ('year_month', ASCENDING)]},  # monthly revenue
+        {'keys': [('payment_dt', DESCENDING), ('_id', DESCENDING)]},        # admin list
+    ],
+    'prediction_logs': [
+        {'keys': [('model_type', ASCENDING), ('timestamp', DESCENDING), ('_id', DESCENDING)]},
+        {'keys': [('timestamp', DESCENDING), ('_id', DESCENDING)]},
+    ],
+    'analytics': [
+        {'keys': [('metric_type', ASCENDING), ('scope', ASCENDING), ('date', ASCENDING)]},  # daily buckets
+        {'keys': [('date', DESCENDING)]},
+    ],
+    'defaulters': [
+        {'keys': [('overdue_count', DESCENDING), ('total_overdue_amount', DESCENDING)]},
+        {'keys': [('block_no', ASCENDING), ('overdue_count', DESCENDING),
+                  ('total_overdue_amount', DESCENDING)]},
+    ],
+}
+
+
+# Filters (and sorts) the routes issue, with sample values; every one must
+# be answered from an index, sorted ones in index order (no SORT stage)
+QUERY_SHAPES = [
+    {'name': 'owner apartments', 'collection': 'apartments', 'filter': {'block_no': 'B1'}},
+    {'name': 'apartment detail', 'collection': 'apartments', 'filter': {'room_no': 101}},
+    {'name': 'tenant apartment', 'collection': 'apartments', 'filter': {'tenant_id': 'T101'}},
+    {'name': 'complaint detail', 'collection': 'complaints', 'filter': {'complaint_id': 'C1001'}},
+    {'name': 'tenant complaints', 'collection': 'complaints',
+     'filter': {'tenant_id': 'T101'}, 'sort': [('created_at', DESCENDING), ('_id', DESCENDING)]},
+    {'name': 'owner complaints', 'collection': 'complaints',
+     'filter': {'block_no': 'B1'}, 'sort': [('created_at', DESCENDING), ('_id', DESCENDING)]},
+    {'name': 'owner complaints by status', 'collection': 'complaints',
+     'filter': {'block_no': 'B1', 'complaint_status': 'Pending'},
+     'sort': [('created_at', DESCENDING), ('_id', DESCENDING)]},
+    {'name': 'employee complaints', 'collection': 'complaints',
+     'filter': {'employee_id': 'E101'}, 'sort': [('created_at', DESCENDING), ('_id', DESCENDING)]},
+    {'name': 'employee complaints, later page', 'collection': 'complaints',
+     'filter': keyset_filter({'employee_id': 'E101'}, 'created_at', datetime(2024, 6, 1), ObjectId()),
+     'sort': [('created_at', DESCENDING), ('_id', DESCENDING)]},
+    {'name': 'employee complaints by status', 'collection': 'complaints',
+     'filter': {'employee_id': 'E101', 'complaint_status': 'In Progress'},
+     'sort': [('created_at', DESCENDING), ('_id', DESCENDING)]},
+    {'name': 'apartment complaints', 'collection': 'complaints', 'filter': {'room_no': 101}},
+    {'name': 'payment detail', 'collection': 'payments', 'filter': {'payment_id': 'P1'}},
+    {'name': 'tenant payments', 'collection': 'payments',
+     'filter': {'tenant_id': 'T101'}, 'sort': [('payment_dt', DESCENDING), ('_id', DESCENDING)]},
+    {'name': 'owner payments', 'collection': 'payments',
+     'filter': {'block_no': 'B1'}, 'sort': [('payment_dt', DESCENDING), ('_id', DESCENDING)]},
+    {'name': 'apartment payments', 'collection': 'payments', 'filter': {'room_no': 101}},
+    {'name': 'risk alerts', 'collection': 'payments',
+     'filter': {'risk_score': {'$gte': 0.5}}, 'sort': [('risk_score', DESCENDING), ('_id', DESCENDING)]},
+    {'name': 'owner risk alerts', 'collection': 'payments',
+     'filter': {'block_no': 'B1', 'risk_score': {'$gte': 0.5}},
+     'sort': [('risk_score', DESCENDING), ('_id', DESCENDING)]},
+    {'name': 'building overdue payments', 'collection': 'payments',
+     'filter': {'block_no': 'B1', 'payment_status': 'Overdue'}},
+    {'name': 'monthly revenue', 'collection': 'payments',
+     'filter': {'payment_status': 'Paid', '$or': [
+         {'year_month': {'$type': 'string', '$gte': '2024-01'}},
+         {'year_month': {'$exists': False}, 'payment_date': {'$regex': r'^(\d{2}-\d{2}-\d{4}|\d{4}-\d{2}-\d{2})'}}
+     ]}},
+    {'name': 'prediction logs', 'collection': 'prediction_logs',
+     'filter': {'model_type': 'complaint_priority'},
+     'sort': [('timestamp', DESCENDING), ('_id', DESCENDING)]},
+    {'name': 'daily complaint buckets', 'collection': 'analytics',
+     'filter': {'metric_type': 'complaint_daily', 'scope': 'building:B1',
+                'date': {'$gte': datetime(2024, 1, 1), '$lte': datetime(2024, 1, 31)}}},
+    {'name': 'building defaulters', 'collection': 'defaulters',
+     'filter': {'block_no': 'B1', 'overdue_count': {'$gt': 0}},
+     'sort': [('overdue_count', DESCENDING), ('total_overdue_amount', DESCENDING)]},
+]
+
+
+def index_name(keys):
+    """Name MongoDB generates for a key list ('block_no_1_created_at_-1')"""
+    return '_'.join(f'{field}_{direction}' for field, direction in keys)
+
+
+def key_tuple(keys):
+    """Comparable form of a key list (directions created as 1.0 by other tools become 1)"""
+    return tuple((field, int(direction) if isinstance(direction, float) else direction)
+                 for field, direction in keys)
+
+
+def ensure_indexes(db=None, prune=False, dry_run=False):
+    """
+    Reconcile the database's indexes with INDEXES
+    - missing indexes are created (createIndexes is a no-op for existing ones)
+    - an index on the declared keys with different options is a conflict;
+      prune drops and recreates it
+    - undeclared indexes (other than _id_) are reported; prune drops them
+    dry_run reports what would change without writing
+    Returns [{'collection', 'index', 'action'}] with action one of
+    created / exists / conflict / rebuilt / undeclared / dropped
+    """
+    db = db if db is not None else get_mongo_db()
+    report = []
+
+    for collection_name, specs in INDEXES.items():
+        collection = db[collection_name]
+        existing = collection.index_information()
+        by_keys = {key_tuple(info['key']): name for name, info in existing.items()}
+        declared = set()
+
+        for spec in specs:
+            keys = spec['keys']
+            unique = spec.get('unique', False)
+            name = by_keys.get(key_tuple(keys), index_name(keys))
+            declared.add(name)
+
+            if name in existing:
+                if bool(existing[name].get('unique', False)) == unique:
+                    report.append({'collection': collection_name, 'index': name, 'action': 'exists'})
+                    continue
+                if not prune:
+                    report.append({'collection': collection_name, 'index': name, 'action': 'conflict'})
+                    continue
+                if not dry_run:
+                    collection.drop_index(name)
+                    collection.create_index(keys, name=name, unique=unique)
+                report.append({'collection': collection_name, 'index': name, 'action': 'rebuilt'})
+                continue
+
+            if not dry_run:
+                collection.create_index(keys, name=name, unique=unique)
+            report.append({'collection': collection_name, 'index': name, 'action': 'created'})
+
+        for name in existing:
+            if name == '_id_' or name in declared:
+                continue
+            if prune and not dry_run:
+                collection.drop_index(name)
+            report.append({'collection': collection_name, 'index': name,
+                           'action': 'dropped' if prune else 'undeclared'})
+
+    return report
+
+
+def plan_stages(plan):
+    """Stage names of an explain plan tree, outermost first"""
+    stages = []
+    while plan:
+        if 'queryPlan' in plan:  # slot-based engine wraps the classic tree
+            plan = plan['queryPlan']
+        stages.append(plan.get('stage'))
+        for child in plan.get('inputStages', []):
+            stages.extend(plan_stages(child))
+        plan = plan.get('inputStage')
+    return stages
+
+
+def check_query_plans(db=None):
+    """
+    Explain every QUERY_SHAPE and report the winning plan
+    Returns [{'name', 'collection', 'stages', 'index', 'collscan', 'blocking_sort', 'ok'}]
+    blocking_sort: a sorted shape whose plan sorts in memory instead of
+    reading an index in order (keyset pages then cost O(matches))
+    Run against a database that has the registry's indexes and some data;
+    on a missing collection the planner answers EOF and proves nothing
+    """
+    db = db if db is not None else get_mongo_db()
+    results = []
+
+    for shape in QUERY_SHAPES:
+        cursor = db[shape['collection']].find(shape['filter'])
+        if shape.get('sort'):
+            cursor = cursor.sort(shape['sort'])
+        winning = cursor.explain()['queryPlanner']['winningPlan']
+        stages = plan_stages(winning)
+
+        index = None
+        node = winning.get('queryPlan', winning)
+        while node and index is None:
+            index = node.get('indexName')
+            node = node.get('inputStage') or (node.get('inputStages') or [None])[0]
+
+        collscan = 'COLLSCAN' in stages
+        blocking_sort = bool(shape.get('sort')) and 'SORT' in stages
+        results.append({
+            'name': shape['name'],
+            'collection': shape['collection'],
+            'stages': stages,
+            'index': index,
+            'collscan': collscan,
+            'blocking_sort': blocking_sort,
+            'ok': not (collscan or blocking_sort)
+        })
+
+    return results
@@ -3,28 +3,703 @@ MongoDB Database Models
 Collections for complaints, payments, predictions, analytics
 """
 
-from pymongo import MongoClient
-from datetime import datetime
+import atexit
+import threading
+from pymongo import MongoClient, ReturnDocument, UpdateOne, ReplaceOne, DeleteMany
+from pymongo.read_preferences import (Primary, PrimaryPreferred, Secondary,
+                                      SecondaryPreferred, Nearest)
+from pymongo.errors import DuplicateKeyError
+from datetime import datetime, timedelta
 from config import Config
+from utils.quantiles import StreamingStats
+from utils.response_cache import response_cache
+from utils.pagination import fetch_page, count_total
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+# Display names for known buildings; buildings found in the data but not
+# listed here fall back to their stored block_name
+BUILDING_NAMES = {
+    'B1': 'Maple Heights',
+    'B2': 'Harmony Residency',
+    'B3': 'Sunrise Enclave',
+    'B4': 'Lakeview Towers',
+    'B5': 'Green Meadows',
+    'B6': 'Silver Oaks',
+    'B7': 'Crystal View',
+    'B8': 'Riverside Park'
+}
+
+
+def building_sort_key(building_code):
+    """Natural order for building codes (B2 before B10)"""
+    building_code = str(building_code)
+    prefix = building_code.rstrip('0123456789')
+    number = building_code[len(prefix):]
+    return (prefix, int(number) if number else 0)
+
+
+def create_mongo_client(settings=None):
+    """
+    Build a MongoClient from pool, timeout and concern settings
+    settings: mapping of config keys (app.config); defaults to Config
+    """
+    if settings is None:
+        settings = {key: getattr(Config, key) for key in dir(Config) if key.isupper()}
+    
+    write_concern_w = settings['MONGO_WRITE_CONCERN_W']
+    if write_concern_w.isdigit():
+        write_concern_w = int(write_concern_w)
+    
+    options = {
+        'maxPoolSize': settings['MONGO_MAX_POOL_SIZE'],
+        'minPoolSize': settings['MONGO_MIN_POOL_SIZE'],
+        'maxIdleTimeMS': settings['MONGO_MAX_IDLE_TIME_MS'],
+        'waitQueueTimeoutMS': settings['MONGO_WAIT_QUEUE_TIMEOUT_MS'],
+        'connectTimeoutMS': settings['MONGO_CONNECT_TIMEOUT_MS'],
+        'serverSelectionTimeoutMS': settings['MONGO_SERVER_SELECTION_TIMEOUT_MS'],
+        'socketTimeoutMS': settings['MONGO_SOCKET_TIMEOUT_MS'],
+        'readConcernLevel': settings['MONGO_READ_CONCERN'],
+        'w': write_concern_w,
+    }
+    if settings['MONGO_WRITE_CONCERN_J']:
+        options['journal'] = True
+    
+    return MongoClient(settings['MONGO_URI'], **options)
+
+
+def init_mongo(app):
+    """
+    Create the app-scoped MongoClient
+    Called once from create_app; the client is closed when the process exits
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = create_mongo_client(app.config)
+            atexit.register(close_mongo)
+    app.extensions['mongo_client'] = _client
+    return _client
+
+
+def close_mongo():
+    """Close the shared MongoClient"""
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+            _client = None
+
+
+def get_mongo_client():
+    """Get the shared MongoClient (created lazily for scripts outside the app)"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = create_mongo_client()
+    return _client
 
 
 def get_mongo_db():
-    """Get MongoDB database connection"""
-    client = MongoClient(Config.MONGO_URI)
-    return client[Config.MONGO_DB]
+    """Get MongoDB database handle backed by the shared client"""
+    return get_mongo_client()[Config.MONGO_DB]
+
+
+_READ_PREFERENCES = {
+    'primary': Primary,
+    'primarypreferred': PrimaryPreferred,
+    'secondary': Secondary,
+    'secondarypreferred': SecondaryPreferred,
+    'nearest': Nearest
+}
+
+
+def build_read_preference(mode, max_staleness=-1):
+    """Read preference object from a mode name (e.g. 'secondaryPreferred')"""
+    try:
+        preference = _READ_PREFERENCES[(mode or 'primary').lower()]
+    except KeyError:
+        raise ValueError(f'Unknown read preference: {mode}')
+    if preference is Primary:
+        return Primary()
+    return preference(max_staleness=max_staleness)
+
+
+_analytics_read_preference = None
+
+
+def get_analytics_db():
+    """
+    Get MongoDB database handle for heavy analytics reads
+    Routed by MONGO_ANALYTICS_READ_PREFERENCE (e.g. secondaryPreferred);
+    defaults to the primary
+    """
+    global _analytics_read_preference
+    if _analytics_read_preference is None:
+        _analytics_read_preference = build_read_preference(
+            Config.MONGO_ANALYTICS_READ_PREFERENCE,
+            Config.MONGO_ANALYTICS_MAX_STALENESS_SECONDS
+        )
+    return get_mongo_client().get_database(
+        Config.MONGO_DB,
+        read_preference=_analytics_read_preference
+    )
+
+
+class Sequence:
+    """
+    Atomic ID sequences
+    One counter document per sequence in the `counters` collection,
+    advanced with find_one_and_update + $inc so concurrent callers never
+    receive the same value
+    """
+    
+    _seeded = set()
+    _seeded_lock = threading.Lock()
+    
+    @staticmethod
+    def _ensure(name, seed):
+        """
+        Create the counter document on first use
+        seed: callable returning the last value already in use (e.g. current max ID)
+        """
+        if name in Sequence._seeded:
+            return
+        
+        db = get_mongo_db()
+        if db.counters.find_one({'_id': name}, {'_id': 1}) is None:
+            start = seed() if seed else 0
+            try:
+                db.counters.insert_one({'_id': name, 'seq': start})
+            except DuplicateKeyError:
+                # Another worker seeded it first
+                pass
+        
+        with Sequence._seeded_lock:
+            Sequence._seeded.add(name)
+    
+    @staticmethod
+    def reserve(name, count, seed=None):
+        """
+        Reserve a block of `count` consecutive values
+        Returns the first value of the block
+        """
+        if count < 1:
+            raise ValueError('count must be at least 1')
+        
+        Sequence._ensure(name, seed)
+        db = get_mongo_db()
+        
+        counter = db.counters.find_one_and_update(
+            {'_id': name},
+            {'$inc': {'seq': count}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        return counter['seq'] - count + 1
+    
+    @staticmethod
+    def next(name, seed=None):
+        """Get the next value of a sequence"""
+        return Sequence.reserve(name, 1, seed)
+    
+    @staticmethod
+    def advance(name, value):
+        """Move a sequence up to at least `value` (never back), e.g. past rows inserted without it"""
+        get_mongo_db().counters.update_one({'_id': name}, {'$max': {'seq': value}}, upsert=True)
+
+
+class DashboardCounters:
+    """
+    Incrementally maintained dashboard counters
+    One document per scope in the `analytics` collection
+    (_id 'global', 'building:B1', 'tenant:T1001', 'employee:E104'):
+        complaints: {total, status: {...}, priority: {...}, category: {...}}
+        payments:   {total, status: {<status>: {count, amount}}}
+    Complaints are also counted per creation day and scope
+    (_id 'daily:building:B1:2025-03-14', metric_type 'complaint_daily'), so a
+    windowed trend reads one document per day in the window.
+    Writers $inc the affected scopes; readers fetch one document per scope.
+    rebuild() recomputes everything from the collections and reports drift;
+    until it has run with the current LAYOUT (stored on the global doc)
+    readers fall back to aggregating the collections
+    """
+    
+    METRIC_TYPE = 'dashboard_counters'
+    DAILY_METRIC_TYPE = 'complaint_daily'
+    DAILY_PREFIX = 'daily:'
+    
+    # Bumped when rebuild() starts producing new documents (2: daily buckets)
+    LAYOUT = 2
+    
+    # Field names for missing values and characters Mongo paths can't hold
+    NONE_KEY = '_none'
+    
+    COMPLAINT_FIELDS = ('tenant_id', 'block_no', 'employee_id',
+                        'complaint_status', 'priority', 'complaint_category')
+    PAYMENT_FIELDS = ('tenant_id', 'block_no', 'payment_status', 'payment_amount')
+    
+    @staticmethod
+    def key(value):
+        """Counter field name for a value (None -> '_none')"""
+        if value is None or value != value:  # NaN from CSV imports
+            return DashboardCounters.NONE_KEY
+        return str(value).replace('.', '_').lstrip('$') or DashboardCounters.NONE_KEY
+    
+    @staticmethod
+    def value(key):
+        """Inverse of key() for reporting"""
+        return None if key == DashboardCounters.NONE_KEY else key
+    
+    @staticmethod
+    def scopes(doc, include_employee=True):
+        """Counter scopes a complaint or payment document contributes to"""
+        def present(value):
+            return isinstance(value, str) and value != ''
+        
+        scopes = ['global']
+        if present(doc.get('block_no')):
+            scopes.append(f"building:{doc['block_no']}")
+        if present(doc.get('tenant_id')):
+            scopes.append(f"tenant:{doc['tenant_id']}")
+        if include_employee and present(doc.get('employee_id')):
+            scopes.append(f"employee:{doc['employee_id']}")
+        return scopes
+    
+    @staticmethod
+    def created_day(doc):
+        """'YYYY-MM-DD' a complaint was created (created_day, or from created_at)"""
+        if doc.get('created_day'):
+            return doc['created_day']
+        created_at = doc.get('created_at')
+        return created_at.strftime('%Y-%m-%d') if isinstance(created_at, datetime) else None
+    
+    @staticmethod
+    def daily_scope(scope, day):
+        """Document id of a scope's bucket for one day"""
+        return f'{DashboardCounters.DAILY_PREFIX}{scope}:{day}'
+    
+    @staticmethod
+    def document_fields(scope_id):
+        """Descriptive fields stored on a counter document"""
+        if scope_id.startswith(DashboardCounters.DAILY_PREFIX):
+            scope, day = scope_id[len(DashboardCounters.DAILY_PREFIX):].rsplit(':', 1)
+            return {
+                'metric_type': DashboardCounters.DAILY_METRIC_TYPE,
+                'scope': scope,
+                'date': datetime.strptime(day, '%Y-%m-%d')
+            }
+        return {'metric_type': DashboardCounters.METRIC_TYPE, 'scope': scope_id, 'date': datetime.now()}
+    
+    @staticmethod
+    def complaint_increments(doc, weight=1):
+        """{scope: {path: n}} for one complaint (or `weight` identical ones), daily buckets included"""
+        key = DashboardCounters.key
+        paths = {
+            'complaints.total': weight,
+            f"complaints.status.{key(doc.get('complaint_status'))}": weight,
+            f"complaints.priority.{key(doc.get('priority'))}": weight,
+            f"complaints.category.{key(doc.get('complaint_category'))}": weight,
+        }
+        scopes = DashboardCounters.scopes(doc)
+        day = DashboardCounters.created_day(doc)
+        if day:
+            scopes += [DashboardCounters.daily_scope(scope, day) for scope in scopes]
+        return {scope: dict(paths) for scope in scopes}
+    
+    @staticmethod
+    def payment_increments(doc, weight=1, amount=None):
+        """{scope: {path: n}} for one payment (amount overrides weight * payment_amount)"""
+        status = DashboardCounters.key(doc.get('payment_status'))
+        if amount is None:
+            amount = weight * float(doc.get('payment_amount') or 0)
+        paths = {
+            'payments.total': weight,
+            f'payments.status.{status}.count': weight,
+            f'payments.status.{status}.amount': amount,
+        }
+        return {scope: dict(paths) for scope in DashboardCounters.scopes(doc, include_employee=False)}
+    
+    @staticmethod
+    def diff(before, after):
+        """Net increments to move counters from `before` to `after` (zeros dropped)"""
+        delta = {}
+        for sign, increments in ((-1, before), (1, after)):
+            for scope, paths in increments.items():
+                scope_delta = delta.setdefault(scope, {})
+                for path, n in paths.items():
+                    scope_delta[path] = scope_delta.get(path, 0) + sign * n
+        
+        return {
+            scope: {path: n for path, n in paths.items() if n}
+            for scope, paths in delta.items()
+            if any(paths.values())
+        }
+    
+    @staticmethod
+    def apply(increments, db=None):
+        """$inc every affected scope document in one bulk round trip"""
+        if not increments:
+            return
+        
+        db = db if db is not None else get_mongo_db()
+        db.analytics.bulk_write([
+            UpdateOne(
+                {'_id': scope},
+                {'$inc': paths, '$set': DashboardCounters.document_fields(scope)},
+                upsert=True
+            )
+            for scope, paths in increments.items()
+        ], ordered=False)
+    
+    @staticmethod
+    def get(scopes, db=None):
+        """
+        Counter documents for the given scopes (plus 'global')
+        Returns {scope: doc}, or None when counters have never been built
+        """
+        db = db if db is not None else get_mongo_db()
+        wanted = set(scopes) | {'global'}
+        docs = {doc['_id']: doc for doc in db.analytics.find({'_id': {'$in': list(wanted)}})}
+        
+        if not DashboardCounters.is_ready(docs.get('global')):
+            return None
+        return {scope: docs.get(scope, {'_id': scope}) for scope in wanted}
+    
+    @staticmethod
+    def is_ready(global_doc):
+        """True once rebuild() has run with the current layout"""
+        return bool(global_doc) and global_doc.get('layout', 0) >= DashboardCounters.LAYOUT
+    
+    @staticmethod
+    def get_window(scope, first_day, last_day, db=None):
+        """
+        Complaint counters for complaints created between two days (inclusive)
+        Sums the scope's daily buckets: one document per day in the window
+        Returns a counter document, or None when counters have never been built
+        """
+        db = db if db is not None else get_mongo_db()
+        if not DashboardCounters.is_ready(db.analytics.find_one({'_id': 'global'}, {'layout': 1})):
+            return None
+        
+        buckets = db.analytics.find({
+            'metric_type': DashboardCounters.DAILY_METRIC_TYPE,
+            'scope': scope,
+            'date': {'$gte': first_day, '$lte': last_day}
+        }, {'complaints': 1})
+        
+        complaints = {}
+        for bucket in buckets:
+            for path, n in DashboardCounters.flatten(bucket).items():
+                node = complaints
+                *parents, leaf = path.split('.')[1:]
+                for part in parents:
+                    node = node.setdefault(part, {})
+                node[leaf] = node.get(leaf, 0) + n
+        
+        return {'_id': scope, 'complaints': complaints}
+    
+    @staticmethod
+    def complaint_facets(doc):
+        """Counter document in the shape of Analytics.complaint_summary_pipeline output"""
+        complaints = doc.get('complaints', {})
+        
+        def groups(field):
+            return [{'_id': DashboardCounters.value(k), 'count': n}
+                    for k, n in complaints.get(field, {}).items() if n]
+        
+        return [{'by_status': groups('status'), 'by_priority': groups('priority')}]
+    
+    @staticmethod
+    def payment_facets(doc):
+        """Counter document in the shape of Analytics.payment_summary_pipeline output"""
+        statuses = doc.get('payments', {}).get('status', {})
+        return [{'by_status': [
+            {'_id': DashboardCounters.value(k), 'count': g.get('count', 0), 'amount': g.get('amount', 0)}
+            for k, g in statuses.items() if g.get('count')
+        ]}]
+    
+    @staticmethod
+    def complaint_trends(doc):
+        """/complaints/trends groups from a counter document"""
+        complaints = doc.get('complaints', {})
+        
+        def groups(field):
+            return [{'_id': DashboardCounters.value(k), 'count': n}
+                    for k, n in complaints.get(field, {}).items() if n]
+        
+        return {
+            'by_category': sorted(groups('category'), key=lambda g: g['count'], reverse=True),
+            'by_status': groups('status'),
+            'by_priority': groups('priority')
+        }
+    
+    @staticmethod
+    def payment_status_trends(doc):
+        """/payments/trends by_status groups from a counter document"""
+        return [
+            {'_id': g['_id'], 'count': g['count'], 'total_amount': g['amount']}
+            for g in DashboardCounters.payment_facets(doc)[0]['by_status']
+        ]
+    
+    @staticmethod
+    def compute(db=None):
+        """Counters recomputed from the complaints and payments collections"""
+        db = db if db is not None else get_mongo_db()
+        totals = {}
+        
+        def add(increments):
+            for scope, paths in increments.items():
+                scope_totals = totals.setdefault(scope, {})
+                for path, n in paths.items():
+                    scope_totals[path] = scope_totals.get(path, 0) + n
+        
+        # Group identical (scope fields, counted fields) combinations server-side
+        complaint_groups = db.complaints.aggregate([
+            {'$group': {
+                '_id': {
+                    **{field: f'${field}' for field in DashboardCounters.COMPLAINT_FIELDS},
+                    'created_day': {'$dateToString': {'format': '%Y-%m-%d', 'date': '$created_at'}}
+                },
+                'count': {'$sum': 1}
+            }}
+        ], allowDiskUse=True)
+        for group in complaint_groups:
+            add(DashboardCounters.complaint_increments(group['_id'], weight=group['count']))
+        
+        payment_groups = db.payments.aggregate([
+            {'$group': {
+                '_id': {field: f'${field}' for field in ('tenant_id', 'block_no', 'payment_status')},
+                'count': {'$sum': 1},
+                'amount': {'$sum': '$payment_amount'}
+            }}
+        ], allowDiskUse=True)
+        for group in payment_groups:
+            add(DashboardCounters.payment_increments(group['_id'], weight=group['count'],
+                                                     amount=float(group['amount'] or 0)))
+        
+        return totals
+    
+    @staticmethod
+    def flatten(doc):
+        """Nested counter document -> {dotted path: n}"""
+        flat = {}
+        
+        def walk(node, path):
+            for field, value in node.items():
+                if isinstance(value, dict):
+                    walk(value, f'{path}.{field}')
+                elif value is not None:
+                    flat[f'{path}.{field}'] = value
+        
+        for section in ('complaints', 'payments'):
+            if isinstance(doc.get(section), dict):
+                walk(doc[section], section)
+        return flat
+    
+    @staticmethod
+    def metric_types():
+        return [DashboardCounters.METRIC_TYPE, DashboardCounters.DAILY_METRIC_TYPE]
+    
+    @staticmethod
+    def rebuild(dry_run=False, db=None):
+        """
+        Recompute every scope from scratch and replace the stored counters
+        Returns drift as a list of {scope, path, stored, actual}
+        Writes that land while the rebuild runs can be overwritten; run it
+        in a quiet period (or again) if the drift report is not empty
+        """
+        db = db if db is not None else get_mongo_db()
+        actual = DashboardCounters.compute(db)
+        stored = {
+            doc['_id']: DashboardCounters.flatten(doc)
+            for doc in db.analytics.find({'metric_type': {'$in': DashboardCounters.metric_types()}})
+        }
+        
+        drift = []
+        for scope in sorted(set(actual) | set(stored)):
+            actual_paths = actual.get(scope, {})
+            stored_paths = stored.get(scope, {})
+            for path in sorted(set(actual_paths) | set(stored_paths)):
+                expected = actual_paths.get(path, 0)
+                found = stored_paths.get(path, 0)
+                if abs(expected - found) > 1e-6:
+                    drift.append({'scope': scope, 'path': path, 'stored': found, 'actual': expected})
+        
+        if dry_run:
+            return drift
+        
+        now = datetime.now()
+        operations = [DeleteMany({
+            'metric_type': {'$in': DashboardCounters.metric_types()},
+            '_id': {'$nin': list(actual)}
+        })]
+        for scope, paths in actual.items():
+            document = DashboardCounters.document_fields(scope)
+            for path, n in paths.items():
+                node = document
+                *parents, leaf = path.split('.')
+                for part in parents:
+                    node = node.setdefault(part, {})
+                node[leaf] = n
+            if scope == 'global':
+                document['rebuilt_at'] = now
+                document['layout'] = DashboardCounters.LAYOUT
+            operations.append(ReplaceOne({'_id': scope}, document, upsert=True))
+        
+        # An empty database still gets a global document so readers switch over
+        if 'global' not in actual:
+            operations.append(ReplaceOne({'_id': 'global'}, {
+                'metric_type': DashboardCounters.METRIC_TYPE, 'scope': 'global',
+                'date': now, 'rebuilt_at': now, 'layout': DashboardCounters.LAYOUT
+            }, upsert=True))
+        
+        db.analytics.bulk_write(operations, ordered=True)
+        return drift
+
+
+class DefaulterTally:
+    """
+    Per-tenant overdue tally (defaulters collection, _id = tenant_id)
+        {overdue_count, total_overdue_amount, tenant_name, block_no, room_no}
+    Leaderboards are a sorted, indexed top-N read. Payments only change
+    through imports, so rebuild() recomputes it from the payments after
+    one; until then readers fall back to grouping the overdue payments
+    """
+    
+    STATUS = 'Overdue'
+    MARKER_ID = 'defaulters'
+    PROFILE_FIELDS = ('tenant_name', 'block_no', 'room_no')
+    SORT = [('overdue_count', -1), ('total_overdue_amount', -1)]
+    
+    @staticmethod
+    def pipeline(query=None, limit=None):
+        """Overdue payments grouped per tenant, most overdue first"""
+        pipeline = [
+            {'$match': {**(query or {}), 'payment_status': DefaulterTally.STATUS}},
+            {'$group': {
+                '_id': '$tenant_id',
+                'tenant_name': {'$first': '$tenant_name'},
+                'block_no': {'$first': '$block_no'},
+                'room_no': {'$first': '$room_no'},
+                'overdue_count': {'$sum': 1},
+                'total_overdue_amount': {'$sum': '$payment_amount'}
+            }},
+            {'$sort': dict(DefaulterTally.SORT)}
+        ]
+        if limit:
+            pipeline.append({'$limit': limit})
+        return pipeline
+    
+    @staticmethod
+    def top(limit=10, block_no=None, db=None):
+        """
+        Top defaulters overall or for one building
+        Returns None when the tally has never been built
+        """
+        db = db if db is not None else get_mongo_db()
+        if db.analytics.find_one({'_id': DefaulterTally.MARKER_ID}, {'_id': 1}) is None:
+            return None
+        
+        query = {'overdue_count': {'$gt': 0}}
+        if block_no:
+            query['block_no'] = block_no
+        return list(db.defaulters.find(query, {'updated_at': 0})
+                    .sort(DefaulterTally.SORT)
+                    .limit(limit))
+    
+    @staticmethod
+    def rebuild(dry_run=False, db=None):
+        """
+        Recompute the tally from the payments and replace it
+        Returns drift as a list of {tenant_id, field, stored, actual}
+        """
+        db = db if db is not None else get_mongo_db()
+        actual = {row['_id']: row for row in db.payments.aggregate(DefaulterTally.pipeline(), allowDiskUse=True)
+                  if row['_id']}
+        stored = {row['_id']: row for row in db.defaulters.find({}, {'overdue_count': 1, 'total_overdue_amount': 1})}
+        
+        drift = []
+        for tenant_id in sorted(set(actual) | set(stored), key=str):
+            for field in ('overdue_count', 'total_overdue_amount'):
+                expected = actual.get(tenant_id, {}).get(field, 0)
+                found = stored.get(tenant_id, {}).get(field, 0)
+                if abs(expected - found) > 1e-6:
+                    drift.append({'tenant_id': tenant_id, 'field': field, 'stored': found, 'actual': expected})
+        
+        if dry_run:
+            return drift
+        
+        now = datetime.now()
+        operations = [DeleteMany({'_id': {'$nin': list(actual)}})]
+        operations += [
+            ReplaceOne({'_id': tenant_id}, {**row, 'updated_at': now}, upsert=True)
+            for tenant_id, row in actual.items()
+        ]
+        db.defaulters.bulk_write(operations, ordered=True)
+        db.analytics.replace_one(
+            {'_id': DefaulterTally.MARKER_ID},
+            {'metric_type': 'defaulters_tally', 'date': now, 'rebuilt_at': now},
+            upsert=True
+        )
+        return drift
 
 
 class Complaint:
     """Complaint model"""
     
+    # Numbering starts at C1001 on an empty collection
+    FIRST_ID_NUMBER = 1001
+    
+    # Lists never ship the 384-float text embedding
+    LIST_PROJECTION = {'embedding': 0}
+    
+    # Fields a client may request with ?fields= (_id is always returned)
+    FIELDS = ('complaint_id', 'tenant_id', 'tenant_name', 'block_no', 'block_name', 'room_no',
+              'complaint_text', 'complaint_category', 'complaint_status', 'employee_id',
+              'priority', 'priority_confidence', 'created_at', 'updated_at', 'resolved_at',
+              'status_history')
+    
+    # Fields a client may change with PUT /complaints/<id> (assignment and
+    # workflow status); created_at, resolved_at and the rest are server-managed
+    UPDATE_FIELDS = ('complaint_status', 'employee_id')
+    STATUSES = ('Pending', 'In Progress', 'Resolved')
+    
+    @staticmethod
+    def _max_id_number():
+        """Highest numeric part of existing complaint IDs (numeric, not string, max)"""
+        db = get_mongo_db()
+        pipeline = [
+            {'$project': {'number': {'$convert': {
+                'input': {'$substr': ['$complaint_id', 1, 32]},
+                'to': 'long',
+                'onError': None,
+                'onNull': None
+            }}}},
+            {'$group': {'_id': None, 'max': {'$max': '$number'}}}
+        ]
+        result = list(db.complaints.aggregate(pipeline))
+        if result and result[0]['max'] is not None:
+            return int(result[0]['max'])
+        return Complaint.FIRST_ID_NUMBER - 1
+    
+    @staticmethod
+    def next_complaint_id():
+        """Allocate a new complaint ID (C1001, C1002, ...)"""
+        return f"C{Sequence.next('complaint_id', seed=Complaint._max_id_number)}"
+    
     @staticmethod
-    def get_all(filters=None, limit=100, skip=0):
-        """Get all complaints with optional filters"""
+    def get_all(filters=None, limit=100, skip=0, projection=None):
+        """Get all complaints with optional filters (projection defaults to LIST_PROJECTION)"""
         db = get_mongo_db()
         query = filters or {}
         
-        complaints = list(db.complaints.find(query)
-                         .sort('created_at', -1)
+        complaints = list(db.complaints.find(query, projection or Complaint.LIST_PROJECTION)
+                         .sort([('created_at', -1), ('_id', -1)])
                          .skip(skip)
                          .limit(limit))
         
@@ -34,6 +709,26 @@ class Complaint:
         
         return complaints
     
+    @staticmethod
+    def get_page(filters=None, limit=100, cursor=None, skip=0, projection=None):
+        """
+        One page of complaints, newest first, continuing from cursor
+        Returns {'complaints', 'next_cursor', 'total'}
+        """
+        db = get_mongo_db()
+        query = filters or {}
+        
+        complaints, next_cursor = fetch_page(db.complaints, query, 'created_at', limit, cursor, skip,
+                                             projection or Complaint.LIST_PROJECTION)
+        for complaint in complaints:
+            complaint['_id'] = str(complaint['_id'])
+        
+        return {
+            'complaints': complaints,
+            'next_cursor': next_cursor,
+            'total': count_total(db.complaints, query)
+        }
+    
     @staticmethod
     def get_by_id(complaint_id):
         """Get complaint by ID"""
@@ -49,41 +744,86 @@ class Complaint:
     def create(complaint_data):
         """Create new complaint"""
         db = get_mongo_db()
-        complaint_data['created_at'] = datetime.now()
-        complaint_data['updated_at'] = datetime.now()
+        now = datetime.now()
+        complaint_data['created_at'] = now
+        complaint_data['updated_at'] = now
+        complaint_data['status_history'] = [
+            {'status': complaint_data.get('complaint_status', 'Pending'), 'at': now}
+        ]
         
         result = db.complaints.insert_one(complaint_data)
+        DashboardCounters.apply(DashboardCounters.complaint_increments(complaint_data), db)
+        response_cache.bump(*DashboardCounters.scopes(complaint_data))
         return str(result.inserted_id)
     
     @staticmethod
     def update(complaint_id, update_data):
-        """Update complaint"""
+        """
+        Update complaint (callers pass trusted fields; the API whitelists UPDATE_FIELDS)
+        Status changes are appended to status_history; resolved_at is set when
+        a complaint becomes Resolved (and cleared if it is reopened)
+        Returns False if the complaint doesn't exist or nothing would change
+        """
         db = get_mongo_db()
-        update_data['updated_at'] = datetime.now()
+        now = datetime.now()
+        changes = dict(update_data)
+        if not changes:
+            return False
+        
+        update_data = {**changes, 'updated_at': now}
+        update = {'$set': update_data}
+        status = changes.get('complaint_status')
+        if status:
+            update['$push'] = {'status_history': {'status': status, 'at': now}}
+            if status == 'Resolved':
+                update_data['resolved_at'] = now
+            else:
+                update['$unset'] = {'resolved_at': ''}
         
-        result = db.complaints.update_one(
-            {'complaint_id': complaint_id},
-            {'$set': update_data}
+        # Previous values of the counted fields, to move the dashboard counters;
+        # the filter only matches when at least one field actually changes
+        before = db.complaints.find_one_and_update(
+            {
+                'complaint_id': complaint_id,
+                '$or': [{field: {'$ne': value}} for field, value in changes.items()]
+            },
+            update,
+            projection={field: 1 for field in DashboardCounters.COMPLAINT_FIELDS + ('created_at',)},
+            return_document=ReturnDocument.BEFORE
         )
+        if before is None:
+            return False
         
-        return result.modified_count > 0
+        after = {**before, **update_data}
+        DashboardCounters.apply(DashboardCounters.diff(
+            DashboardCounters.complaint_increments(before),
+            DashboardCounters.complaint_increments(after)
+        ), db)
+        response_cache.bump(*DashboardCounters.scopes(before), *DashboardCounters.scopes(after))
+        
+        return True
     
     @staticmethod
     def get_trends(days=30):
-        """Get complaint trends"""
+        """
+        Get complaint trends (counts by category and status)
+        Covers complaints created in the last `days` days; days=None for all
+        """
         db = get_mongo_db()
         
-        pipeline = [
-            {
-                '$group': {
-                    '_id': {
-                        'category': '$complaint_category',
-                        'status': '$complaint_status'
-                    },
-                    'count': {'$sum': 1}
-                }
+        pipeline = []
+        if days:
+            since = datetime.now() - timedelta(days=days)
+            pipeline.append({'$match': {'created_at': {'$gte': since}}})
+        pipeline.append({
+            '$group': {
+                '_id': {
+                    'category': '$complaint_category',
+                    'status': '$complaint_status'
+                },
+                'count': {'$sum': 1}
             }
-        ]
+        })
         
         trends = list(db.complaints.aggregate(pipeline))
         return trends
@@ -92,14 +832,125 @@ class Complaint:
 class Payment:
     """Payment model"""
     
+    # payment_date is stored as entered (DD-MM-YYYY); payment_dt and
+    # year_month ('YYYY-MM', sorts chronologically) are derived from it
+    DATE_FORMATS = ('%d-%m-%Y', '%Y-%m-%d')
+    
+    # Fields a client may request with ?fields= (_id is always returned)
+    FIELDS = ('payment_id', 'tenant_id', 'tenant_name', 'block_no', 'block_name', 'room_no',
+              'payment_amount', 'payment_date', 'payment_dt', 'year_month', 'payment_status',
+              'monthly_rent', 'delay_risk', 'risk_score', 'created_at', 'updated_at')
+    
+    @staticmethod
+    def parse_date(payment_date):
+        """datetime for a stored payment_date, or None if it can't be parsed"""
+        if isinstance(payment_date, datetime):
+            return payment_date
+        if not isinstance(payment_date, str):
+            return None
+        for date_format in Payment.DATE_FORMATS:
+            try:
+                return datetime.strptime(payment_date.strip(), date_format)
+            except ValueError:
+                continue
+        return None
+    
+    @staticmethod
+    def date_fields(payment_date):
+        """Typed date fields to store alongside payment_date"""
+        payment_dt = Payment.parse_date(payment_date)
+        if payment_dt is None:
+            return {'payment_dt': None, 'year_month': None}
+        return {'payment_dt': payment_dt, 'year_month': payment_dt.strftime('%Y-%m')}
+    
     @staticmethod
-    def get_all(filters=None, limit=100, skip=0):
+    def month_range_query(from_month=None, to_month=None):
+        """year_month filter for an inclusive 'YYYY-MM' range (either end optional)"""
+        bounds = {}
+        if from_month:
+            bounds['$gte'] = from_month
+        if to_month:
+            bounds['$lte'] = to_month
+        return {'year_month': bounds} if bounds else {}
+    
+    # Month of a payment that hasn't been through migrate_dates yet, read from
+    # the payment_date string (DD-MM-YYYY or YYYY-MM-DD, as parse_date accepts)
+    UNMIGRATED_MONTH = {
+        '$cond': [
+            {'$eq': [{'$substr': ['$payment_date', 2, 1]}, '-']},
+            {'$concat': [{'$substr': ['$payment_date', 6, 4]}, '-', {'$substr': ['$payment_date', 3, 2]}]},
+            {'$substr': ['$payment_date', 0, 7]}
+        ]
+    }
+    
+    @staticmethod
+    def monthly_revenue_pipeline(query=None, from_month=None, to_month=None):
+        """
+        Paid revenue per year_month; the range is matched on the index
+        Payments without year_month yet (not migrated) are bucketed by their
+        payment_date string instead, so the series is complete before the backfill
+        """
+        month_range = Payment.month_range_query(from_month, to_month).get('year_month', {})
+        pipeline = [
+            {'$match': {
+                **(query or {}),
+                'payment_status': 'Paid',
+                '$or': [
+                    # Bounded string range on year_month (skips undated payments)
+                    {'year_month': {'$type': 'string', **month_range}},
+                    {'year_month': {'$exists': False},
+                     'payment_date': {'$regex': r'^(\d{2}-\d{2}-\d{4}|\d{4}-\d{2}-\d{2})'}}
+                ]
+            }},
+            {'$group': {
+                '_id': {'$ifNull': ['$year_month', Payment.UNMIGRATED_MONTH]},
+                'total_revenue': {'$sum': '$payment_amount'},
+                'count': {'$sum': 1}
+            }}
+        ]
+        if month_range:
+            # Unmigrated payments are only range-checked once bucketed
+            pipeline.append({'$match': {'_id': month_range}})
+        pipeline.append({'$sort': {'_id': 1}})
+        return pipeline
+    
+    @staticmethod
+    def migrate_dates(batch_size=1000, db=None):
+        """
+        Backfill payment_dt / year_month on payments that predate them
+        Returns {'updated': n, 'unparseable': [payment_id, ...]}
+        """
+        db = db if db is not None else get_mongo_db()
+        cursor = db.payments.find(
+            {'year_month': {'$exists': False}},
+            {'_id': 1, 'payment_id': 1, 'payment_date': 1},
+            batch_size=batch_size
+        )
+        
+        updated = 0
+        unparseable = []
+        operations = []
+        for payment in cursor:
+            fields = Payment.date_fields(payment.get('payment_date'))
+            if fields['payment_dt'] is None:
+                unparseable.append(payment.get('payment_id'))
+            operations.append(UpdateOne({'_id': payment['_id']}, {'$set': fields}))
+            if len(operations) == batch_size:
+                updated += db.payments.bulk_write(operations, ordered=False).modified_count
+                operations = []
+        if operations:
+            updated += db.payments.bulk_write(operations, ordered=False).modified_count
+        
+        return {'updated': updated, 'unparseable': unparseable}
+    
+    @staticmethod
+    def get_all(filters=None, limit=100, skip=0, projection=None):
         """Get all payments with optional filters"""
         db = get_mongo_db()
         query = filters or {}
         
-        payments = list(db.payments.find(query)
-                       .sort('payment_date', -1)
+        payments = list(db.payments.find(query, projection)
+                       .sort([('payment_dt', -1), ('_id', -1)])
                        .skip(skip)
                        .limit(limit))
         
@@ -109,30 +960,63 @@ class Payment:
         return payments
     
     @staticmethod
-    def get_by_tenant(tenant_id):
-        """Get payments by tenant ID"""
+    def get_page(filters=None, limit=100, cursor=None, skip=0, projection=None):
+        """
+        One page of payments, latest payment date first, continuing from cursor
+        Returns {'payments', 'next_cursor', 'total'}
+        """
         db = get_mongo_db()
-        payments = list(db.payments.find({'tenant_id': tenant_id})
-                       .sort('payment_date', -1))
+        query = filters or {}
         
+        payments, next_cursor = fetch_page(db.payments, query, 'payment_dt', limit, cursor, skip, projection)
         for payment in payments:
             payment['_id'] = str(payment['_id'])
         
-        return payments
+        return {
+            'payments': payments,
+            'next_cursor': next_cursor,
+            'total': count_total(db.payments, query)
+        }
     
     @staticmethod
-    def get_risk_alerts(threshold=0.5):
-        """Get tenants at risk of payment delay"""
+    def find_by_tenant(tenant_id, projection=None, batch_size=0):
+        """Unconsumed cursor over a tenant's payments, latest first"""
         db = get_mongo_db()
+        return (db.payments.find({'tenant_id': tenant_id}, projection, batch_size=batch_size)
+                .sort([('payment_dt', -1), ('_id', -1)]))
+    
+    @staticmethod
+    def get_by_tenant(tenant_id, projection=None):
+        """Get payments by tenant ID"""
+        payments = list(Payment.find_by_tenant(tenant_id, projection))
         
-        at_risk = list(db.payments.find({
-            'risk_score': {'$gte': threshold}
-        }).sort('risk_score', -1))
+        for payment in payments:
+            payment['_id'] = str(payment['_id'])
         
+        return payments
+    
+    @staticmethod
+    def get_risk_alerts(threshold=0.5, block_no=None, limit=50, cursor=None):
+        """
+        Get tenants at risk of payment delay, highest risk first
+        block_no scopes to one building; limit/cursor page through the rest
+        on the (block_no, risk_score, _id) index
+        Returns {'payments', 'next_cursor', 'total'}
+        """
+        db = get_mongo_db()
+        query = {'risk_score': {'$gte': threshold}}
+        if block_no:
+            query['block_no'] = block_no
+        
+        at_risk, next_cursor = fetch_page(db.payments, query, 'risk_score', limit, cursor)
         for payment in at_risk:
             payment['_id'] = str(payment['_id'])
         
-        return at_risk
+        return {
+            'payments': at_risk,
+            'next_cursor': next_cursor,
+            'total': count_total(db.payments, query)
+        }
     
     @staticmethod
     def update_risk_score(payment_id, risk_score, delay_risk):
@@ -169,13 +1053,32 @@ class PredictionLog:
         
         query = {'model_type': model_type} if model_type else {}
         logs = list(db.prediction_logs.find(query)
-                   .sort('timestamp', -1)
+                   .sort([('timestamp', -1), ('_id', -1)])
                    .limit(limit))
         
         for log in logs:
             log['_id'] = str(log['_id'])
         
         return logs
+    
+    @staticmethod
+    def get_page(model_type=None, limit=50, cursor=None):
+        """
+        One page of prediction logs, newest first, continuing from cursor
+        Returns {'logs', 'next_cursor', 'total'}
+        """
+        db = get_mongo_db()
+        query = {'model_type': model_type} if model_type else {}
+        
+        logs, next_cursor = fetch_page(db.prediction_logs, query, 'timestamp', limit, cursor)
+        for log in logs:
+            log['_id'] = str(log['_id'])
+        
+        return {
+            'logs': logs,
+            'next_cursor': next_cursor,
+            'total': count_total(db.prediction_logs, query)
+        }
 
 
 class Analytics:
@@ -196,3 +1099,307 @@ class Analytics:
         }
         
         return stats
+    
+    @staticmethod
+    def role_scopes(current_user, user_id):
+        """
+        What a role's dashboard covers, per collection: the Mongo filter and
+        the matching counter / cache scope
+        - Admin: everything
+        - Owner: their managed building
+        - Tenant: their own apartment, complaints and payments
+        - Employee: complaints assigned to them (apartments and payments unscoped)
+        """
+        scopes = {
+            'apartments': {'query': {}, 'scope': 'global'},
+            'complaints': {'query': {}, 'scope': 'global'},
+            'payments': {'query': {}, 'scope': 'global'}
+        }
+        
+        role = current_user['role']
+        if role == 'Owner':
+            building = current_user.get('managed_building')
+            if building:
+                for entry in scopes.values():
+                    entry['query'] = {'block_no': building}
+                    entry['scope'] = f'building:{building}'
+        elif role == 'Tenant':
+            for entry in scopes.values():
+                entry['query'] = {'tenant_id': user_id}
+                entry['scope'] = f'tenant:{user_id}'
+        elif role == 'Employee':
+            scopes['complaints'] = {'query': {'employee_id': user_id}, 'scope': f'employee:{user_id}'}
+        
+        return scopes
+    
+    @staticmethod
+    def complaint_summary_pipeline(complaint_query):
+        """One pass over the scoped complaints: counts by status and by priority"""
+        return [
+            {'$match': complaint_query},
+            {'$facet': {
+                'by_status': [{'$group': {'_id': '$complaint_status', 'count': {'$sum': 1}}}],
+                'by_priority': [{'$group': {'_id': '$priority', 'count': {'$sum': 1}}}]
+            }}
+        ]
+    
+    @staticmethod
+    def payment_summary_pipeline(payment_query):
+        """One pass over the scoped payments: count and amount per status"""
+        return [
+            {'$match': payment_query},
+            {'$facet': {
+                'by_status': [{'$group': {
+                    '_id': '$payment_status',
+                    'count': {'$sum': 1},
+                    'amount': {'$sum': '$payment_amount'}
+                }}]
+            }}
+        ]
+    
+    @staticmethod
+    def build_summary(total_apartments, complaint_facets, payment_facets, include_revenue):
+        """
+        Shape /apartments/summary from the facet results
+        complaint_facets / payment_facets: aggregate() output of the pipelines above
+        """
+        complaints = complaint_facets[0] if complaint_facets else {}
+        payments = payment_facets[0] if payment_facets else {}
+        
+        complaint_status = {g['_id']: g['count'] for g in complaints.get('by_status', [])}
+        priority = {g['_id']: g['count'] for g in complaints.get('by_priority', [])}
+        payment_status = {g['_id']: g for g in payments.get('by_status', [])}
+        
+        def payment_count(status):
+            return payment_status[status]['count'] if status in payment_status else 0
+        
+        summary = {
+            'total_apartments': total_apartments,
+            'total_complaints': sum(complaint_status.values()),
+            'total_payments': sum(g['count'] for g in payment_status.values()),
+            'pending_complaints': complaint_status.get('Pending', 0),
+            'in_progress_complaints': complaint_status.get('In Progress', 0),
+            'resolved_complaints': complaint_status.get('Resolved', 0),
+            'high_priority_complaints': priority.get('High', 0),
+            'medium_priority_complaints': priority.get('Medium', 0),
+            'low_priority_complaints': priority.get('Low', 0),
+            'paid_payments': payment_count('Paid'),
+            'pending_payments': payment_count('Pending'),
+            'overdue_payments': payment_count('Overdue'),
+        }
+        
+        if include_revenue:
+            summary['total_revenue'] = payment_status['Paid']['amount'] if 'Paid' in payment_status else 0
+        
+        return summary
+    
+    @staticmethod
+    def building_apartments_pipeline():
+        """Apartment count (and stored name) per building"""
+        return [
+            {'$group': {
+                '_id': '$block_no',
+                'total_apartments': {'$sum': 1},
+                'block_name': {'$first': '$block_name'}
+            }}
+        ]
+    
+    @staticmethod
+    def building_complaints_pipeline():
+        """Total and pending complaints per building in one pass"""
+        return [
+            {'$group': {
+                '_id': '$block_no',
+                'total_complaints': {'$sum': 1},
+                'pending_complaints': {'$sum': {
+                    '$cond': [{'$eq': ['$complaint_status', 'Pending']}, 1, 0]
+                }}
+            }}
+        ]
+    
+    @staticmethod
+    def building_revenue_pipeline():
+        """Paid revenue per building"""
+        return [
+            {'$match': {'payment_status': 'Paid'}},
+            {'$group': {'_id': '$block_no', 'total_revenue': {'$sum': '$payment_amount'}}}
+        ]
+    
+    @staticmethod
+    def build_buildings_summary(apartment_groups, complaint_groups, revenue_groups, owners_by_building):
+        """
+        Shape /apartments/buildings/summary from the grouped results
+        Covers every known building plus any other block_no present in the data
+        """
+        apartments = {g['_id']: g for g in apartment_groups if g['_id']}
+        complaints = {g['_id']: g for g in complaint_groups if g['_id']}
+        revenue = {g['_id']: g['total_revenue'] for g in revenue_groups if g['_id']}
+        
+        codes = set(BUILDING_NAMES) | set(apartments) | set(complaints) | set(revenue)
+        
+        building_stats = []
+        for building_code in sorted(codes, key=building_sort_key):
+            apartment_stats = apartments.get(building_code, {})
+            complaint_stats = complaints.get(building_code, {})
+            assigned_owner = owners_by_building.get(building_code)
+            
+            building_stats.append({
+                'building_code': building_code,
+                'building_name': BUILDING_NAMES.get(building_code)
+                                 or apartment_stats.get('block_name') or building_code,
+                'total_apartments': apartment_stats.get('total_apartments', 0),
+                'total_complaints': complaint_stats.get('total_complaints', 0),
+                'pending_complaints': complaint_stats.get('pending_complaints', 0),
+                'total_revenue': revenue.get(building_code, 0),
+                'owner': {
+                    'user_id': assigned_owner['user_id'],
+                    'full_name': assigned_owner['full_name']
+                } if assigned_owner else None
+            })
+        
+        return building_stats
+    
+    @staticmethod
+    def payment_analytics_pipeline(defaulters_limit=10):
+        """
+        Status counts, paid revenue per building and (unless defaulters_limit
+        is 0, e.g. when the maintained tally is used) top defaulters in one $facet
+        """
+        facets = {
+            'status': [
+                {'$group': {'_id': '$payment_status', 'count': {'$sum': 1}}}
+            ],
+            'revenue_by_building': [
+                {'$match': {'payment_status': 'Paid'}},
+                {'$group': {'_id': '$block_no', 'total': {'$sum': '$payment_amount'}}}
+            ]
+        }
+        if defaulters_limit:
+            # Tenants with most overdue payments
+            facets['top_defaulters'] = DefaulterTally.pipeline(limit=defaulters_limit)
+        return [{'$facet': facets}]
+    
+    @staticmethod
+    def build_payment_analytics(facets, top_defaulters=None):
+        """
+        Shape /analytics/payment-analytics from the $facet result
+        top_defaulters: tally read; defaults to the facet's own top_defaulters
+        """
+        facets = facets[0] if facets else {}
+        status_counts = {g['_id']: g['count'] for g in facets.get('status', [])}
+        revenue = {g['_id']: g['total'] for g in facets.get('revenue_by_building', [])}
+        
+        total_payments = sum(status_counts.values())
+        paid_payments = status_counts.get('Paid', 0)
+        
+        # Collection rate
+        collection_rate = (paid_payments / total_payments * 100) if total_payments > 0 else 0
+        
+        return {
+            'collection_rate': round(collection_rate, 1),
+            'total_payments': total_payments,
+            'paid_payments': paid_payments,
+            'pending_payments': status_counts.get('Pending', 0),
+            'overdue_payments': status_counts.get('Overdue', 0),
+            'revenue_by_building': [{
+                'building': building,
+                'revenue': revenue.get(building, 0)
+            } for building in sorted(BUILDING_NAMES, key=building_sort_key)],
+            'top_defaulters': top_defaulters if top_defaulters is not None
+                              else facets.get('top_defaulters', [])
+        }
+    
+    @staticmethod
+    def employee_status_pipeline():
+        """Assigned complaints per (employee, status) in one $group"""
+        return [
+            {'$match': {'employee_id': {'$nin': [None, '']}}},
+            {'$group': {
+                '_id': {'employee_id': '$employee_id', 'status': '$complaint_status'},
+                'count': {'$sum': 1}
+            }}
+        ]
+    
+    @staticmethod
+    def get_resolution_time_stats(db=None):
+        """
+        Resolution time (created_at -> resolved_at) per employee, in hours
+        Streams durations computed server-side through P² sketches, so memory
+        stays constant however many complaints have been resolved
+        Returns: {employee_id: {'count', 'mean', 'p50', 'p90'}}
+        """
+        db = db if db is not None else get_mongo_db()
+        pipeline = [
+            {'$match': {
+                'employee_id': {'$nin': [None, '']},
+                'resolved_at': {'$type': 'date'},
+                'created_at': {'$type': 'date'}
+            }},
+            {'$project': {
+                '_id': 0,
+                'employee_id': 1,
+                'duration_ms': {'$subtract': ['$resolved_at', '$created_at']}
+            }}
+        ]
+        
+        sketches = {}
+        for row in db.complaints.aggregate(pipeline, batchSize=1000):
+            stats = sketches.get(row['employee_id'])
+            if stats is None:
+                stats = sketches[row['employee_id']] = StreamingStats((0.5, 0.9))
+            stats.add(max(row['duration_ms'], 0) / 3600000)
+        
+        return {
+            emp_id: {
+                'count': stats.count,
+                'mean': stats.mean,
+                'p50': stats.quantile(0.5),
+                'p90': stats.quantile(0.9)
+            }
+            for emp_id, stats in sketches.items()
+        }
+    
+    @staticmethod
+    def build_employee_performance(employees, status_groups, resolution_stats):
+        """Shape /analytics/employee-performance rows, best resolution rate first"""
+        counts = {}
+        for group in status_groups:
+            emp_counts = counts.setdefault(group['_id']['employee_id'], {})
+            emp_counts[group['_id'].get('status')] = group['count']
+        
+        def hours(value):
+            return round(value, 1) if value is not None else None
+        
+        performance_data = []
+        for emp in employees:
+            emp_id = emp['user_id']
+            emp_counts = counts.get(emp_id, {})
+            total_assigned = sum(emp_counts.values())
+            resolved = emp_counts.get('Resolved', 0)
+            in_progress = emp_counts.get('In Progress', 0)
+            pending = emp_counts.get('Pending', 0)
+            resolution = resolution_stats.get(emp_id, {})
+            
+            # Calculate resolution rate
+            resolution_rate = (resolved / total_assigned * 100) if total_assigned > 0 else 0
+            
+            performance_data.append({
+                'employee_id': emp_id,
+                'full_name': emp['full_name'],
+                'department': emp.get('department', 'General'),
+                'total_assigned': total_assigned,
+                'resolved': resolved,
+                'in_progress': in_progress,
+                'pending': pending,
+                'resolution_rate': round(resolution_rate, 1),
+                'current_workload': in_progress + pending,
+                'avg_resolution_hours': hours(resolution.get('mean')),
+                'p50_resolution_hours': hours(resolution.get('p50')),
+                'p90_resolution_hours': hours(resolution.get('p90')),
+                'resolution_time_samples': resolution.get('count', 0)
+            })
+        
+        # Sort by resolution rate (descending)
+        performance_data.sort(key=lambda x: x['resolution_rate'], reverse=True)
+        
+        return performance_data
@@ -3,37 +3,145 @@ MySQL Database Models
 User authentication model
 """
 
-import mysql.connector
-import bcrypt
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from config import Config
+from utils.mysql_pool import MySQLConnectionPool
+from utils.cache import TTLCache
+from utils.password_hasher import password_hasher, HashingQueueFull
+from models.mongo_models import Sequence
 
 
-def get_mysql_connection():
-    """Get MySQL database connection"""
-    return mysql.connector.connect(
-        host=Config.MYSQL_HOST,
-        user=Config.MYSQL_USER,
-        password=Config.MYSQL_PASSWORD,
-        database=Config.MYSQL_DB
+_pool = None
+_read_pool = None
+_pool_lock = threading.Lock()
+
+# monotonic time of the last write made through this process
+_last_write_at = 0.0
+
+# Background rehash writes run here so bcrypt workers never wait on MySQL
+_rehash_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='rehash-write')
+
+logger = logging.getLogger(__name__)
+
+
+def _create_pool(host, user, password, database):
+    return MySQLConnectionPool(
+        connect_args={
+            'host': host,
+            'user': user,
+            'password': password,
+            'database': database
+        },
+        pool_size=Config.MYSQL_POOL_SIZE,
+        max_overflow=Config.MYSQL_POOL_MAX_OVERFLOW,
+        timeout=Config.MYSQL_POOL_TIMEOUT,
+        pre_ping=Config.MYSQL_POOL_PRE_PING
     )
 
 
+def get_mysql_pool():
+    """Get the process-wide MySQL connection pool (created on first use)"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = _create_pool(Config.MYSQL_HOST, Config.MYSQL_USER,
+                                     Config.MYSQL_PASSWORD, Config.MYSQL_DB)
+    return _pool
+
+
+def get_mysql_read_pool():
+    """
+    Get the pool for read-only user lookups
+    Uses the MYSQL_READ_* replica when configured, otherwise the primary pool
+    """
+    global _read_pool
+    if not Config.MYSQL_READ_HOST:
+        return get_mysql_pool()
+    if _read_pool is None:
+        with _pool_lock:
+            if _read_pool is None:
+                _read_pool = _create_pool(Config.MYSQL_READ_HOST, Config.MYSQL_READ_USER,
+                                          Config.MYSQL_READ_PASSWORD, Config.MYSQL_READ_DB)
+    return _read_pool
+
+
+def get_mysql_connection():
+    """Get MySQL database connection from the pool (close() returns it)"""
+    return get_mysql_pool().get_connection()
+
+
+def get_mysql_read_connection():
+    """
+    Get a connection for read-only lookups
+    Falls back to the primary shortly after a local write so callers read their own writes
+    """
+    if time.monotonic() - _last_write_at < Config.MYSQL_READ_AFTER_WRITE_SECONDS:
+        return get_mysql_connection()
+    return get_mysql_read_pool().get_connection()
+
+
+def _mark_write():
+    global _last_write_at
+    _last_write_at = time.monotonic()
+
+
+def get_mysql_pool_stats():
+    """Get MySQL pool statistics"""
+    stats = get_mysql_pool().get_stats()
+    if _read_pool is not None:
+        stats['read_replica'] = _read_pool.get_stats()
+    return stats
+
+
+# Cache for user lookups; every write through User clears it.
+# last_login is left to the TTL so logins don't flush the cache.
+user_cache = TTLCache(
+    max_entries=Config.USER_CACHE_MAX_ENTRIES,
+    ttl=Config.USER_CACHE_TTL
+)
+
+
+def _copy_rows(value):
+    """Copy cached rows so callers can't mutate cache entries"""
+    if isinstance(value, list):
+        return [dict(row) for row in value]
+    return dict(value)
+
+
+def get_user_cache_stats():
+    """Get user cache statistics"""
+    return user_cache.get_stats()
+
+
 class User:
     """User model for authentication"""
     
     @staticmethod
     def find_by_username(username):
         """Find user by username"""
+        cached = user_cache.get(('username', username))
+        if cached is not None:
+            return _copy_rows(cached)
+        generation = user_cache.generation
+        
         conn = get_mysql_connection()
         cursor = conn.cursor(dictionary=True)
         
-        query = "SELECT * FROM users WHERE username = %s AND is_active = TRUE"
-        cursor.execute(query, (username,))
-        user = cursor.fetchone()
-        
-        cursor.close()
-        conn.close()
+        try:
+            query = "SELECT * FROM users WHERE username = %s AND is_active = TRUE"
+            cursor.execute(query, (username,))
+            user = cursor.fetchone()
+        finally:
+            cursor.close()
+            conn.close()
         
+        if user:
+            user_cache.set(('username', username), user, generation=generation)
+            return _copy_rows(user)
         return user
     
     @staticmethod
@@ -42,62 +150,162 @@ class User:
         conn = get_mysql_connection()
         cursor = conn.cursor(dictionary=True)
         
-        query = "SELECT * FROM users WHERE email = %s AND is_active = TRUE"
-        cursor.execute(query, (email,))
-        user = cursor.fetchone()
-        
-        cursor.close()
-        conn.close()
+        try:
+            query = "SELECT * FROM users WHERE email = %s AND is_active = TRUE"
+            cursor.execute(query, (email,))
+            user = cursor.fetchone()
+        finally:
+            cursor.close()
+            conn.close()
         
         return user
     
     @staticmethod
     def find_by_id(user_id):
         """Find user by ID (includes managed_building for Owners)"""
-        conn = get_mysql_connection()
-        cursor = conn.cursor(dictionary=True)
+        cached = user_cache.get(('id', user_id))
+        if cached is not None:
+            return _copy_rows(cached)
+        generation = user_cache.generation
         
-        query = "SELECT * FROM users WHERE user_id = %s AND is_active = TRUE"
-        cursor.execute(query, (user_id,))
-        user = cursor.fetchone()
+        conn = get_mysql_read_connection()
+        cursor = conn.cursor(dictionary=True)
         
-        cursor.close()
-        conn.close()
+        try:
+            query = "SELECT * FROM users WHERE user_id = %s AND is_active = TRUE"
+            cursor.execute(query, (user_id,))
+            user = cursor.fetchone()
+        finally:
+            cursor.close()
+            conn.close()
         
+        if user:
+            user_cache.set(('id', user_id), user, generation=generation)
+            return _copy_rows(user)
         return user
     
     @staticmethod
     def get_users_by_building(building_code):
         """Get all users (tenants) in a specific building"""
-        conn = get_mysql_connection()
+        conn = get_mysql_read_connection()
         cursor = conn.cursor(dictionary=True)
         
-        # This would need to join with apartment data from MongoDB
-        # For now, return owners managing this building
-        query = """SELECT user_id, username, email, role, full_name, managed_building
-                   FROM users 
-                   WHERE managed_building = %s AND role = 'Owner' AND is_active = TRUE"""
-        cursor.execute(query, (building_code,))
-        users = cursor.fetchall()
-        
-        cursor.close()
-        conn.close()
+        try:
+            # This would need to join with apartment data from MongoDB
+            # For now, return owners managing this building
+            query = """SELECT user_id, username, email, role, full_name, managed_building
+                       FROM users 
+                       WHERE managed_building = %s AND role = 'Owner' AND is_active = TRUE"""
+            cursor.execute(query, (building_code,))
+            users = cursor.fetchall()
+        finally:
+            cursor.close()
+            conn.close()
         
         return users
     
+    @staticmethod
+    def get_owners_by_building():
+        """
+        Active owners keyed by managed_building (one query for all buildings)
+        Returns: {'B1': {'user_id', 'full_name', 'managed_building'}, ...}
+        """
+        cached = user_cache.get(('owners_by_building',))
+        if cached is not None:
+            return {code: dict(owner) for code, owner in cached.items()}
+        generation = user_cache.generation
+        
+        conn = get_mysql_read_connection()
+        cursor = conn.cursor(dictionary=True)
+        
+        try:
+            query = """SELECT user_id, full_name, managed_building
+                       FROM users 
+                       WHERE role = 'Owner' AND managed_building IS NOT NULL AND is_active = TRUE
+                       ORDER BY created_at"""
+            cursor.execute(query)
+            owners = {row['managed_building']: row for row in cursor.fetchall()}
+        finally:
+            cursor.close()
+            conn.close()
+        
+        user_cache.set(('owners_by_building',), owners, generation=generation)
+        return {code: dict(owner) for code, owner in owners.items()}
+    
     @staticmethod
     def verify_password(stored_hash, password):
-        """Verify password against hash"""
-        return bcrypt.checkpw(
-            password.encode('utf-8'),
-            stored_hash.encode('utf-8')
-        )
+        """
+        Verify password against hash
+        Runs on the bounded bcrypt pool; raises HashingQueueFull when saturated
+        """
+        return password_hasher.verify(stored_hash, password)
     
     @staticmethod
     def hash_password(password):
-        """Hash password using bcrypt"""
-        salt = bcrypt.gensalt()
-        return bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
+        """
+        Hash password using bcrypt
+        Runs on the bounded bcrypt pool; raises HashingQueueFull when saturated
+        """
+        return password_hasher.hash(password)
+    
+    @staticmethod
+    def rehash_password_if_needed(user_id, stored_hash, password):
+        """
+        Re-hash a just-verified password in the background when its cost
+        differs from BCRYPT_ROUNDS. Skipped (no error) if the bcrypt queue is full.
+        Returns True if a rehash was scheduled.
+        """
+        if not password_hasher.needs_rehash(stored_hash):
+            return False
+        
+        try:
+            future = password_hasher.submit_hash(password)
+        except HashingQueueFull:
+            return False
+        
+        def store(done):
+            # Runs on the bcrypt worker: hand the MySQL write off instead of holding it
+            if done.exception() is not None:
+                logger.warning('Background rehash for %s failed: %s', user_id, done.exception())
+                return
+            _rehash_writer.submit(User.store_rehashed_password, user_id, stored_hash, done.result())
+        
+        future.add_done_callback(store)
+        return True
+    
+    @staticmethod
+    def store_rehashed_password(user_id, old_hash, new_hash):
+        """Write a background rehash (on the rehash writer thread), logging failures"""
+        try:
+            User.replace_password_hash(user_id, old_hash, new_hash)
+        except Exception:
+            logger.exception('Storing rehashed password for %s failed', user_id)
+    
+    @staticmethod
+    def replace_password_hash(user_id, old_hash, new_hash):
+        """
+        Swap a password hash only if it is still old_hash
+        (a concurrent password change wins over a background rehash)
+        """
+        conn = get_mysql_connection()
+        cursor = conn.cursor()
+        
+        try:
+            query = "UPDATE users SET password_hash = %s WHERE user_id = %s AND password_hash = %s"
+            cursor.execute(query, (new_hash, user_id, old_hash))
+            conn.commit()
+            updated = cursor.rowcount > 0
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            cursor.close()
+            conn.close()
+            _mark_write()
+            user_cache.clear()
+        
+        password_hasher.record_rehash(updated)
+        return updated
     
     @staticmethod
     def update_last_login(user_id):
@@ -105,33 +313,41 @@ class User:
         conn = get_mysql_connection()
         cursor = conn.cursor()
         
-        query = "UPDATE users SET last_login = NOW() WHERE user_id = %s"
-        cursor.execute(query, (user_id,))
-        conn.commit()
-        
-        cursor.close()
-        conn.close()
+        try:
+            query = "UPDATE users SET last_login = NOW() WHERE user_id = %s"
+            cursor.execute(query, (user_id,))
+            conn.commit()
+        finally:
+            cursor.close()
+            conn.close()
     
     @staticmethod
     def get_all_users():
         """Get all users (admin only)"""
-        conn = get_mysql_connection()
-        cursor = conn.cursor(dictionary=True)
+        cached = user_cache.get(('all',))
+        if cached is not None:
+            return _copy_rows(cached)
+        generation = user_cache.generation
         
-        query = """
-            SELECT user_id, username, email, role, full_name, 
-                   created_at, last_login, is_active,
-                   managed_building, room_no, apartment_name, department
-            FROM users 
-            ORDER BY created_at DESC
-        """
-        cursor.execute(query)
-        users = cursor.fetchall()
+        conn = get_mysql_read_connection()
+        cursor = conn.cursor(dictionary=True)
         
-        cursor.close()
-        conn.close()
+        try:
+            query = """
+                SELECT user_id, username, email, role, full_name, 
+                       created_at, last_login, is_active,
+                       managed_building, room_no, apartment_name, department
+                FROM users 
+                ORDER BY created_at DESC
+            """
+            cursor.execute(query)
+            users = cursor.fetchall()
+        finally:
+            cursor.close()
+            conn.close()
         
-        return users
+        user_cache.set(('all',), users, generation=generation)
+        return _copy_rows(users)
     
     @staticmethod
     def create_user(user_id, username, email, password, role, full_name, 
@@ -145,62 +361,158 @@ class User:
         - managed_building: for Owners (B1-B8)
         - department: for Employees
         """
+        # Hash the password before borrowing a connection
+        password_hash = User.hash_password(password)
+        
         conn = get_mysql_connection()
         cursor = conn.cursor()
         
-        # Hash the password
-        password_hash = User.hash_password(password)
+        try:
+            query = """
+                INSERT INTO users (user_id, username, email, password_hash, role, full_name,
+                                 room_no, apartment_name, apartment_no, department, managed_building)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+            """
+            cursor.execute(query, (user_id, username, email, password_hash, role, full_name,
+                                  room_no, apartment_name, apartment_no, department, managed_building))
+            conn.commit()
+        finally:
+            cursor.close()
+            conn.close()
+            _mark_write()
+            user_cache.clear()
         
-        query = """
-            INSERT INTO users (user_id, username, email, password_hash, role, full_name,
-                             room_no, apartment_name, apartment_no, department, managed_building)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+        return True
+    
+    @staticmethod
+    def create_users_bulk(users):
+        """
+        Create many users in one transaction
+        users: list of dicts with user_id and the create_user fields
+        Passwords are hashed in parallel across processes before the insert
         """
-        cursor.execute(query, (user_id, username, email, password_hash, role, full_name,
-                              room_no, apartment_name, apartment_no, department, managed_building))
-        conn.commit()
+        password_hashes = password_hasher.hash_many([u['password'] for u in users])
         
-        cursor.close()
-        conn.close()
+        conn = get_mysql_connection()
+        cursor = conn.cursor()
         
-        return True
+        try:
+            query = """
+                INSERT INTO users (user_id, username, email, password_hash, role, full_name,
+                                 room_no, apartment_name, apartment_no, department, managed_building)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+            """
+            cursor.executemany(query, [
+                (u['user_id'], u['username'], u['email'], password_hash, u['role'], u['full_name'],
+                 u.get('room_no'), u.get('apartment_name'), u.get('apartment_no'),
+                 u.get('department'), u.get('managed_building'))
+                for u, password_hash in zip(users, password_hashes)
+            ])
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            cursor.close()
+            conn.close()
+            _mark_write()
+            user_cache.clear()
+        
+        return len(users)
     
     @staticmethod
-    def get_next_sequence_number(role_prefix):
+    def find_existing(usernames=(), emails=(), user_ids=()):
         """
-        Get the next sequence number for auto-incrementing user IDs (Admin, Employee)
-        Returns the next available number for the given role prefix
+        Which of the given usernames / emails / user_ids are already taken
+        Returns: {'username': set, 'email': set, 'user_id': set}
         """
+        existing = {'username': set(), 'email': set(), 'user_id': set()}
+        if not (usernames or emails or user_ids):
+            return existing
+        
         conn = get_mysql_connection()
         cursor = conn.cursor(dictionary=True)
         
-        query = """
-            SELECT user_id FROM users 
-            WHERE user_id LIKE %s 
-            ORDER BY user_id DESC 
-            LIMIT 1
+        try:
+            for column, values in (('username', usernames), ('email', emails), ('user_id', user_ids)):
+                values = list(set(values))
+                if not values:
+                    continue
+                placeholders = ', '.join(['%s'] * len(values))
+                cursor.execute(f"SELECT {column} FROM users WHERE {column} IN ({placeholders})", values)
+                existing[column] = {row[column] for row in cursor.fetchall()}
+        finally:
+            cursor.close()
+            conn.close()
+        
+        return existing
+    
+    @staticmethod
+    def _max_sequence_number(role_prefix):
+        """Highest numeric suffix among user IDs with the given prefix (e.g. A012 -> 12)"""
+        conn = get_mysql_connection()
+        cursor = conn.cursor(dictionary=True)
+        
+        try:
+            query = """
+                SELECT MAX(CAST(SUBSTRING(user_id, %s) AS UNSIGNED)) AS last_num
+                FROM users 
+                WHERE user_id LIKE %s
+            """
+            cursor.execute(query, (len(role_prefix) + 1, f"{role_prefix}%"))
+            result = cursor.fetchone()
+        finally:
+            cursor.close()
+            conn.close()
+        
+        return int(result['last_num']) if result and result['last_num'] is not None else 0
+    
+    @staticmethod
+    def _reserve_free_numbers(role_prefix, count):
         """
-        cursor.execute(query, (f"{role_prefix}%",))
-        result = cursor.fetchone()
+        Reserve `count` consecutive sequence numbers whose user IDs are free
+        The counter is seeded from the users table once; rows inserted without
+        it (e.g. database/seed_users.py) can leave it behind. A block that
+        collides with existing IDs moves the counter past the table's MAX
+        and is reserved again
+        """
+        name = f'user_id_{role_prefix}'
+        seed = lambda: User._max_sequence_number(role_prefix)
         
-        cursor.close()
-        conn.close()
+        for _ in range(3):
+            first = Sequence.reserve(name, count, seed=seed)
+            user_ids = [f"{role_prefix}{number:03d}" for number in range(first, first + count)]
+            if not User.find_existing(user_ids=user_ids)['user_id']:
+                return first
+            Sequence.advance(name, seed())
         
-        if result:
-            # Extract number from user_id (e.g., "A001" -> 1)
-            last_num = int(result['user_id'][1:])
-            return last_num + 1
-        else:
-            return 1
+        raise RuntimeError(f'Could not reserve free {role_prefix} user IDs')
+    
+    @staticmethod
+    def get_next_sequence_number(role_prefix):
+        """
+        Get the next sequence number for auto-incrementing user IDs (Admin, Employee)
+        Allocated from an atomic counter (seeded from the users table on first use),
+        so concurrent registrations never get the same number
+        """
+        return User._reserve_free_numbers(role_prefix, 1)
+    
+    @staticmethod
+    def reserve_sequence_numbers(role_prefix, count):
+        """
+        Reserve `count` consecutive sequence numbers for bulk registration
+        Returns the first number of the block
+        """
+        return User._reserve_free_numbers(role_prefix, count)
             
     @staticmethod
     def update_password(username, new_password):
         """Update user password (hashes it first)"""
+        password_hash = User.hash_password(new_password)
+        
         conn = get_mysql_connection()
         cursor = conn.cursor()
         
-        password_hash = User.hash_password(new_password)
-        
         try:
             query = "UPDATE users SET password_hash = %s WHERE username = %s"
             cursor.execute(query, (password_hash, username))
@@ -212,6 +524,8 @@ class User:
         finally:
             cursor.close()
             conn.close()
+            _mark_write()
+            user_cache.clear()
             
         return updated
 
@@ -252,4 +566,28 @@ class User:
         finally:
             cursor.close()
             conn.close()
+            _mark_write()
+            user_cache.clear()
+
+    @staticmethod
+    def delete_user(user_id):
+        """Delete a user"""
+        conn = get_mysql_connection()
+        cursor = conn.cursor()
+        
+        try:
+            query = "DELETE FROM users WHERE user_id = %s"
+            cursor.execute(query, (user_id,))
+            conn.commit()
+            
+            return cursor.rowcount > 0
+            
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            cursor.close()
+            conn.close()
+            _mark_write()
+            user_cache.clear()
 
@@ -5,8 +5,11 @@ Apartment data and summary endpoints
 
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from models.mongo_models import get_mongo_db
-from models.mysql_models import User
+from models.mongo_models import get_mongo_db, Analytics, DashboardCounters, Complaint, Payment
+from models.async_models import get_async_db, gather_dict, run_blocking, AsyncUser
+from utils.identity import get_current_identity
+from utils.projection import parse_fields
+from utils.streaming import wants_stream, ndjson_response, stringify_id, STREAM_BATCH_SIZE
 
 
 apartments_bp = Blueprint('apartments', __name__)
@@ -23,10 +26,11 @@ def get_apartments():
     - Employee: NO ACCESS
     
     Query params: ?block_no=B1&room_type=2BHK
+    Streams one apartment per line with Accept: application/x-ndjson or ?stream=1
     """
     try:
         current_user_id = get_jwt_identity()
-        current_user = User.find_by_id(current_user_id)
+        current_user = get_current_identity()
         
         # Employees don't need access to apartment listings
         if current_user['role'] == 'Employee':
@@ -62,6 +66,10 @@ def get_apartments():
             if request.args.get('tenant_id'):
                 query['tenant_id'] = request.args.get('tenant_id')
         
+        if wants_stream():
+            cursor = db.apartments.find(query, batch_size=STREAM_BATCH_SIZE)
+            return ndjson_response(stringify_id(apt) for apt in cursor)
+        
         apartments = list(db.apartments.find(query))
         
         # Convert ObjectId to string
@@ -80,61 +88,59 @@ def get_apartments():
         }), 500
 
 
+async def load_summary(current_user, current_user_id):
+    """Summary numbers for the caller's role (shared with /api/dashboard)"""
+    adb = get_async_db()
+    
+    # Filters and counter scopes for the caller's role
+    scopes = Analytics.role_scopes(current_user, current_user_id)
+    apartment_query = scopes['apartments']['query']
+    complaint_query = scopes['complaints']['query']
+    payment_query = scopes['payments']['query']
+    complaint_scope = scopes['complaints']['scope']
+    payment_scope = scopes['payments']['scope']
+    
+    # Complaint and payment numbers come from the maintained counter
+    # documents; the apartment count is an indexed count
+    results = await gather_dict({
+        'apartments': adb.apartments.count_documents(apartment_query),
+        'counters': run_blocking(DashboardCounters.get, [complaint_scope, payment_scope])
+    })
+    counters = results['counters']
+    
+    if counters is not None:
+        complaint_facets = DashboardCounters.complaint_facets(counters[complaint_scope])
+        payment_facets = DashboardCounters.payment_facets(counters[payment_scope])
+    else:
+        # Counters not built yet: one $facet pass per collection
+        facets = await gather_dict({
+            'complaints': adb.complaints.aggregate(Analytics.complaint_summary_pipeline(complaint_query)),
+            'payments': adb.payments.aggregate(Analytics.payment_summary_pipeline(payment_query))
+        })
+        complaint_facets = facets['complaints']
+        payment_facets = facets['payments']
+    
+    # Total revenue only for Admin and Owner
+    return Analytics.build_summary(
+        results['apartments'],
+        complaint_facets,
+        payment_facets,
+        include_revenue=current_user['role'] in ['Admin', 'Owner']
+    )
+
+
 @apartments_bp.route('/summary', methods=['GET'])
 @jwt_required()
-def get_summary():
+async def get_summary():
     """
     Get apartment summary statistics for dashboard
     """
     try:
-        db = get_mongo_db()
-        
         # Get current user
         current_user_id = get_jwt_identity()
-        current_user = User.find_by_id(current_user_id)
-        
-        # Build query based on role
-        apartment_query = {}
-        complaint_query = {}
-        payment_query = {}
-        
-        if current_user['role'] == 'Owner':
-            # Owners see data from their managed building only
-            if current_user.get('managed_building'):
-                apartment_query['block_no'] = current_user['managed_building']
-                complaint_query['block_no'] = current_user['managed_building']
-                payment_query['block_no'] = current_user['managed_building']
-        elif current_user['role'] == 'Tenant':
-            apartment_query['tenant_id'] = current_user_id
-            complaint_query['tenant_id'] = current_user_id
-            payment_query['tenant_id'] = current_user_id
-        elif current_user['role'] == 'Employee':
-            complaint_query['employee_id'] = current_user_id
+        current_user = get_current_identity()
         
-        # Get statistics
-        summary = {
-            'total_apartments': db.apartments.count_documents(apartment_query),
-            'total_complaints': db.complaints.count_documents(complaint_query),
-            'total_payments': db.payments.count_documents(payment_query),
-            'pending_complaints': db.complaints.count_documents({**complaint_query, 'complaint_status': 'Pending'}),
-            'in_progress_complaints': db.complaints.count_documents({**complaint_query, 'complaint_status': 'In Progress'}),
-            'resolved_complaints': db.complaints.count_documents({**complaint_query, 'complaint_status': 'Resolved'}),
-            'high_priority_complaints': db.complaints.count_documents({**complaint_query, 'priority': 'High'}),
-            'medium_priority_complaints': db.complaints.count_documents({**complaint_query, 'priority': 'Medium'}),
-            'low_priority_complaints': db.complaints.count_documents({**complaint_query, 'priority': 'Low'}),
-            'paid_payments': db.payments.count_documents({**payment_query, 'payment_status': 'Paid'}),
-            'pending_payments': db.payments.count_documents({**payment_query, 'payment_status': 'Pending'}),
-            'overdue_payments': db.payments.count_documents({**payment_query, 'payment_status': 'Overdue'}),
-        }
-        
-        # Calculate total revenue (for Admin and Owner)
-        if current_user['role'] in ['Admin', 'Owner']:
-            pipeline = [
-                {'$match': {**payment_query, 'payment_status': 'Paid'}},
-                {'$group': {'_id': None, 'total': {'$sum': '$payment_amount'}}}
-            ]
-            revenue_result = list(db.payments.aggregate(pipeline))
-            summary['total_revenue'] = revenue_result[0]['total'] if revenue_result else 0
+        summary = await load_summary(current_user, current_user_id)
         
         return jsonify(summary), 200
         
@@ -145,15 +151,39 @@ def get_summary():
         }), 500
 
 
+def apartment_detail_rows(db, apartment, complaint_projection, payment_projection):
+    """Tagged NDJSON rows of an apartment's detail, read from batched cursors"""
+    yield {'type': 'apartment', 'data': apartment}
+    
+    query = {'room_no': apartment['room_no']}
+    for complaint in db.complaints.find(query, complaint_projection, batch_size=STREAM_BATCH_SIZE):
+        yield {'type': 'complaint', 'data': stringify_id(complaint)}
+    for payment in db.payments.find(query, payment_projection, batch_size=STREAM_BATCH_SIZE):
+        yield {'type': 'payment', 'data': stringify_id(payment)}
+
+
 @apartments_bp.route('/<room_no>', methods=['GET'])
 @jwt_required()
 def get_apartment_details(room_no):
     """
     Get detailed information about a specific apartment
+    Query params: ?complaint_fields=complaint_id,complaint_status&payment_fields=payment_id,payment_status
+    (sparse fieldsets, see Complaint.FIELDS / Payment.FIELDS; embeddings are never included)
+    Accept: application/x-ndjson or ?stream=1 streams {"type": "apartment" | "complaint" |
+    "payment", "data": {...}} lines, the apartment first
     """
     try:
         db = get_mongo_db()
         
+        try:
+            complaint_projection = parse_fields(request.args.get('complaint_fields'), Complaint.FIELDS)
+            payment_projection = parse_fields(request.args.get('payment_fields'), Payment.FIELDS)
+        except ValueError as e:
+            return jsonify({
+                'error': 'Invalid fields',
+                'message': str(e)
+            }), 400
+        
         apartment = db.apartments.find_one({'room_no': int(room_no)})
         
         if not apartment:
@@ -164,13 +194,19 @@ def get_apartment_details(room_no):
         
         apartment['_id'] = str(apartment['_id'])
         
+        if wants_stream():
+            return ndjson_response(apartment_detail_rows(
+                db, apartment, complaint_projection or Complaint.LIST_PROJECTION, payment_projection
+            ))
+        
         # Get related complaints
-        complaints = list(db.complaints.find({'room_no': int(room_no)}))
+        complaints = list(db.complaints.find({'room_no': int(room_no)},
+                                             complaint_projection or Complaint.LIST_PROJECTION))
         for c in complaints:
             c['_id'] = str(c['_id'])
         
         # Get related payments
-        payments = list(db.payments.find({'room_no': int(room_no)}))
+        payments = list(db.payments.find({'room_no': int(room_no)}, payment_projection))
         for p in payments:
             p['_id'] = str(p['_id'])
         
@@ -187,16 +223,40 @@ def get_apartment_details(room_no):
         }), 500
 
 
+async def load_buildings_summary():
+    """Per-building statistics (shared with /api/dashboard)"""
+    adb = get_async_db(analytics=True)
+    
+    results = await gather_dict({
+        'apartments': adb.apartments.aggregate(Analytics.building_apartments_pipeline()),
+        'complaints': adb.complaints.aggregate(Analytics.building_complaints_pipeline()),
+        'revenue': adb.payments.aggregate(Analytics.building_revenue_pipeline()),
+        'owners': AsyncUser.get_owners_by_building()
+    })
+    
+    building_stats = Analytics.build_buildings_summary(
+        results['apartments'],
+        results['complaints'],
+        results['revenue'],
+        results['owners']
+    )
+    
+    return {
+        'buildings': building_stats,
+        'total_buildings': len(building_stats)
+    }
+
+
 @apartments_bp.route('/buildings/summary', methods=['GET'])
 @jwt_required()
-def get_buildings_summary():
+async def get_buildings_summary():
     """
     Get summary statistics for all buildings (Admin only)
-    Returns stats for each of the 8 buildings
+    Buildings are discovered from the data: one $group per collection
+    plus one owner lookup, whatever the number of buildings
     """
     try:
-        current_user_id = get_jwt_identity()
-        current_user = User.find_by_id(current_user_id)
+        current_user = get_current_identity()
         
         # Only Admin can access this
         if current_user['role'] != 'Admin':
@@ -205,60 +265,9 @@ def get_buildings_summary():
                 'message': 'Admin access required'
             }), 403
         
-        db = get_mongo_db()
-        
-        buildings = ['B1', 'B2', 'B3', 'B4', 'B5', 'B6', 'B7', 'B8']
-        building_names = {
-            'B1': 'Maple Heights',
-            'B2': 'Harmony Residency',
-            'B3': 'Sunrise Enclave',
-            'B4': 'Lakeview Towers',
-            'B5': 'Green Meadows',
-            'B6': 'Silver Oaks',
-            'B7': 'Crystal View',
-            'B8': 'Riverside Park'
-        }
+        building_summary = await load_buildings_summary()
         
-        building_stats = []
-        
-        for building_code in buildings:
-            # Get stats for this building
-            total_apartments = db.apartments.count_documents({'block_no': building_code})
-            total_complaints = db.complaints.count_documents({'block_no': building_code})
-            pending_complaints = db.complaints.count_documents({
-                'block_no': building_code,
-                'complaint_status': 'Pending'
-            })
-            
-            # Calculate revenue
-            revenue_pipeline = [
-                {'$match': {'block_no': building_code, 'payment_status': 'Paid'}},
-                {'$group': {'_id': None, 'total': {'$sum': '$payment_amount'}}}
-            ]
-            revenue_result = list(db.payments.aggregate(revenue_pipeline))
-            total_revenue = revenue_result[0]['total'] if revenue_result else 0
-            
-            # Get assigned owner
-            all_users = User.get_all_users()
-            assigned_owner = next((u for u in all_users if u.get('managed_building') == building_code and u['role'] == 'Owner'), None)
-            
-            building_stats.append({
-                'building_code': building_code,
-                'building_name': building_names[building_code],
-                'total_apartments': total_apartments,
-                'total_complaints': total_complaints,
-                'pending_complaints': pending_complaints,
-                'total_revenue': total_revenue,
-                'owner': {
-                    'user_id': assigned_owner['user_id'] if assigned_owner else None,
-                    'full_name': assigned_owner['full_name'] if assigned_owner else 'Unassigned'
-                } if assigned_owner else None
-            })
-        
-        return jsonify({
-            'buildings': building_stats,
-            'total_buildings': len(buildings)
-        }), 200
+        return jsonify(building_summary), 200
         
     except Exception as e:
         return jsonify({
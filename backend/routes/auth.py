@@ -3,10 +3,13 @@ Authentication Routes
 Login, logout, token verification, user registration
 """
 
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
 from models.mysql_models import User
+from utils.identity import get_current_identity, build_identity_claims
+from utils.password_hasher import password_hasher, HashingQueueFull
 import re
+import time
 
 
 auth_bp = Blueprint('auth', __name__)
@@ -31,6 +34,16 @@ def validate_password(password):
     return (len(errors) == 0, errors)
 
 
+def hashing_busy_response(error):
+    """Fast 503 when the bcrypt queue is saturated"""
+    response = jsonify({
+        'error': 'Service busy',
+        'message': 'Too many login attempts in progress, please retry shortly'
+    })
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response, 503
+
+
 @auth_bp.route('/login', methods=['POST'])
 def login():
     """
@@ -38,6 +51,8 @@ def login():
     Body: {"username": "admin", "password": "password123"}
     Returns: JWT token and user info
     """
+    started = time.perf_counter()
+    success = False
     try:
         data = request.get_json()
         
@@ -66,16 +81,16 @@ def login():
                 'message': 'Username or password is incorrect'
             }), 401
         
+        # Move the hash to the configured bcrypt cost (background, best effort)
+        User.rehash_password_if_needed(user['user_id'], user['password_hash'], password)
+        
         # Update last login
         User.update_last_login(user['user_id'])
         
-        # Create JWT token
+        # Create JWT token (profile fields as claims for clients)
         access_token = create_access_token(
             identity=user['user_id'],
-            additional_claims={
-                'role': user['role'],
-                'username': user['username']
-            }
+            additional_claims=build_identity_claims(user)
         )
         
         # Prepare user data response
@@ -93,18 +108,129 @@ def login():
             user_data['room_no'] = user.get('room_no')
         elif user['role'] == 'Owner':
             user_data['managed_building'] = user.get('managed_building')
-            
+        
+        success = True
         return jsonify({
             'message': 'Login successful',
             'access_token': access_token,
             'user': user_data
         }), 200
         
+    except HashingQueueFull as e:
+        return hashing_busy_response(e)
     except Exception as e:
         return jsonify({
             'error': 'Login failed',
             'message': str(e)
         }), 500
+    finally:
+        password_hasher.record_login((time.perf_counter() - started) * 1000, success)
+
+
+def validate_registration(data):
+    """
+    Validate a registration payload (shared by single and bulk registration)
+    Returns: (fields: dict or None, error: dict or None)
+    """
+    if not isinstance(data, dict):
+        return None, {'error': 'Missing data', 'message': 'Registration data must be an object'}
+    
+    # Validate required fields
+    required_fields = ['username', 'email', 'password', 'full_name', 'role']
+    for field in required_fields:
+        if not data.get(field):
+            return None, {
+                'error': 'Missing field',
+                'message': f'{field} is required'
+            }
+        if not isinstance(data[field], str):
+            return None, {
+                'error': 'Invalid field',
+                'message': f'{field} must be a string'
+            }
+    
+    role = data['role']
+    
+    # Validate role
+    valid_roles = ['Admin', 'Owner', 'Tenant', 'Employee']
+    if role not in valid_roles:
+        return None, {
+            'error': 'Invalid role',
+            'message': f'Role must be one of: {", ".join(valid_roles)}'
+        }
+    
+    # Validate role-specific fields
+    fields = {
+        'username': data['username'],
+        'email': data['email'],
+        'password': data['password'],
+        'full_name': data['full_name'],
+        'role': role,
+        'room_no': None,
+        'apartment_name': None,
+        'apartment_no': None,
+        'department': None,
+        'managed_building': None
+    }
+    
+    if role == 'Tenant':
+        fields['room_no'] = data.get('room_no')
+        fields['apartment_name'] = data.get('apartment_name')
+        if not fields['room_no'] or not fields['apartment_name']:
+            return None, {
+                'error': 'Missing field',
+                'message': 'Room number and apartment name are required for Tenant registration'
+            }
+    
+    elif role == 'Owner':
+        fields['apartment_name'] = data.get('apartment_name')
+        fields['apartment_no'] = data.get('apartment_no')
+        fields['managed_building'] = data.get('managed_building')  # B1-B8
+        
+        if not fields['apartment_name'] or not fields['apartment_no']:
+            return None, {
+                'error': 'Missing field',
+                'message': 'Apartment name and number are required for Owner registration'
+            }
+        
+        # Validate managed_building if provided
+        if fields['managed_building']:
+            valid_buildings = ['B1', 'B2', 'B3', 'B4', 'B5', 'B6', 'B7', 'B8']
+            if fields['managed_building'] not in valid_buildings:
+                return None, {
+                    'error': 'Invalid building',
+                    'message': f'Building must be one of: {", ".join(valid_buildings)}'
+                }
+    
+    elif role == 'Employee':
+        fields['department'] = data.get('department')
+        if not fields['department']:
+            return None, {
+                'error': 'Missing field',
+                'message': 'Department is required for Employee registration'
+            }
+    
+    # Admin doesn't need additional fields
+    
+    # Validate password strength
+    is_valid, errors = validate_password(fields['password'])
+    if not is_valid:
+        return None, {
+            'error': 'Password validation failed',
+            'message': 'Password does not meet security requirements',
+            'errors': errors
+        }
+    
+    return fields, None
+
+
+def fixed_user_id(fields):
+    """user_id for roles whose ID derives from the payload (Tenant, Owner); None otherwise"""
+    if fields['role'] == 'Tenant':
+        return f"T{fields['room_no']}"
+    if fields['role'] == 'Owner':
+        return f"O{fields['apartment_no']}"
+    return None
 
 
 @auth_bp.route('/register', methods=['POST'])
@@ -129,83 +255,13 @@ def register():
     try:
         data = request.get_json()
         
-        # Validate required fields
-        required_fields = ['username', 'email', 'password', 'full_name', 'role']
-        for field in required_fields:
-            if not data.get(field):
-                return jsonify({
-                    'error': 'Missing field',
-                    'message': f'{field} is required'
-                }), 400
+        fields, error = validate_registration(data)
+        if error:
+            return jsonify(error), 400
         
-        username = data['username']
-        email = data['email']
-        password = data['password']
-        full_name = data['full_name']
-        role = data['role']
-        
-        # Validate role
-        valid_roles = ['Admin', 'Owner', 'Tenant', 'Employee']
-        if role not in valid_roles:
-            return jsonify({
-                'error': 'Invalid role',
-                'message': f'Role must be one of: {", ".join(valid_roles)}'
-            }), 400
-        
-        # Validate role-specific fields
-        room_no = None
-        apartment_name = None
-        apartment_no = None
-        department = None
-        managed_building = None
-        
-        if role == 'Tenant':
-            room_no = data.get('room_no')
-            apartment_name = data.get('apartment_name')
-            if not room_no or not apartment_name:
-                return jsonify({
-                    'error': 'Missing field',
-                    'message': 'Room number and apartment name are required for Tenant registration'
-                }), 400
-        
-        elif role == 'Owner':
-            apartment_name = data.get('apartment_name')
-            apartment_no = data.get('apartment_no')
-            managed_building = data.get('managed_building')  # B1-B8
-            
-            if not apartment_name or not apartment_no:
-                return jsonify({
-                    'error': 'Missing field',
-                    'message': 'Apartment name and number are required for Owner registration'
-                }), 400
-            
-            # Validate managed_building if provided
-            if managed_building:
-                valid_buildings = ['B1', 'B2', 'B3', 'B4', 'B5', 'B6', 'B7', 'B8']
-                if managed_building not in valid_buildings:
-                    return jsonify({
-                        'error': 'Invalid building',
-                        'message': f'Building must be one of: {", ".join(valid_buildings)}'
-                    }), 400
-        
-        elif role == 'Employee':
-            department = data.get('department')
-            if not department:
-                return jsonify({
-                    'error': 'Missing field',
-                    'message': 'Department is required for Employee registration'
-                }), 400
-        
-        # Admin doesn't need additional fields
-        
-        # Validate password strength
-        is_valid, errors = validate_password(password)
-        if not is_valid:
-            return jsonify({
-                'error': 'Password validation failed',
-                'message': 'Password does not meet security requirements',
-                'errors': errors
-            }), 400
+        username = fields['username']
+        email = fields['email']
+        role = fields['role']
         
         # Check if username already exists
         existing_user = User.find_by_username(username)
@@ -224,11 +280,8 @@ def register():
             }), 409
         
         # Generate user_id based on role
-        if role == 'Tenant':
-            user_id = f"T{room_no}"
-        elif role == 'Owner':
-            user_id = f"O{apartment_no}"
-        elif role == 'Admin':
+        user_id = fixed_user_id(fields)
+        if role == 'Admin':
             next_num = User.get_next_sequence_number('A')
             user_id = f"A{next_num:03d}"  # Format as A001, A002, etc.
         elif role == 'Employee':
@@ -242,20 +295,8 @@ def register():
                 'message': f'A user with ID {user_id} already exists. Please use a different {role.lower()}-specific identifier.'
             }), 409
         
-        # Create new user
-        User.create_user(
-            user_id=user_id,
-            username=username,
-            email=email,
-            password=password,  # Will be hashed in the model
-            role=role,
-            full_name=full_name,
-            room_no=room_no,
-            apartment_name=apartment_name,
-            apartment_no=apartment_no,
-            department=department,
-            managed_building=managed_building
-        )
+        # Create new user (password is hashed in the model)
+        User.create_user(user_id=user_id, **fields)
         
         return jsonify({
             'message': 'Registration successful',
@@ -264,11 +305,13 @@ def register():
                 'username': username,
                 'email': email,
                 'role': role,
-                'full_name': full_name,
-                'managed_building': managed_building if role == 'Owner' else None
+                'full_name': fields['full_name'],
+                'managed_building': fields['managed_building'] if role == 'Owner' else None
             }
         }), 201
         
+    except HashingQueueFull as e:
+        return hashing_busy_response(e)
     except Exception as e:
         return jsonify({
             'error': 'Registration failed',
@@ -276,6 +319,121 @@ def register():
         }), 500
 
 
+@auth_bp.route('/register/bulk', methods=['POST'])
+@jwt_required()
+def register_bulk():
+    """
+    Bulk user registration (Admin only)
+    Body: {"users": [<same objects as /register>, ...]}
+    
+    All rows are validated up front (including duplicates inside the batch
+    and against existing users); valid rows are hashed in parallel and
+    inserted in a single transaction.
+    Returns: per-row results in request order
+    """
+    try:
+        current_user = get_current_identity()
+        
+        if current_user['role'] != 'Admin':
+            return jsonify({
+                'error': 'Unauthorized',
+                'message': 'Admin access required'
+            }), 403
+        
+        data = request.get_json() or {}
+        rows = data.get('users')
+        
+        if not isinstance(rows, list) or not rows:
+            return jsonify({
+                'error': 'Missing data',
+                'message': 'Please provide a non-empty users list'
+            }), 400
+        
+        max_rows = current_app.config['BULK_REGISTER_MAX_ROWS']
+        if len(rows) > max_rows:
+            return jsonify({
+                'error': 'Too many rows',
+                'message': f'At most {max_rows} users can be registered per request'
+            }), 413
+        
+        results = [None] * len(rows)
+        valid = []
+        
+        # 1. Validate each row on its own
+        for index, row in enumerate(rows):
+            fields, error = validate_registration(row)
+            if error:
+                results[index] = {'index': index, 'status': 'invalid', **error}
+            else:
+                valid.append((index, fields))
+        
+        # 2. Duplicates within the batch and against existing users
+        existing = User.find_existing(
+            usernames=[f['username'] for _, f in valid],
+            emails=[f['email'] for _, f in valid],
+            user_ids=[fixed_user_id(f) for _, f in valid if fixed_user_id(f)]
+        )
+        seen = {'username': set(), 'email': set(), 'user_id': set()}
+        accepted = []
+        
+        for index, fields in valid:
+            user_id = fixed_user_id(fields)
+            conflict = None
+            if fields['username'] in existing['username'] or fields['username'] in seen['username']:
+                conflict = ('Username taken', 'This username is already registered')
+            elif fields['email'] in existing['email'] or fields['email'] in seen['email']:
+                conflict = ('Email taken', 'This email is already registered')
+            elif user_id and (user_id in existing['user_id'] or user_id in seen['user_id']):
+                conflict = ('ID conflict', f'A user with ID {user_id} already exists')
+            
+            if conflict:
+                results[index] = {'index': index, 'status': 'conflict',
+                                  'error': conflict[0], 'message': conflict[1]}
+                continue
+            
+            seen['username'].add(fields['username'])
+            seen['email'].add(fields['email'])
+            if user_id:
+                seen['user_id'].add(user_id)
+            accepted.append((index, fields))
+        
+        # 3. Sequential IDs for Admin / Employee rows
+        for role, prefix in (('Admin', 'A'), ('Employee', 'E')):
+            role_rows = [f for _, f in accepted if f['role'] == role]
+            if role_rows:
+                next_num = User.reserve_sequence_numbers(prefix, len(role_rows))
+                for offset, fields in enumerate(role_rows):
+                    fields['user_id'] = f"{prefix}{next_num + offset:03d}"
+        for _, fields in accepted:
+            fields.setdefault('user_id', fixed_user_id(fields))
+        
+        # 4. Hash in parallel and insert in one transaction
+        if accepted:
+            User.create_users_bulk([fields for _, fields in accepted])
+        
+        for index, fields in accepted:
+            results[index] = {
+                'index': index,
+                'status': 'created',
+                'user_id': fields['user_id'],
+                'username': fields['username']
+            }
+        
+        return jsonify({
+            'message': 'Bulk registration complete',
+            'created': len(accepted),
+            'failed': len(rows) - len(accepted),
+            'results': results
+        }), 201 if accepted else 400
+        
+    except HashingQueueFull as e:
+        return hashing_busy_response(e)
+    except Exception as e:
+        return jsonify({
+            'error': 'Bulk registration failed',
+            'message': str(e)
+        }), 500
+
 
 @auth_bp.route('/verify', methods=['GET'])
 @jwt_required()
@@ -341,8 +499,7 @@ def get_users():
     Get all users (Admin only)
     """
     try:
-        current_user_id = get_jwt_identity()
-        current_user = User.find_by_id(current_user_id)
+        current_user = get_current_identity()
         
         if current_user['role'] != 'Admin':
             return jsonify({
@@ -364,6 +521,25 @@ def get_users():
         }), 500
 
 
+def load_employees():
+    """Employee directory for assigning complaints (shared with /api/dashboard)"""
+    # Get all users with Employee role
+    all_users = User.get_all_users()
+    employees = [u for u in all_users if u['role'] == 'Employee']
+    
+    # Return simplified employee data
+    employee_list = [{
+        'user_id': emp['user_id'],
+        'full_name': emp['full_name'],
+        'department': emp.get('department', 'General')
+    } for emp in employees]
+    
+    return {
+        'employees': employee_list,
+        'count': len(employee_list)
+    }
+
+
 @auth_bp.route('/employees', methods=['GET'])
 @jwt_required()
 def get_employees():
@@ -371,8 +547,7 @@ def get_employees():
     Get all employees (for Owner/Admin to assign complaints)
     """
     try:
-        current_user_id = get_jwt_identity()
-        current_user = User.find_by_id(current_user_id)
+        current_user = get_current_identity()
         
         # Only Owners and Admins can access this
         if current_user['role'] not in ['Owner', 'Admin']:
@@ -381,21 +556,7 @@ def get_employees():
                 'message': 'Owner or Admin access required'
             }), 403
         
-        # Get all users with Employee role
-        all_users = User.get_all_users()
-        employees = [u for u in all_users if u['role'] == 'Employee']
-        
-        # Return simplified employee data
-        employee_list = [{
-            'user_id': emp['user_id'],
-            'full_name': emp['full_name'],
-            'department': emp.get('department', 'General')
-        } for emp in employees]
-        
-        return jsonify({
-            'employees': employee_list,
-            'count': len(employee_list)
-        }), 200
+        return jsonify(load_employees()), 200
         
     except Exception as e:
         return jsonify({
@@ -411,8 +572,7 @@ def update_user(user_id):
     Update user details (Admin only)
     """
     try:
-        current_user_id = get_jwt_identity()
-        current_user = User.find_by_id(current_user_id)
+        current_user = get_current_identity()
         
         if current_user['role'] != 'Admin':
             return jsonify({
@@ -456,8 +616,7 @@ def delete_user(user_id):
     Delete user (Admin only)
     """
     try:
-        current_user_id = get_jwt_identity()
-        current_user = User.find_by_id(current_user_id)
+        current_user = get_current_identity()
         
         if current_user['role'] != 'Admin':
             return jsonify({
@@ -466,7 +625,7 @@ def delete_user(user_id):
             }), 403
             
         # Prevent self-deletion
-        if user_id == current_user_id:
+        if user_id == current_user['user_id']:
             return jsonify({
                 'error': 'Operation denied',
                 'message': 'Cannot delete your own account'
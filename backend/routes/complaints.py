@@ -5,10 +5,14 @@ Complaint management and trend endpoints
 
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from models.mongo_models import Complaint, get_mongo_db
-from models.mysql_models import User
+from models.mongo_models import Complaint, Analytics, DashboardCounters, get_analytics_db
+from models.async_models import get_async_db, gather_dict, run_blocking
+from utils.identity import get_current_identity
+from utils.response_cache import response_cache
+from utils.pagination import parse_page_args
+from utils.projection import parse_fields
 from utils.ml_loader import ml_models
-from datetime import datetime
+from datetime import datetime, timedelta
 
 
 complaints_bp = Blueprint('complaints', __name__)
@@ -25,10 +29,12 @@ def get_complaints():
     - Tenant: See their own complaints only
     
     Query params: ?status=Pending&priority=High&category=Electricity
+                  &limit=100 (max MAX_PAGE_SIZE) &cursor=<next_cursor of the previous page>
+                  &fields=complaint_id,complaint_status (sparse fieldset, see Complaint.FIELDS)
     """
     try:
         current_user_id = get_jwt_identity()
-        current_user = User.find_by_id(current_user_id)
+        current_user = get_current_identity()
         
         # Build query based on role and filters
         query = {}
@@ -54,14 +60,28 @@ def get_complaints():
         if request.args.get('category'):
             query['complaint_category'] = request.args.get('category')
         
-        limit = int(request.args.get('limit', 100))
-        skip = int(request.args.get('skip', 0))
+        try:
+            projection = parse_fields(request.args.get('fields'), Complaint.FIELDS)
+        except ValueError as e:
+            return jsonify({
+                'error': 'Invalid fields',
+                'message': str(e)
+            }), 400
         
-        complaints = Complaint.get_all(query, limit, skip)
+        try:
+            limit, cursor, skip = parse_page_args(request.args)
+            page = Complaint.get_page(query, limit, cursor, skip, projection)
+        except ValueError as e:
+            return jsonify({
+                'error': 'Invalid pagination',
+                'message': str(e)
+            }), 400
         
         return jsonify({
-            'complaints': complaints,
-            'count': len(complaints)
+            'complaints': page['complaints'],
+            'count': len(page['complaints']),
+            'total': page['total'],
+            'next_cursor': page['next_cursor']
         }), 200
         
     except Exception as e:
@@ -92,16 +112,13 @@ def create_complaint():
             }), 400
         
         current_user_id = get_jwt_identity()
-        current_user = User.find_by_id(current_user_id)
+        current_user = get_current_identity()
         
         # Auto-predict priority
         prediction = ml_models.predict_complaint_priority(data['complaint_text'])
         
-        # Generate complaint ID
-        db = get_mongo_db()
-        last_complaint = db.complaints.find_one(sort=[('complaint_id', -1)])
-        new_id_num = int(last_complaint['complaint_id'][1:]) + 1 if last_complaint else 1001
-        complaint_id = f'C{new_id_num}'
+        # Generate complaint ID (atomic counter, safe under concurrency)
+        complaint_id = Complaint.next_complaint_id()
         
         # Create complaint document
         complaint_data = {
@@ -149,7 +166,22 @@ def update_complaint(complaint_id):
                 'message': 'Please provide update data'
             }), 400
         
-        success = Complaint.update(complaint_id, data)
+        # Only allow updating certain fields
+        updates = {k: v for k, v in data.items() if k in Complaint.UPDATE_FIELDS}
+        
+        if not updates:
+            return jsonify({
+                'error': 'No valid fields',
+                'message': f"Provide at least one of: {', '.join(Complaint.UPDATE_FIELDS)}"
+            }), 400
+        
+        if 'complaint_status' in updates and updates['complaint_status'] not in Complaint.STATUSES:
+            return jsonify({
+                'error': 'Invalid data',
+                'message': f"complaint_status must be one of: {', '.join(Complaint.STATUSES)}"
+            }), 400
+        
+        success = Complaint.update(complaint_id, updates)
         
         if not success:
             return jsonify({
@@ -169,49 +201,147 @@ def update_complaint(complaint_id):
         }), 500
 
 
+# Longest window accepted by /trends?days=
+MAX_TREND_DAYS = 3650
+
+
+def parse_day_window(args):
+    """
+    Read ?days=N or ?from=YYYY-MM-DD&to=YYYY-MM-DD (to defaults to today)
+    Returns (first_day, last_day, error); both days None means all time
+    """
+    today = datetime.combine(datetime.now().date(), datetime.min.time())
+    
+    if args.get('days'):
+        try:
+            days = int(args.get('days'))
+        except ValueError:
+            days = 0
+        if not 1 <= days <= MAX_TREND_DAYS:
+            return None, None, f"'days' must be between 1 and {MAX_TREND_DAYS}"
+        return today - timedelta(days=days - 1), today, None
+    
+    if args.get('from') or args.get('to'):
+        if not args.get('from'):
+            return None, None, "'to' requires 'from'"
+        try:
+            first_day = datetime.strptime(args.get('from'), '%Y-%m-%d')
+            last_day = datetime.strptime(args.get('to'), '%Y-%m-%d') if args.get('to') else today
+        except ValueError:
+            return None, None, "'from' and 'to' must be dates in YYYY-MM-DD format"
+        if first_day > last_day:
+            return None, None, "'from' must not be after 'to'"
+        return first_day, last_day, None
+    
+    return None, None, None
+
+
+async def complaint_trends_from_collection(query):
+    """Category, status and priority groups aggregated from the complaints"""
+    adb = get_async_db(analytics=True)
+    
+    # Trend by category
+    category_pipeline = [
+        {'$match': query},
+        {'$group': {
+            '_id': '$complaint_category',
+            'count': {'$sum': 1}
+        }},
+        {'$sort': {'count': -1}}
+    ]
+    
+    # Trend by status
+    status_pipeline = [
+        {'$match': query},
+        {'$group': {
+            '_id': '$complaint_status',
+            'count': {'$sum': 1}
+        }}
+    ]
+    
+    # Trend by priority
+    priority_pipeline = [
+        {'$match': query},
+        {'$group': {
+            '_id': '$priority',
+            'count': {'$sum': 1}
+        }}
+    ]
+    
+    trends = await gather_dict({
+        'by_category': adb.complaints.aggregate(category_pipeline),
+        'by_status': adb.complaints.aggregate(status_pipeline),
+        'by_priority': adb.complaints.aggregate(priority_pipeline)
+    })
+    return trends
+
+
+async def load_complaint_trends(current_user, current_user_id, first_day=None, last_day=None):
+    """
+    Complaint trends for the caller's role, optionally for a creation-day
+    window (shared with /api/dashboard); cached per scope
+    """
+    complaint_scope = Analytics.role_scopes(current_user, current_user_id)['complaints']
+    scope = complaint_scope['scope']
+    
+    window = {
+        'from': first_day.strftime('%Y-%m-%d') if first_day else None,
+        'to': last_day.strftime('%Y-%m-%d') if last_day else None
+    }
+    cache_key = response_cache.key('complaints.trends', [scope], window)
+    trends = response_cache.get(cache_key)
+    if trends is not None:
+        return trends
+    
+    # Maintained counters: one document for all time, or one daily
+    # bucket per day of the window
+    if first_day:
+        counters = await run_blocking(DashboardCounters.get_window, scope,
+                                      first_day, last_day, get_analytics_db())
+    else:
+        counters = await run_blocking(DashboardCounters.get, [scope], get_analytics_db())
+        counters = counters[scope] if counters is not None else None
+    
+    if counters is not None:
+        trends = DashboardCounters.complaint_trends(counters)
+    else:
+        # Counters not built yet: aggregate the collection
+        query = dict(complaint_scope['query'])
+        if first_day:
+            query['created_at'] = {'$gte': first_day, '$lt': last_day + timedelta(days=1)}
+        trends = await complaint_trends_from_collection(query)
+    
+    if first_day:
+        trends = {**trends, 'window': window}
+    
+    response_cache.set(cache_key, trends)
+    return trends
+
+
 @complaints_bp.route('/trends', methods=['GET'])
 @jwt_required()
-def get_complaint_trends():
+async def get_complaint_trends():
     """
     Get complaint trends for graphs
-    Returns data grouped by category and status
+    Returns data grouped by category and status, scoped to the caller's role
+    (Owner: building, Tenant: own complaints, Employee: assigned complaints)
+    Query params: ?days=30 or ?from=2025-01-01&to=2025-03-31 (creation date window)
+    Responses are cached per scope until a complaint write touches it
     """
     try:
-        db = get_mongo_db()
-        
-        # Trend by category
-        category_pipeline = [
-            {'$group': {
-                '_id': '$complaint_category',
-                'count': {'$sum': 1}
-            }},
-            {'$sort': {'count': -1}}
-        ]
-        category_trends = list(db.complaints.aggregate(category_pipeline))
-        
-        # Trend by status
-        status_pipeline = [
-            {'$group': {
-                '_id': '$complaint_status',
-                'count': {'$sum': 1}
-            }}
-        ]
-        status_trends = list(db.complaints.aggregate(status_pipeline))
-        
-        # Trend by priority
-        priority_pipeline = [
-            {'$group': {
-                '_id': '$priority',
-                'count': {'$sum': 1}
-            }}
-        ]
-        priority_trends = list(db.complaints.aggregate(priority_pipeline))
+        current_user_id = get_jwt_identity()
+        current_user = get_current_identity()
         
-        return jsonify({
-            'by_category': category_trends,
-            'by_status': status_trends,
-            'by_priority': priority_trends
-        }), 200
+        first_day, last_day, error = parse_day_window(request.args)
+        if error:
+            return jsonify({
+                'error': 'Invalid window',
+                'message': error
+            }), 400
+        
+        trends = await load_complaint_trends(current_user, current_user_id, first_day, last_day)
+        
+        return jsonify(trends), 200
         
     except Exception as e:
         return jsonify({
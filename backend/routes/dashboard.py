@@ -0,0 +1,142 @@
+"""
+Dashboard Routes
+One request per dashboard: the role's sections are assembled concurrently
+on the server from the same loaders the individual endpoints use
+"""
+
+import asyncio
+import time
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from models.mongo_models import Complaint, Payment, Analytics
+from models.async_models import run_blocking
+from utils.identity import get_current_identity
+from routes.apartments import load_summary, load_buildings_summary
+from routes.complaints import load_complaint_trends
+from routes.payments import load_payment_trends, load_risk_alerts, load_defaulters
+from routes.analytics import load_employee_performance, load_payment_analytics
+from routes.auth import load_employees
+
+
+dashboard_bp = Blueprint('dashboard', __name__)
+
+
+# Sections each role's dashboard gets (default bundle, in response order)
+ROLE_SECTIONS = {
+    'Admin': ('summary', 'recent_complaints', 'risk_alerts', 'employees', 'complaint_trends',
+              'payment_trends', 'buildings', 'employee_performance', 'payment_analytics'),
+    'Owner': ('summary', 'recent_complaints', 'recent_payments', 'employees', 'complaint_trends',
+              'payment_trends', 'risk_alerts', 'defaulters'),
+    'Tenant': ('summary', 'recent_complaints', 'recent_payments', 'complaint_trends', 'payment_trends'),
+    'Employee': ('summary', 'recent_complaints', 'complaint_trends')
+}
+
+# Rows in the recent-complaints section, as the dashboard pages load them
+RECENT_COMPLAINTS = {'Admin': 10, 'Owner': 10, 'Tenant': 20, 'Employee': 50}
+RECENT_PAYMENTS = 10
+
+# Highest-risk payments in the risk-alerts section
+RISK_ALERTS = 10
+
+
+def recent_complaints(current_user, current_user_id):
+    query = Analytics.role_scopes(current_user, current_user_id)['complaints']['query']
+    complaints = Complaint.get_all(query, RECENT_COMPLAINTS[current_user['role']], 0)
+    return {'complaints': complaints, 'count': len(complaints)}
+
+
+def recent_payments(current_user, current_user_id):
+    query = Analytics.role_scopes(current_user, current_user_id)['payments']['query']
+    payments = Payment.get_all(query, RECENT_PAYMENTS, 0)
+    return {'payments': payments, 'count': len(payments)}
+
+
+def section_loaders(current_user, current_user_id):
+    """Section name -> zero-argument callable returning an awaitable"""
+    building = current_user.get('managed_building') if current_user['role'] == 'Owner' else None
+    
+    return {
+        'summary': lambda: load_summary(current_user, current_user_id),
+        'recent_complaints': lambda: run_blocking(recent_complaints, current_user, current_user_id),
+        'recent_payments': lambda: run_blocking(recent_payments, current_user, current_user_id),
+        'risk_alerts': lambda: run_blocking(load_risk_alerts, current_user, 0.5, limit=RISK_ALERTS),
+        'employees': lambda: run_blocking(load_employees),
+        'complaint_trends': lambda: load_complaint_trends(current_user, current_user_id),
+        'payment_trends': lambda: load_payment_trends(current_user, current_user_id),
+        'buildings': lambda: load_buildings_summary(),
+        'employee_performance': lambda: load_employee_performance(),
+        'payment_analytics': lambda: load_payment_analytics(),
+        'defaulters': lambda: load_defaulters(building, 10)
+    }
+
+
+async def timed_section(load):
+    """Run one section; a failing section reports its error instead of failing the bundle"""
+    started = time.perf_counter()
+    try:
+        return await load(), None, (time.perf_counter() - started) * 1000
+    except Exception as e:
+        return None, str(e), (time.perf_counter() - started) * 1000
+
+
+@dashboard_bp.route('/', methods=['GET'])
+@jwt_required()
+async def get_dashboard():
+    """
+    Everything a role's dashboard needs for first paint, in one request
+    - Admin: summary, recent complaints, risk alerts, employees, trends,
+      buildings, employee performance, payment analytics
+    - Owner: summary, recent complaints/payments, employees, trends,
+      risk alerts and defaulters for their building
+    - Tenant: summary, own complaints/payments, trends
+    - Employee: summary, assigned complaints, complaint trends
+    
+    Query params: ?sections=summary,recent_complaints (subset of the role's sections)
+    Each section has the same shape as its standalone endpoint; timings_ms
+    reports how long each took (they run concurrently)
+    """
+    try:
+        started = time.perf_counter()
+        
+        # Identity resolved once and shared by every section
+        current_user_id = get_jwt_identity()
+        current_user = get_current_identity()
+        
+        allowed = ROLE_SECTIONS.get(current_user['role'], ())
+        if request.args.get('sections'):
+            requested = [name.strip() for name in request.args.get('sections').split(',') if name.strip()]
+            unknown = [name for name in requested if name not in allowed]
+            if unknown:
+                return jsonify({
+                    'error': 'Invalid sections',
+                    'message': f"Not available for {current_user['role']}: {', '.join(unknown)}",
+                    'available': list(allowed)
+                }), 400
+            names = [name for name in allowed if name in requested]
+        else:
+            names = list(allowed)
+        
+        loaders = section_loaders(current_user, current_user_id)
+        outcomes = await asyncio.gather(*(timed_section(loaders[name]) for name in names))
+        
+        sections, errors, timings = {}, {}, {}
+        for name, (result, error, elapsed_ms) in zip(names, outcomes):
+            timings[name] = round(elapsed_ms, 1)
+            if error is None:
+                sections[name] = result
+            else:
+                errors[name] = error
+        
+        return jsonify({
+            'role': current_user['role'],
+            'sections': sections,
+            'errors': errors,
+            'timings_ms': timings,
+            'total_ms': round((time.perf_counter() - started) * 1000, 1)
+        }), 200
+        
+    except Exception as e:
+        return jsonify({
+            'error': 'Failed to build dashboard',
+            'message': str(e)
+        }), 500
@@ -7,6 +7,7 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from utils.ml_loader import ml_models
 from models.mongo_models import PredictionLog, Complaint, Payment
+from utils.pagination import parse_page_args
 
 
 ml_bp = Blueprint('ml', __name__)
@@ -112,17 +113,24 @@ def predict_payment_delay():
 def get_prediction_logs():
     """
     Get recent prediction logs
-    Query params: ?model_type=complaint_priority&limit=50
+    Query params: ?model_type=complaint_priority&limit=50&cursor=<next_cursor>
     """
     try:
         model_type = request.args.get('model_type')
-        limit = int(request.args.get('limit', 50))
-        
-        logs = PredictionLog.get_recent(model_type, limit)
+        try:
+            limit, cursor, _ = parse_page_args(request.args, default_limit=50)
+            page = PredictionLog.get_page(model_type, limit, cursor)
+        except ValueError as e:
+            return jsonify({
+                'error': 'Invalid pagination',
+                'message': str(e)
+            }), 400
         
         return jsonify({
-            'logs': logs,
-            'count': len(logs)
+            'logs': page['logs'],
+            'count': len(page['logs']),
+            'total': page['total'],
+            'next_cursor': page['next_cursor']
         }), 200
         
     except Exception as e:
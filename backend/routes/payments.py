@@ -5,12 +5,45 @@ Payment management and risk alert endpoints
 
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from models.mongo_models import Payment, get_mongo_db
-from models.mysql_models import User
+from models.mongo_models import Payment, Analytics, DashboardCounters, DefaulterTally, get_analytics_db
+from models.async_models import get_async_db, gather_dict, run_blocking
+from utils.identity import get_current_identity
+from utils.response_cache import response_cache
+from utils.pagination import parse_page_args
+from utils.projection import parse_fields
+from utils.streaming import wants_stream, ndjson_response, stringify_id, STREAM_BATCH_SIZE
+from datetime import datetime
 
 
 payments_bp = Blueprint('payments', __name__)
 
+# Largest defaulters leaderboard
+MAX_DEFAULTERS = 100
+
+# Risk alerts per page unless ?limit= says otherwise
+DEFAULT_RISK_ALERTS = 50
+
+
+def parse_month_range(args):
+    """
+    Read ?from=YYYY-MM&to=YYYY-MM
+    Returns (from_month, to_month, error message or None)
+    """
+    months = []
+    for name in ('from', 'to'):
+        value = args.get(name)
+        if value:
+            try:
+                value = datetime.strptime(value, '%Y-%m').strftime('%Y-%m')
+            except ValueError:
+                return None, None, f"'{name}' must be a month in YYYY-MM format"
+        months.append(value or None)
+    
+    from_month, to_month = months
+    if from_month and to_month and from_month > to_month:
+        return None, None, "'from' must not be after 'to'"
+    return from_month, to_month, None
+
 
 @payments_bp.route('/', methods=['GET'])
 @jwt_required()
@@ -22,11 +55,13 @@ def get_payments():
     - Employee: NO ACCESS (employees don't handle payments)
     - Tenant: See their own payments only
     
-    Query params: ?status=Overdue&tenant_id=T1001
+    Query params: ?status=Overdue&tenant_id=T1001&from=2025-01&to=2025-12
+                  &limit=100 (max MAX_PAGE_SIZE) &cursor=<next_cursor of the previous page>
+                  &fields=payment_id,payment_status (sparse fieldset, see Payment.FIELDS)
     """
     try:
         current_user_id = get_jwt_identity()
-        current_user = User.find_by_id(current_user_id)
+        current_user = get_current_identity()
         
         # Employees should not access payment data
         if current_user['role'] == 'Employee':
@@ -54,14 +89,36 @@ def get_payments():
         if request.args.get('tenant_id') and current_user['role'] in ['Admin', 'Owner']:
             query['tenant_id'] = request.args.get('tenant_id')
         
-        limit = int(request.args.get('limit', 100))
-        skip = int(request.args.get('skip', 0))
+        from_month, to_month, error = parse_month_range(request.args)
+        if error:
+            return jsonify({
+                'error': 'Invalid range',
+                'message': error
+            }), 400
+        query.update(Payment.month_range_query(from_month, to_month))
+        
+        try:
+            projection = parse_fields(request.args.get('fields'), Payment.FIELDS)
+        except ValueError as e:
+            return jsonify({
+                'error': 'Invalid fields',
+                'message': str(e)
+            }), 400
         
-        payments = Payment.get_all(query, limit, skip)
+        try:
+            limit, cursor, skip = parse_page_args(request.args)
+            page = Payment.get_page(query, limit, cursor, skip, projection)
+        except ValueError as e:
+            return jsonify({
+                'error': 'Invalid pagination',
+                'message': str(e)
+            }), 400
         
         return jsonify({
-            'payments': payments,
-            'count': len(payments)
+            'payments': page['payments'],
+            'count': len(page['payments']),
+            'total': page['total'],
+            'next_cursor': page['next_cursor']
         }), 200
         
     except Exception as e:
@@ -71,6 +128,22 @@ def get_payments():
         }), 500
 
 
+def load_risk_alerts(current_user, threshold=0.5, block_no=None, limit=DEFAULT_RISK_ALERTS, cursor=None):
+    """Payments at risk of delay for the caller's role (shared with /api/dashboard)"""
+    # Owners are pinned to their building; the filter runs in the query
+    if current_user['role'] == 'Owner' and current_user.get('managed_building'):
+        block_no = current_user['managed_building']
+    
+    page = Payment.get_risk_alerts(threshold, block_no, limit, cursor)
+    
+    return {
+        'at_risk_payments': page['payments'],
+        'count': len(page['payments']),
+        'total': page['total'],
+        'next_cursor': page['next_cursor']
+    }
+
+
 @payments_bp.route('/risk-alerts', methods=['GET'])
 @jwt_required()
 def get_risk_alerts():
@@ -80,11 +153,12 @@ def get_risk_alerts():
     - Owner: See risk alerts for their building only
     - Employee/Tenant: NO ACCESS
     
-    Query params: ?threshold=0.5
+    Query params: ?threshold=0.5&block_no=B1 (Admin; Owners always get their building)
+                  &limit=50 (max MAX_PAGE_SIZE) &cursor=<next_cursor of the previous page>
     """
     try:
         current_user_id = get_jwt_identity()
-        current_user = User.find_by_id(current_user_id)
+        current_user = get_current_identity()
         
         # Only Admin and Owner can access risk alerts
         if current_user['role'] not in ['Admin', 'Owner']:
@@ -94,63 +168,153 @@ def get_risk_alerts():
             }), 403
         
         threshold = float(request.args.get('threshold', 0.5))
+        try:
+            limit, cursor, _ = parse_page_args(request.args, default_limit=DEFAULT_RISK_ALERTS)
+            alerts = load_risk_alerts(current_user, threshold, request.args.get('block_no'), limit, cursor)
+        except ValueError as e:
+            return jsonify({
+                'error': 'Invalid pagination',
+                'message': str(e)
+            }), 400
         
-        at_risk = Payment.get_risk_alerts(threshold)
-        
-        # Filter by building for Owners
-        if current_user['role'] == 'Owner' and current_user.get('managed_building'):
-            at_risk = [p for p in at_risk if p.get('block_no') == current_user['managed_building']]
+        return jsonify(alerts), 200
         
+    except Exception as e:
         return jsonify({
-            'at_risk_payments': at_risk,
-            'count': len(at_risk)
-        }), 200
+            'error': 'Failed to fetch risk alerts',
+            'message': str(e)
+        }), 500
+
+
+async def load_defaulters(block_no=None, limit=10):
+    """Defaulters leaderboard, overall or for one building (shared with /api/dashboard)"""
+    defaulters = await run_blocking(DefaulterTally.top, limit, block_no, get_analytics_db())
+    if defaulters is None:
+        # Tally not built yet: group the overdue payments
+        query = {'block_no': block_no} if block_no else {}
+        defaulters = await get_async_db(analytics=True).payments.aggregate(
+            DefaulterTally.pipeline(query, limit)
+        )
+    
+    return {
+        'defaulters': defaulters,
+        'block_no': block_no,
+        'count': len(defaulters)
+    }
+
+
+@payments_bp.route('/defaulters', methods=['GET'])
+@jwt_required()
+async def get_defaulters():
+    """
+    Tenants with the most overdue payments
+    - Admin: all buildings, or one with ?block_no=B1
+    - Owner: their managed building only
+    - Employee/Tenant: NO ACCESS
+    
+    Query params: ?limit=10&block_no=B1
+    """
+    try:
+        current_user = get_current_identity()
+        
+        if current_user['role'] not in ['Admin', 'Owner']:
+            return jsonify({
+                'error': 'Access denied',
+                'message': 'Only Admin and Owner can view defaulters'
+            }), 403
+        
+        try:
+            limit = min(max(int(request.args.get('limit', 10)), 1), MAX_DEFAULTERS)
+        except ValueError:
+            return jsonify({
+                'error': 'Invalid limit',
+                'message': 'limit must be a number'
+            }), 400
+        
+        block_no = request.args.get('block_no')
+        if current_user['role'] == 'Owner':
+            block_no = current_user.get('managed_building')
+        
+        defaulters = await load_defaulters(block_no, limit)
+        
+        return jsonify(defaulters), 200
         
     except Exception as e:
         return jsonify({
-            'error': 'Failed to fetch risk alerts',
+            'error': 'Failed to fetch defaulters',
             'message': str(e)
         }), 500
 
 
+async def load_payment_trends(current_user, current_user_id, from_month=None, to_month=None):
+    """Payment trends for the caller's role (shared with /api/dashboard); cached per scope"""
+    payment_scope = Analytics.role_scopes(current_user, current_user_id)['payments']
+    scope = payment_scope['scope']
+    query = payment_scope['query']
+    
+    cache_key = response_cache.key('payments.trends', [scope],
+                                   {'from': from_month, 'to': to_month})
+    trends = response_cache.get(cache_key)
+    if trends is not None:
+        return trends
+    
+    adb = get_async_db(analytics=True)
+    
+    # Trend by status
+    status_pipeline = [
+        {'$match': query},
+        {'$group': {
+            '_id': '$payment_status',
+            'count': {'$sum': 1},
+            'total_amount': {'$sum': '$payment_amount'}
+        }}
+    ]
+    
+    # Monthly revenue trend (year_month buckets, optionally ranged)
+    monthly_pipeline = Payment.monthly_revenue_pipeline(query, from_month, to_month)
+    
+    # Status totals come from the maintained counters when available
+    results = await gather_dict({
+        'counters': run_blocking(DashboardCounters.get, [scope], get_analytics_db()),
+        'monthly': adb.payments.aggregate(monthly_pipeline)
+    })
+    if results['counters'] is not None:
+        status_trends = DashboardCounters.payment_status_trends(results['counters'][scope])
+    else:
+        status_trends = await adb.payments.aggregate(status_pipeline)
+    
+    trends = {
+        'by_status': status_trends,
+        'by_month': results['monthly']
+    }
+    response_cache.set(cache_key, trends)
+    return trends
+
+
 @payments_bp.route('/trends', methods=['GET'])
 @jwt_required()
-def get_payment_trends():
+async def get_payment_trends():
     """
     Get payment trends for graphs
-    Returns data grouped by status and month
+    Returns data grouped by status and month (YYYY-MM), scoped to the caller's
+    role (Owner: building, Tenant: own payments)
+    Query params: ?from=2025-01&to=2025-12 (limits the monthly series)
+    Responses are cached per scope until a payment write touches it
     """
     try:
-        db = get_mongo_db()
-        
-        # Trend by status
-        status_pipeline = [
-            {'$group': {
-                '_id': '$payment_status',
-                'count': {'$sum': 1},
-                'total_amount': {'$sum': '$payment_amount'}
-            }}
-        ]
-        status_trends = list(db.payments.aggregate(status_pipeline))
-        
-        # Monthly revenue trend
-        monthly_pipeline = [
-            {'$match': {'payment_status': 'Paid'}},
-            {'$group': {
-                '_id': {
-                    '$substr': ['$payment_date', 3, 7]  # Extract MM-YYYY
-                },
-                'total_revenue': {'$sum': '$payment_amount'},
-                'count': {'$sum': 1}
-            }},
-            {'$sort': {'_id': 1}}
-        ]
-        monthly_trends = list(db.payments.aggregate(monthly_pipeline))
+        current_user_id = get_jwt_identity()
+        current_user = get_current_identity()
         
-        return jsonify({
-            'by_status': status_trends,
-            'by_month': monthly_trends
-        }), 200
+        from_month, to_month, error = parse_month_range(request.args)
+        if error:
+            return jsonify({
+                'error': 'Invalid range',
+                'message': error
+            }), 400
+        
+        trends = await load_payment_trends(current_user, current_user_id, from_month, to_month)
+        
+        return jsonify(trends), 200
         
     except Exception as e:
         return jsonify({
@@ -164,10 +328,12 @@ def get_payment_trends():
 def get_tenant_payments(tenant_id):
     """
     Get payment history for a specific tenant
+    Query params: ?fields=payment_id,payment_status (sparse fieldset, see Payment.FIELDS)
+    Streams one payment per line with Accept: application/x-ndjson or ?stream=1
     """
     try:
         current_user_id = get_jwt_identity()
-        current_user = User.find_by_id(current_user_id)
+        current_user = get_current_identity()
         
         # Check authorization
         if current_user['role'] == 'Tenant' and current_user_id != tenant_id:
@@ -176,7 +342,19 @@ def get_tenant_payments(tenant_id):
                 'message': 'You can only view your own payments'
             }), 403
         
-        payments = Payment.get_by_tenant(tenant_id)
+        try:
+            projection = parse_fields(request.args.get('fields'), Payment.FIELDS)
+        except ValueError as e:
+            return jsonify({
+                'error': 'Invalid fields',
+                'message': str(e)
+            }), 400
+        
+        if wants_stream():
+            cursor = Payment.find_by_tenant(tenant_id, projection, batch_size=STREAM_BATCH_SIZE)
+            return ndjson_response(stringify_id(payment) for payment in cursor)
+        
+        payments = Payment.get_by_tenant(tenant_id, projection)
         
         return jsonify({
             'payments': payments,
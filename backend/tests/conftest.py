@@ -0,0 +1,41 @@
+"""
+Test configuration
+Tests run from the backend directory: `python -m pytest tests`
+Tests that need MongoDB use the `mongo_db` fixture, a scratch database on
+MONGO_URI that is dropped afterwards; they are skipped when no mongod answers
+"""
+
+import os
+import sys
+
+import pytest
+from pymongo import MongoClient
+from pymongo.errors import PyMongoError
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config  # noqa: E402
+
+
+TEST_DB = f'{Config.MONGO_DB}_test'
+
+
+@pytest.fixture(scope='session')
+def mongo_client():
+    """MongoClient for MONGO_URI, or skip when the server is unreachable"""
+    client = MongoClient(Config.MONGO_URI, serverSelectionTimeoutMS=1000)
+    try:
+        client.admin.command('ping')
+    except PyMongoError as e:
+        client.close()
+        pytest.skip(f'MongoDB not available at {Config.MONGO_URI}: {e}')
+    yield client
+    client.close()
+
+
+@pytest.fixture(scope='module')
+def mongo_db(mongo_client):
+    """Empty scratch database, dropped when the module's tests finish"""
+    mongo_client.drop_database(TEST_DB)
+    yield mongo_client[TEST_DB]
+    mongo_client.drop_database(TEST_DB)
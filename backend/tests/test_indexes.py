@@ -0,0 +1,113 @@
+"""
+Index registry and query-plan checks
+Every QUERY_SHAPE must be answered from an index (no COLLSCAN) and sorted
+shapes in index order (no in-memory SORT) once ensure_indexes() has run
+"""
+
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from models.indexes import QUERY_SHAPES, check_query_plans, ensure_indexes, plan_stages
+
+
+BUILDINGS = [f'B{n}' for n in range(1, 9)]
+STATUSES = ['Pending', 'In Progress', 'Resolved']
+
+
+def seed(db, rows=400):
+    """Documents shaped like the app's, spread over buildings, tenants and dates"""
+    rng = random.Random(7)
+    start = datetime(2024, 1, 1)
+
+    db.apartments.insert_many([{
+        'room_no': 100 + n,
+        'block_no': BUILDINGS[n % len(BUILDINGS)],
+        'owner_id': f'O{n % len(BUILDINGS)}',
+        'tenant_id': f'T{100 + n}'
+    } for n in range(rows)])
+
+    db.complaints.insert_many([{
+        'complaint_id': f'C{1000 + n}',
+        'tenant_id': f'T{100 + n % 50}',
+        'room_no': 100 + n % 50,
+        'block_no': BUILDINGS[n % len(BUILDINGS)],
+        'employee_id': f'E{100 + n % 10}',
+        'complaint_status': STATUSES[n % len(STATUSES)],
+        'complaint_category': rng.choice(['Plumbing', 'Electrical', 'Cleaning']),
+        'priority': rng.choice(['Low', 'Medium', 'High']),
+        'created_at': start + timedelta(hours=n * 7)
+    } for n in range(rows)])
+
+    db.payments.insert_many([{
+        'payment_id': f'P{n}',
+        'tenant_id': f'T{100 + n % 50}',
+        'room_no': 100 + n % 50,
+        'block_no': BUILDINGS[n % len(BUILDINGS)],
+        'payment_status': rng.choice(['Paid', 'Pending', 'Overdue']),
+        'payment_amount': 1000.0,
+        'risk_score': rng.random(),
+        'payment_dt': start + timedelta(days=n),
+        'year_month': (start + timedelta(days=n)).strftime('%Y-%m')
+    } for n in range(rows)])
+
+    db.prediction_logs.insert_many([{
+        'model_type': rng.choice(['complaint_priority', 'payment_risk']),
+        'timestamp': start + timedelta(minutes=n)
+    } for n in range(rows)])
+
+    db.analytics.insert_many([{
+        '_id': f'daily:building:{building}:{day:%Y-%m-%d}',
+        'metric_type': 'complaint_daily',
+        'scope': f'building:{building}',
+        'date': day
+    } for building in BUILDINGS for day in (start + timedelta(days=n) for n in range(60))])
+
+    db.defaulters.insert_many([{
+        '_id': f'T{100 + n}',
+        'block_no': BUILDINGS[n % len(BUILDINGS)],
+        'overdue_count': n % 5,
+        'total_overdue_amount': 1000.0 * (n % 5)
+    } for n in range(rows)])
+
+
+@pytest.fixture(scope='module')
+def plans(mongo_db):
+    """check_query_plans() against a seeded database with the registry's indexes"""
+    seed(mongo_db)
+    ensure_indexes(mongo_db)
+    return {result['name']: result for result in check_query_plans(mongo_db)}
+
+
+@pytest.mark.parametrize('shape', [shape['name'] for shape in QUERY_SHAPES])
+def test_query_shape_uses_index(plans, shape):
+    result = plans[shape]
+    assert not result['collscan'], f"{shape}: COLLSCAN ({' <- '.join(result['stages'])})"
+    assert not result['blocking_sort'], f"{shape}: in-memory SORT ({' <- '.join(result['stages'])})"
+
+
+def test_ensure_indexes_is_idempotent(plans, mongo_db):
+    report = ensure_indexes(mongo_db)
+    assert {entry['action'] for entry in report} == {'exists'}
+
+
+def test_ensure_indexes_dry_run_prune_reports_undeclared(plans, mongo_db):
+    mongo_db.complaints.create_index('tenant_id', name='stray_tenant_id')
+    try:
+        report = ensure_indexes(mongo_db, prune=True, dry_run=True)
+        assert {'collection': 'complaints', 'index': 'stray_tenant_id', 'action': 'dropped'} in report
+        assert 'stray_tenant_id' in mongo_db.complaints.index_information()
+    finally:
+        mongo_db.complaints.drop_index('stray_tenant_id')
+
+
+def test_plan_stages_walks_nested_plans():
+    plan = {'queryPlan': {
+        'stage': 'FETCH',
+        'inputStage': {'stage': 'SORT_MERGE', 'inputStages': [
+            {'stage': 'IXSCAN', 'indexName': 'a_1'},
+            {'stage': 'COLLSCAN'}
+        ]}
+    }}
+    assert plan_stages(plan) == ['FETCH', 'SORT_MERGE', 'IXSCAN', 'COLLSCAN']
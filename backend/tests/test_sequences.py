@@ -0,0 +1,99 @@
+"""
+Atomic ID sequences
+Many processes and threads allocate from one counter at once; every value
+must be handed out exactly once, with no gaps
+"""
+
+import multiprocessing
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pytest
+
+import models.mongo_models as mongo_models
+from models.mongo_models import Sequence
+from models.mysql_models import User
+
+
+def allocate(name, threads, ids_per_thread):
+    """Allocate IDs from one process using several threads (single and block reservations)"""
+
+    def worker(thread_no):
+        values = []
+        for i in range(ids_per_thread):
+            if (thread_no + i) % 5 == 0:
+                first = Sequence.reserve(name, 3)
+                values.extend(range(first, first + 3))
+            else:
+                values.append(Sequence.next(name))
+        return values
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        return [v for values in pool.map(worker, range(threads)) for v in values]
+
+
+@pytest.fixture
+def counters_db(mongo_db, monkeypatch):
+    """Sequences on the scratch database (spawned workers read MONGO_DB at import)"""
+    monkeypatch.setattr(mongo_models, 'get_mongo_db', lambda: mongo_db)
+    monkeypatch.setenv('MONGO_DB', mongo_db.name)
+    return mongo_db
+
+
+def sequence_name():
+    return f'test_{uuid.uuid4().hex[:8]}'
+
+
+def test_concurrent_allocations_are_unique_and_gap_free(counters_db):
+    name = sequence_name()
+    workers, threads, ids_per_thread = 4, 8, 50
+
+    # spawn: forking a process that already holds a MongoClient isn't safe
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        futures = [pool.submit(allocate, name, threads, ids_per_thread) for _ in range(workers)]
+        values = [v for f in futures for v in f.result()]
+    values.extend(allocate(name, threads, ids_per_thread))
+
+    assert len(values) == len(set(values))
+    assert sorted(values) == list(range(1, len(values) + 1))
+
+
+def test_seed_runs_once(counters_db):
+    name = sequence_name()
+    calls = []
+
+    def seed():
+        calls.append(1)
+        return 41
+
+    assert Sequence.next(name, seed=seed) == 42
+    assert Sequence.reserve(name, 5, seed=seed) == 43
+    assert Sequence.next(name, seed=seed) == 48
+    assert len(calls) == 1
+
+
+def test_advance_never_moves_back(counters_db):
+    name = sequence_name()
+    Sequence.advance(name, 100)
+    assert Sequence.next(name) == 101
+    Sequence.advance(name, 50)
+    assert Sequence.next(name) == 102
+
+
+def test_user_ids_skip_rows_inserted_outside_the_counter(counters_db, monkeypatch):
+    # E001..E003 through the API, then E004..E010 straight into MySQL
+    taken = {f'E{n:03d}' for n in range(1, 4)}
+    monkeypatch.setattr(User, '_max_sequence_number', staticmethod(
+        lambda prefix: max(int(user_id[1:]) for user_id in taken)))
+    monkeypatch.setattr(User, 'find_existing', staticmethod(
+        lambda user_ids=(), **kwargs: {'user_id': taken & set(user_ids)}))
+    counters_db.counters.delete_one({'_id': 'user_id_E'})
+    Sequence._seeded.discard('user_id_E')
+
+    assert User.get_next_sequence_number('E') == 4
+    taken.add('E004')
+    taken.update(f'E{n:03d}' for n in range(5, 11))
+
+    assert User.get_next_sequence_number('E') == 11
+    assert User.reserve_sequence_numbers('E', 3) == 12
@@ -0,0 +1,92 @@
+"""
+In-Process Cache
+Thread-safe bounded LRU cache with per-entry TTL and hit/miss counters
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """
+    Bounded LRU cache
+    - max_entries: least recently used entries are evicted beyond this size
+    - ttl: seconds an entry stays valid (0 disables expiry)
+    """
+
+    _MISSING = object()
+
+    def __init__(self, max_entries=1024, ttl=60):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+        self._generation = 0
+
+    @property
+    def generation(self):
+        """Bumped by clear(); lets loaders skip filling with pre-clear data"""
+        return self._generation
+
+    def get(self, key, default=None):
+        """Return the cached value, or default on miss/expiry"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key, self._MISSING)
+            if entry is self._MISSING or (entry[1] and entry[1] <= now):
+                if entry is not self._MISSING:
+                    del self._data[key]
+                self._misses += 1
+                return default
+            self._data.move_to_end(key)
+            self._hits += 1
+            return entry[0]
+
+    def set(self, key, value, ttl=None, generation=None):
+        """
+        Store a value (ttl overrides the cache default)
+        If generation is given and the cache was cleared since, the value is dropped
+        """
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl else 0
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self._evictions += 1
+
+    def delete(self, key):
+        """Remove a single key"""
+        with self._lock:
+            if self._data.pop(key, self._MISSING) is not self._MISSING:
+                self._invalidations += 1
+
+    def clear(self):
+        """Remove every entry"""
+        with self._lock:
+            self._invalidations += len(self._data)
+            self._data.clear()
+            self._generation += 1
+
+    def get_stats(self):
+        """Cache statistics"""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'entries': len(self._data),
+                'max_entries': self.max_entries,
+                'ttl': self.ttl,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': round(self._hits / lookups, 3) if lookups else 0.0,
+                'evictions': self._evictions,
+                'invalidations': self._invalidations,
+            }
@@ -0,0 +1,59 @@
+"""
+Request Identity
+Current user built from the users row that the JWT user lookup loads
+(app.py) and memoized in flask.g. The row comes from the in-process user
+cache, so most requests skip MySQL, yet a deleted, deactivated or demoted
+user loses access as soon as the cache entry goes (at once on this process,
+within USER_CACHE_TTL elsewhere) instead of when the token expires
+"""
+
+from flask import g
+from flask_jwt_extended import get_current_user, get_jwt_identity
+from models.mysql_models import User
+
+
+# User fields copied into the access token at login (informational for
+# clients; authorization always reads the current users row)
+IDENTITY_CLAIMS = ('role', 'username', 'full_name', 'managed_building',
+                   'room_no', 'apartment_name', 'department')
+
+
+def build_identity_claims(user):
+    """Additional JWT claims for a user row"""
+    return {field: user.get(field) for field in IDENTITY_CLAIMS}
+
+
+def load_token_user(jwt_header, jwt_payload):
+    """
+    JWT user lookup: the active users row for the token subject
+    None (deleted or is_active = FALSE) makes @jwt_required answer 401
+    """
+    return User.find_by_id(jwt_payload['sub'])
+
+
+class RequestIdentity:
+    """Dict-like view of the authenticated user's current users row"""
+
+    def __init__(self, user_id, user):
+        self.user_id = user_id
+        self._user = user
+
+    def __getitem__(self, key):
+        if key == 'user_id':
+            return self.user_id
+        return self._user[key]
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+
+def get_current_identity():
+    """Get the request-scoped identity (requires @jwt_required)"""
+    identity = g.get('_request_identity')
+    if identity is None:
+        identity = RequestIdentity(get_jwt_identity(), get_current_user())
+        g._request_identity = identity
+    return identity
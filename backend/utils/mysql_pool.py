@@ -0,0 +1,195 @@
+"""
+MySQL Connection Pool
+Process-wide pool of MySQL connections with overflow, checkout timeout
+and health-check-on-borrow
+"""
+
+import threading
+import time
+import mysql.connector
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no pooled connection becomes available in time"""
+    pass
+
+
+class PooledConnection:
+    """
+    Thin wrapper around a mysql.connector connection
+    close() returns the connection to the pool instead of closing the socket
+    """
+
+    def __init__(self, pool, conn):
+        self._pool = pool
+        self._conn = conn
+
+    def close(self):
+        """Return the underlying connection to the pool"""
+        if self._conn is not None:
+            conn, self._conn = self._conn, None
+            self._pool._release(conn)
+
+    def __getattr__(self, name):
+        if self._conn is None:
+            raise mysql.connector.errors.OperationalError('Connection already returned to pool')
+        return getattr(self._conn, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class MySQLConnectionPool:
+    """
+    Bounded connection pool
+    - pool_size: connections kept open while idle
+    - max_overflow: extra connections opened under load and closed on return
+    - timeout: seconds to wait for a free connection before giving up
+    - pre_ping: check connection health before handing it out
+    """
+
+    def __init__(self, connect_args, pool_size=10, max_overflow=10, timeout=30, pre_ping=True):
+        self.connect_args = connect_args
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+        self.timeout = timeout
+        self.pre_ping = pre_ping
+
+        self._idle = []
+        self._lock = threading.Condition()
+        self._open = 0
+        self._checked_out = 0
+
+        # Counters for sizing the pool
+        self._stats = {
+            'checkouts': 0,
+            'connections_created': 0,
+            'connections_recycled': 0,
+            'overflow_closed': 0,
+            'timeouts': 0,
+            'total_wait_ms': 0.0,
+            'max_wait_ms': 0.0,
+        }
+
+    def _create(self):
+        conn = mysql.connector.connect(**self.connect_args)
+        with self._lock:
+            self._stats['connections_created'] += 1
+        return conn
+
+    def _is_healthy(self, conn):
+        try:
+            conn.ping(reconnect=False)
+            return True
+        except Exception:
+            return False
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def get_connection(self):
+        """Borrow a connection, waiting up to `timeout` seconds"""
+        started = time.perf_counter()
+        deadline = time.monotonic() + self.timeout
+
+        with self._lock:
+            while True:
+                if self._idle:
+                    conn = self._idle.pop()
+                    break
+                if self._open < self.pool_size + self.max_overflow:
+                    # Reserve the slot, connect outside the lock
+                    self._open += 1
+                    conn = None
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._stats['timeouts'] += 1
+                    raise PoolTimeoutError(
+                        f'No MySQL connection available within {self.timeout}s '
+                        f'(pool_size={self.pool_size}, max_overflow={self.max_overflow})'
+                    )
+                self._lock.wait(remaining)
+            self._checked_out += 1
+
+        try:
+            if conn is None:
+                conn = self._create()
+            elif self.pre_ping and not self._is_healthy(conn):
+                self._discard(conn)
+                conn = self._create()
+                with self._lock:
+                    self._stats['connections_recycled'] += 1
+        except Exception:
+            with self._lock:
+                self._open -= 1
+                self._checked_out -= 1
+                self._lock.notify()
+            raise
+
+        waited_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self._stats['checkouts'] += 1
+            self._stats['total_wait_ms'] += waited_ms
+            self._stats['max_wait_ms'] = max(self._stats['max_wait_ms'], waited_ms)
+
+        return PooledConnection(self, conn)
+
+    def _release(self, conn):
+        """Return a connection to the idle list, or close it if surplus"""
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            keep = conn.is_connected()
+        except Exception:
+            keep = False
+
+        with self._lock:
+            self._checked_out -= 1
+            if keep and len(self._idle) < self.pool_size:
+                self._idle.append(conn)
+                conn = None
+            else:
+                self._open -= 1
+                if keep:
+                    self._stats['overflow_closed'] += 1
+            self._lock.notify()
+
+        if conn is not None:
+            self._discard(conn)
+
+    def dispose(self):
+        """Close all idle connections"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+            self._open -= len(idle)
+        for conn in idle:
+            self._discard(conn)
+
+    def get_stats(self):
+        """Pool statistics for sizing and monitoring"""
+        with self._lock:
+            checkouts = self._stats['checkouts']
+            return {
+                'pool_size': self.pool_size,
+                'max_overflow': self.max_overflow,
+                'timeout': self.timeout,
+                'pre_ping': self.pre_ping,
+                'open': self._open,
+                'idle': len(self._idle),
+                'checked_out': self._checked_out,
+                'overflow': max(0, self._open - self.pool_size),
+                'checkouts': checkouts,
+                'connections_created': self._stats['connections_created'],
+                'connections_recycled': self._stats['connections_recycled'],
+                'overflow_closed': self._stats['overflow_closed'],
+                'timeouts': self._stats['timeouts'],
+                'avg_wait_ms': round(self._stats['total_wait_ms'] / checkouts, 3) if checkouts else 0.0,
+                'max_wait_ms': round(self._stats['max_wait_ms'], 3),
+            }
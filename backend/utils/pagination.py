@@ -0,0 +1,119 @@
+"""
+Keyset Pagination
+Lists are ordered by (sort field desc, _id desc) and a page continues from
+the last row of the previous one, so page 500 costs the same index seek as
+page one instead of skipping 50k documents. Cursors are opaque url-safe
+tokens carrying the sort field and the last row's (value, _id)
+"""
+
+import base64
+from datetime import datetime
+from bson import ObjectId, json_util
+from config import Config
+from utils.cache import TTLCache
+
+
+MAX_PAGE_SIZE = Config.MAX_PAGE_SIZE
+
+# Types a cursor's sort value may decode to (besides None)
+SORT_VALUE_TYPES = (int, float, str, datetime)
+
+# Totals per (collection, filter); a page refresh doesn't re-count
+_totals = TTLCache(max_entries=1024, ttl=Config.PAGE_TOTAL_TTL)
+
+
+def encode_cursor(sort_field, doc):
+    """Cursor pointing just after doc in a (sort_field desc, _id desc) listing"""
+    payload = json_util.dumps({'f': sort_field, 'v': doc.get(sort_field), 'id': doc['_id']})
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token, sort_field):
+    """(value, _id) from a cursor; ValueError if malformed or from another listing"""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        payload = json_util.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+    except (ValueError, TypeError, UnicodeDecodeError):
+        raise ValueError('Invalid cursor')
+    if not isinstance(payload, dict) or payload.get('f') != sort_field:
+        raise ValueError('Invalid cursor')
+
+    # Both values land in a query: only plain sort values, never operators
+    value, last_id = payload.get('v'), payload.get('id')
+    if not isinstance(last_id, ObjectId):
+        raise ValueError('Invalid cursor')
+    if value is not None and (isinstance(value, bool) or not isinstance(value, SORT_VALUE_TYPES)):
+        raise ValueError('Invalid cursor')
+    return value, last_id
+
+
+def keyset_filter(query, sort_field, value, last_id):
+    """
+    query narrowed to the rows after (value, last_id) in descending order
+    Rows without the sort field sort last, so they follow every dated row
+    """
+    if value is None:
+        after = {sort_field: None, '_id': {'$lt': last_id}}
+    else:
+        after = {'$or': [
+            {sort_field: {'$lt': value}},
+            {sort_field: value, '_id': {'$lt': last_id}},
+            {sort_field: None}
+        ]}
+    return {'$and': [query, after]} if query else after
+
+
+def fetch_page(collection, query, sort_field, limit, cursor=None, skip=0, projection=None):
+    """
+    One page of a (sort_field desc, _id desc) listing
+    cursor continues a previous page (skip is the legacy offset, ignored with a cursor)
+    Returns (docs, next_cursor); next_cursor is None on the last page
+    """
+    query = query or {}
+    if cursor:
+        value, last_id = decode_cursor(cursor, sort_field)
+        query = keyset_filter(query, sort_field, value, last_id)
+        skip = 0
+
+    # Inclusion projections keep the sort key: the next cursor is built from it
+    if projection and 1 in projection.values():
+        projection = {**projection, sort_field: 1}
+
+    # One extra row tells whether another page exists
+    found = collection.find(query, projection).sort([(sort_field, -1), ('_id', -1)])
+    if skip:
+        found = found.skip(skip)
+    docs = list(found.limit(limit + 1))
+
+    next_cursor = encode_cursor(sort_field, docs[limit - 1]) if len(docs) > limit else None
+    return docs[:limit], next_cursor
+
+
+def count_total(collection, query):
+    """
+    Total rows of a listing, cheap enough for every page
+    Unfiltered: collection metadata (estimated_document_count)
+    Filtered: count_documents, cached per filter for PAGE_TOTAL_TTL seconds
+    """
+    if not query:
+        return collection.estimated_document_count()
+
+    key = f'{collection.name}:{json_util.dumps(query, sort_keys=True)}'
+    total = _totals.get(key)
+    if total is None:
+        total = collection.count_documents(query)
+        _totals.set(key, total)
+    return total
+
+
+def parse_page_args(args, default_limit=100):
+    """
+    Read ?limit=&cursor=&skip= (limit clamped to 1..MAX_PAGE_SIZE)
+    Returns (limit, cursor, skip); ValueError on non-numeric values
+    """
+    try:
+        limit = min(max(int(args.get('limit', default_limit)), 1), MAX_PAGE_SIZE)
+        skip = max(int(args.get('skip', 0)), 0)
+    except ValueError:
+        raise ValueError("'limit' and 'skip' must be integers")
+    return limit, args.get('cursor') or None, skip
@@ -0,0 +1,215 @@
+"""
+Password Hasher
+Runs bcrypt on a dedicated bounded thread pool so login storms can't
+tie up every request worker, and records timing metrics per cost factor
+"""
+
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import bcrypt
+from config import Config
+
+
+class HashingQueueFull(Exception):
+    """Raised when the bcrypt queue is at capacity"""
+
+    def __init__(self, retry_after):
+        super().__init__('Password hashing queue is full')
+        self.retry_after = retry_after
+
+
+def get_hash_cost(stored_hash):
+    """Extract the bcrypt cost factor from a hash ($2b$12$... -> 12)"""
+    try:
+        return int(stored_hash.split('$')[2])
+    except (IndexError, ValueError, AttributeError):
+        return None
+
+
+def hash_password(password, rounds):
+    """bcrypt hash at the given cost (module-level so worker processes can run it)"""
+    salt = bcrypt.gensalt(rounds=rounds)
+    return bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
+
+
+class _Timing:
+    """Running count / mean / max of durations in milliseconds"""
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, ms):
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'avg_ms': round(self.total_ms / self.count, 3) if self.count else 0.0,
+            'max_ms': round(self.max_ms, 3),
+        }
+
+
+class PasswordHasher:
+    """
+    Bounded bcrypt executor
+    - max_workers: concurrent bcrypt operations
+    - queue_depth: operations allowed to wait for a worker; beyond that
+      submissions are rejected immediately with HashingQueueFull
+    """
+
+    def __init__(self, max_workers=4, queue_depth=32, retry_after=2, target_cost=12, bulk_processes=4):
+        self.max_workers = max_workers
+        self.queue_depth = queue_depth
+        self.retry_after = retry_after
+        self.target_cost = target_cost
+        self.bulk_processes = bulk_processes
+        self._process_pool = None
+        self._bulk_slot = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='bcrypt')
+        self._slots = threading.BoundedSemaphore(max_workers + queue_depth)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._rejected = 0
+        self._queue_wait = _Timing()
+        self._verify_by_cost = {}
+        self._hash_by_cost = {}
+        self._logins = {'success': _Timing(), 'failure': _Timing()}
+        self._rehashes = {'updated': 0, 'skipped': 0}
+        self._bulk = _Timing()
+
+    def submit(self, fn, *args):
+        """Queue fn on the bcrypt pool; raises HashingQueueFull when saturated"""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise HashingQueueFull(self.retry_after)
+
+        queued_at = time.perf_counter()
+
+        def run():
+            with self._lock:
+                self._queue_wait.add((time.perf_counter() - queued_at) * 1000)
+            return fn(*args)
+
+        with self._lock:
+            self._in_flight += 1
+        try:
+            future = self._executor.submit(run)
+        except Exception:
+            self._done(None)
+            raise
+        future.add_done_callback(self._done)
+        return future
+
+    def _done(self, future):
+        with self._lock:
+            self._in_flight -= 1
+        self._slots.release()
+
+    def _timed(self, timings, cost, fn, *args):
+        started = time.perf_counter()
+        result = fn(*args)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            timings.setdefault(cost, _Timing()).add(elapsed_ms)
+        return result
+
+    def submit_hash(self, password, rounds=None):
+        """Queue a hash at the given (default: target) cost; returns a Future"""
+        rounds = rounds or self.target_cost
+        return self.submit(self._timed, self._hash_by_cost, rounds, hash_password, password, rounds)
+
+    def hash(self, password):
+        """Hash a password on the bcrypt pool at the target cost"""
+        return self.submit_hash(password).result()
+
+    def hash_many(self, passwords, rounds=None):
+        """
+        Hash a batch of passwords across worker processes (bulk registration)
+        Runs outside the request-path thread pool so it can't starve logins;
+        one batch at a time, a second one raises HashingQueueFull. Workers are
+        spawned, not forked: the server process has threads running
+        """
+        rounds = rounds or self.target_cost
+        if len(passwords) <= 1 or self.bulk_processes <= 1:
+            return [self.submit_hash(password, rounds).result() for password in passwords]
+        
+        if not self._bulk_slot.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise HashingQueueFull(self.retry_after)
+        
+        try:
+            with self._lock:
+                if self._process_pool is None:
+                    self._process_pool = ProcessPoolExecutor(
+                        max_workers=self.bulk_processes,
+                        mp_context=multiprocessing.get_context('spawn')
+                    )
+                pool = self._process_pool
+            
+            started = time.perf_counter()
+            hashes = list(pool.map(hash_password, passwords, [rounds] * len(passwords),
+                                   chunksize=max(1, len(passwords) // (self.bulk_processes * 4))))
+            with self._lock:
+                self._bulk.add((time.perf_counter() - started) * 1000)
+            return hashes
+        finally:
+            self._bulk_slot.release()
+
+    def needs_rehash(self, stored_hash):
+        """True when a hash was made with a cost other than the target"""
+        cost = get_hash_cost(stored_hash)
+        return cost is not None and cost != self.target_cost
+
+    def record_rehash(self, updated):
+        """Count background rehashes (updated=False when the hash changed meanwhile)"""
+        with self._lock:
+            self._rehashes['updated' if updated else 'skipped'] += 1
+
+    def verify(self, stored_hash, password):
+        """Check a password against a bcrypt hash on the bcrypt pool"""
+
+        def work():
+            return bcrypt.checkpw(password.encode('utf-8'), stored_hash.encode('utf-8'))
+
+        cost = get_hash_cost(stored_hash)
+        return self.submit(self._timed, self._verify_by_cost, cost, work).result()
+
+    def record_login(self, duration_ms, success):
+        """Record end-to-end login handler time"""
+        with self._lock:
+            self._logins['success' if success else 'failure'].add(duration_ms)
+
+    def get_stats(self):
+        """Executor and timing statistics"""
+        with self._lock:
+            return {
+                'max_workers': self.max_workers,
+                'queue_depth': self.queue_depth,
+                'target_cost': self.target_cost,
+                'in_flight': self._in_flight,
+                'rejected': self._rejected,
+                'queue_wait': self._queue_wait.to_dict(),
+                'verify_by_cost': {str(k): v.to_dict() for k, v in self._verify_by_cost.items()},
+                'hash_by_cost': {str(k): v.to_dict() for k, v in self._hash_by_cost.items()},
+                'logins': {k: v.to_dict() for k, v in self._logins.items()},
+                'rehashes': dict(self._rehashes),
+                'bulk_batches': self._bulk.to_dict(),
+            }
+
+
+# Global instance
+password_hasher = PasswordHasher(
+    max_workers=Config.BCRYPT_MAX_WORKERS,
+    queue_depth=Config.BCRYPT_QUEUE_DEPTH,
+    retry_after=Config.BCRYPT_RETRY_AFTER,
+    target_cost=Config.BCRYPT_ROUNDS,
+    bulk_processes=Config.BCRYPT_BULK_PROCESSES
+)
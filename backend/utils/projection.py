@@ -0,0 +1,22 @@
+"""
+Field Projection
+List endpoints send a lean default projection (no embedding vectors);
+?fields=a,b narrows rows further to a whitelisted sparse fieldset, so
+MongoDB decodes, and the API encodes and sends, only what a screen shows
+"""
+
+
+def parse_fields(value, allowed):
+    """
+    Inclusion projection for a comma-separated field list
+    Returns None when value is empty (use the endpoint default)
+    Raises ValueError naming fields outside the whitelist
+    """
+    if not value:
+        return None
+
+    fields = [name.strip() for name in value.split(',') if name.strip()]
+    unknown = [name for name in fields if name not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return {name: 1 for name in fields}
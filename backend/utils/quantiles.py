@@ -0,0 +1,101 @@
+"""
+Streaming Quantiles
+P² (Jain & Chlamtac) quantile estimator: constant memory per quantile,
+one pass over the data, no sorting of the full sample
+"""
+
+import math
+
+
+class P2Quantile:
+    """Streaming estimate of a single quantile p (0 < p < 1)"""
+
+    def __init__(self, p):
+        if not 0 < p < 1:
+            raise ValueError('p must be between 0 and 1')
+        self.p = p
+        self.count = 0
+        self._heights = []
+        self._positions = [1, 2, 3, 4, 5]
+        self._desired = [1, 1 + 2 * p, 1 + 4 * p, 3 + 2 * p, 5]
+        self._increments = [0, p / 2, p, (1 + p) / 2, 1]
+
+    def add(self, x):
+        self.count += 1
+
+        # Exact until five observations are in
+        if self.count <= 5:
+            self._heights.append(x)
+            self._heights.sort()
+            return
+
+        q = self._heights
+        n = self._positions
+
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = next(i for i in range(4) if q[i] <= x < q[i + 1])
+
+        for i in range(k + 1, 5):
+            n[i] += 1
+        for i in range(5):
+            self._desired[i] += self._increments[i]
+
+        # Adjust the three middle markers
+        for i in range(1, 4):
+            d = self._desired[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                d = 1 if d > 0 else -1
+                candidate = self._parabolic(i, d)
+                if not q[i - 1] < candidate < q[i + 1]:
+                    candidate = self._linear(i, d)
+                q[i] = candidate
+                n[i] += d
+
+    def _parabolic(self, i, d):
+        q, n = self._heights, self._positions
+        return q[i] + d / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+        )
+
+    def _linear(self, i, d):
+        q, n = self._heights, self._positions
+        return q[i] + d * (q[i + d] - q[i]) / (n[i + d] - n[i])
+
+    def value(self):
+        """Current estimate (None when empty)"""
+        if self.count == 0:
+            return None
+        if self.count <= 5:
+            # Nearest-rank on the exact sample
+            rank = max(1, math.ceil(self.p * self.count))
+            return self._heights[rank - 1]
+        return self._heights[2]
+
+
+class StreamingStats:
+    """Count, mean and selected quantiles of a stream in constant memory"""
+
+    def __init__(self, quantiles=(0.5, 0.9)):
+        self.count = 0
+        self.total = 0.0
+        self._quantiles = {p: P2Quantile(p) for p in quantiles}
+
+    def add(self, x):
+        self.count += 1
+        self.total += x
+        for estimator in self._quantiles.values():
+            estimator.add(x)
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+    def quantile(self, p):
+        return self._quantiles[p].value()
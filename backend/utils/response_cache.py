@@ -0,0 +1,174 @@
+"""
+Response Cache
+Caches rendered endpoint payloads per role scope ('global', 'building:B1',
+'tenant:T1001', 'employee:E104') with a TTL. Every scope has a version number
+that writers bump; cache keys embed the versions of the scopes a response
+depends on, so a bump makes older entries unreachable without deleting them
+Backends:
+- memory: in-process LRU (default; per worker)
+- redis:  shared between workers (RESPONSE_CACHE_URL, needs the redis package)
+"""
+
+import json
+import threading
+from config import Config
+from utils.cache import TTLCache
+
+
+class MemoryBackend:
+    """In-process LRU backend; versions live in a dict"""
+
+    name = 'memory'
+
+    def __init__(self, max_entries=512, ttl=30):
+        self._cache = TTLCache(max_entries=max_entries, ttl=ttl)
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        return self._cache.get(key)
+
+    def set(self, key, value, ttl):
+        self._cache.set(key, value, ttl=ttl)
+
+    def get_versions(self, scopes):
+        with self._lock:
+            return [self._versions.get(scope, 0) for scope in scopes]
+
+    def bump(self, scopes):
+        with self._lock:
+            for scope in scopes:
+                self._versions[scope] = self._versions.get(scope, 0) + 1
+
+    def get_stats(self):
+        return self._cache.get_stats()
+
+
+class RedisBackend:
+    """
+    Shared backend for multi-worker deployments
+    client: any object with redis-py's get/set/mget/incr (e.g. a local
+    stand-in in development); created from url when omitted
+    """
+
+    name = 'redis'
+
+    def __init__(self, url=None, client=None, prefix='response_cache'):
+        if client is None:
+            import redis  # optional dependency, only needed for this backend
+            client = redis.Redis.from_url(url)
+        self._client = client
+        self._prefix = prefix
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def _key(self, kind, name):
+        return f'{self._prefix}:{kind}:{name}'
+
+    def get(self, key):
+        raw = self._client.get(self._key('entry', key))
+        with self._lock:
+            if raw is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key, value, ttl):
+        self._client.set(self._key('entry', key), json.dumps(value, default=str), ex=ttl or None)
+
+    def get_versions(self, scopes):
+        raw = self._client.mget([self._key('version', scope) for scope in scopes])
+        return [int(value) if value is not None else 0 for value in raw]
+
+    def bump(self, scopes):
+        for scope in scopes:
+            self._client.incr(self._key('version', scope))
+
+    def get_stats(self):
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': round(self._hits / lookups, 3) if lookups else 0.0,
+            }
+
+
+class ResponseCache:
+    """
+    Versioned response cache
+    Usage in a view:
+        key = response_cache.key('complaints.trends', [scope])
+        body = response_cache.get(key)
+        if body is None:
+            body = ...compute...
+            response_cache.set(key, body)
+    The key is taken before computing, so a write that lands meanwhile
+    bumps the version and the stored entry is never served
+    """
+
+    def __init__(self, backend, ttl=30, enabled=True):
+        self.backend = backend
+        self.ttl = ttl
+        self.enabled = enabled
+
+    def key(self, endpoint, scopes, params=None):
+        """Cache key for an endpoint, the scopes it reads and its query params"""
+        scopes = sorted(set(scopes))
+        versions = self.backend.get_versions(scopes)
+        parts = [endpoint] + [f'{scope}@{version}' for scope, version in zip(scopes, versions)]
+        if params:
+            parts += [f'{name}={params[name]}' for name in sorted(params)]
+        return '|'.join(parts)
+
+    def get(self, key):
+        if not self.enabled:
+            return None
+        return self.backend.get(key)
+
+    def set(self, key, value, ttl=None):
+        if self.enabled:
+            self.backend.set(key, value, self.ttl if ttl is None else ttl)
+
+    def bump(self, *scopes):
+        """Invalidate everything cached for these scopes"""
+        if scopes:
+            self.backend.bump(set(scopes))
+
+    def get_stats(self):
+        return {
+            'backend': self.backend.name,
+            'enabled': self.enabled,
+            'ttl': self.ttl,
+            **self.backend.get_stats()
+        }
+
+
+def create_backend(name, url=None, max_entries=512, ttl=30):
+    """Backend instance from a RESPONSE_CACHE_BACKEND name"""
+    if name == 'memory':
+        return MemoryBackend(max_entries=max_entries, ttl=ttl)
+    if name == 'redis':
+        return RedisBackend(url=url)
+    raise ValueError(f'Unknown response cache backend: {name}')
+
+
+def configure_response_cache(backend):
+    """Swap the backend of the global cache (e.g. a shared stand-in)"""
+    response_cache.backend = backend
+    return response_cache
+
+
+# Global instance
+response_cache = ResponseCache(
+    create_backend(
+        Config.RESPONSE_CACHE_BACKEND,
+        url=Config.RESPONSE_CACHE_URL,
+        max_entries=Config.RESPONSE_CACHE_MAX_ENTRIES,
+        ttl=Config.RESPONSE_CACHE_TTL
+    ),
+    ttl=Config.RESPONSE_CACHE_TTL,
+    enabled=Config.RESPONSE_CACHE_TTL > 0
+)
@@ -0,0 +1,50 @@
+"""
+NDJSON Streaming
+Unbounded list endpoints can answer with one JSON document per line
+(application/x-ndjson), written while the MongoDB cursor is iterated in
+batches of STREAM_BATCH_SIZE. Memory stays flat and the first row leaves
+before the last one is read, however many rows match
+Clients opt in with `Accept: application/x-ndjson` or `?stream=1`
+"""
+
+from flask import Response, current_app, request, stream_with_context
+from config import Config
+
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+STREAM_BATCH_SIZE = Config.STREAM_BATCH_SIZE
+
+
+def wants_stream():
+    """True when the current request asked for an NDJSON stream"""
+    if request.args.get('stream') in ('1', 'true'):
+        return True
+    # JSON stays the default for */* and missing Accept headers
+    return request.accept_mimetypes.best_match(['application/json', NDJSON_MIMETYPE]) == NDJSON_MIMETYPE
+
+
+def stringify_id(doc):
+    """Row with its ObjectId rendered as a string (as the JSON endpoints do)"""
+    doc['_id'] = str(doc['_id'])
+    return doc
+
+
+def ndjson_response(rows):
+    """
+    Stream an iterable of documents as NDJSON
+    rows is consumed lazily inside the request context, so a cursor passed
+    here is only queried once the response starts. Headers are sent before
+    the first row, so a failure mid-stream ends with an {"error": ...} line
+    """
+    def generate():
+        try:
+            for row in rows:
+                yield current_app.json.dumps(row) + '\n'
+        except Exception as e:
+            yield current_app.json.dumps({
+                'error': 'Stream interrupted',
+                'message': str(e)
+            }) + '\n'
+
+    return Response(stream_with_context(generate()), mimetype=NDJSON_MIMETYPE)
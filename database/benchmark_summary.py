@@ -0,0 +1,201 @@
+"""
+Summary Endpoint Benchmark
+Compares the old /apartments/summary query path (12 count_documents + revenue
+aggregation) with the endpoint's load_summary() on a generated dataset: its
+$facet fallback (counters not built yet) and its maintained-counter path,
+and checks all three return identical numbers
+
+Usage: python benchmark_summary.py [--docs 120000] [--runs 10] [--keep]
+Writes to a scratch database (apartment_management_bench), never the real one
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from pymongo import MongoClient
+
+BENCH_DB_NAME = "apartment_management_bench"
+
+# The app's models read MONGO_DB at import: point them at the scratch database
+os.environ['MONGO_DB'] = BENCH_DB_NAME
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend'))
+
+from config import Config  # noqa: E402
+from models.mongo_models import Analytics, DashboardCounters  # noqa: E402
+from models.indexes import ensure_indexes  # noqa: E402
+from routes.apartments import load_summary  # noqa: E402
+
+BUILDINGS = ['B1', 'B2', 'B3', 'B4', 'B5', 'B6', 'B7', 'B8']
+CATEGORIES = ['Electricity', 'Plumbing', 'Cleaning', 'Security', 'Maintenance', 'Other']
+COMPLAINT_STATUSES = ['Pending', 'In Progress', 'Resolved']
+PRIORITIES = ['High', 'Medium', 'Low', None]
+PAYMENT_STATUSES = ['Paid', 'Pending', 'Overdue']
+
+
+def generate_dataset(db, docs):
+    """Insert `docs` complaints and `docs` payments spread over 8 buildings"""
+    rng = random.Random(42)
+    now = datetime.now()
+
+    db.apartments.drop()
+    db.complaints.drop()
+    db.payments.drop()
+
+    apartments = []
+    for b_index, block in enumerate(BUILDINGS):
+        for n in range(60):
+            room_no = (b_index + 1) * 100 + n
+            apartments.append({'block_no': block, 'room_no': room_no,
+                               'tenant_id': f'T{room_no}', 'monthly_rent': 15000})
+    db.apartments.insert_many(apartments)
+
+    batch = []
+    for i in range(docs):
+        apt = rng.choice(apartments)
+        batch.append({
+            'complaint_id': f'C{1001 + i}',
+            'tenant_id': apt['tenant_id'],
+            'block_no': apt['block_no'],
+            'room_no': apt['room_no'],
+            'complaint_category': rng.choice(CATEGORIES),
+            'complaint_status': rng.choice(COMPLAINT_STATUSES),
+            'priority': rng.choice(PRIORITIES),
+            'employee_id': f'E{rng.randint(1, 20):03d}',
+            'created_at': now - timedelta(minutes=i)
+        })
+        if len(batch) == 10000:
+            db.complaints.insert_many(batch)
+            batch = []
+    if batch:
+        db.complaints.insert_many(batch)
+
+    batch = []
+    for i in range(docs):
+        apt = rng.choice(apartments)
+        batch.append({
+            'payment_id': f'P{i}',
+            'tenant_id': apt['tenant_id'],
+            'block_no': apt['block_no'],
+            'room_no': apt['room_no'],
+            'payment_amount': float(rng.randint(8000, 30000)),
+            'payment_status': rng.choice(PAYMENT_STATUSES),
+            'payment_date': (now - timedelta(days=i % 700)).strftime('%d-%m-%Y')
+        })
+        if len(batch) == 10000:
+            db.payments.insert_many(batch)
+            batch = []
+    if batch:
+        db.payments.insert_many(batch)
+
+    # Same indexes as the app (models/indexes.py)
+    ensure_indexes(db)
+
+
+def old_summary(db, current_user, user_id):
+    """The previous implementation: one round trip per counter"""
+    scopes = Analytics.role_scopes(current_user, user_id)
+    apartment_query = scopes['apartments']['query']
+    complaint_query = scopes['complaints']['query']
+    payment_query = scopes['payments']['query']
+
+    summary = {
+        'total_apartments': db.apartments.count_documents(apartment_query),
+        'total_complaints': db.complaints.count_documents(complaint_query),
+        'total_payments': db.payments.count_documents(payment_query),
+        'pending_complaints': db.complaints.count_documents({**complaint_query, 'complaint_status': 'Pending'}),
+        'in_progress_complaints': db.complaints.count_documents({**complaint_query, 'complaint_status': 'In Progress'}),
+        'resolved_complaints': db.complaints.count_documents({**complaint_query, 'complaint_status': 'Resolved'}),
+        'high_priority_complaints': db.complaints.count_documents({**complaint_query, 'priority': 'High'}),
+        'medium_priority_complaints': db.complaints.count_documents({**complaint_query, 'priority': 'Medium'}),
+        'low_priority_complaints': db.complaints.count_documents({**complaint_query, 'priority': 'Low'}),
+        'paid_payments': db.payments.count_documents({**payment_query, 'payment_status': 'Paid'}),
+        'pending_payments': db.payments.count_documents({**payment_query, 'payment_status': 'Pending'}),
+        'overdue_payments': db.payments.count_documents({**payment_query, 'payment_status': 'Overdue'}),
+    }
+    pipeline = [
+        {'$match': {**payment_query, 'payment_status': 'Paid'}},
+        {'$group': {'_id': None, 'total': {'$sum': '$payment_amount'}}}
+    ]
+    if current_user['role'] in ['Admin', 'Owner']:
+        revenue_result = list(db.payments.aggregate(pipeline))
+        summary['total_revenue'] = revenue_result[0]['total'] if revenue_result else 0
+    return summary
+
+
+def endpoint_summary(db, current_user, user_id):
+    """What /apartments/summary runs (routes/apartments.py load_summary)"""
+    return asyncio.run(load_summary(current_user, user_id))
+
+
+def time_runs(fn, runs, *args):
+    timings = []
+    result = None
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = fn(*args)
+        timings.append((time.perf_counter() - started) * 1000)
+    return result, timings
+
+
+def benchmark(docs, runs, keep):
+    print("=" * 60)
+    print("SUMMARY ENDPOINT BENCHMARK")
+    print("=" * 60)
+
+    client = MongoClient(Config.MONGO_URI)
+    db = client[BENCH_DB_NAME]
+
+    print(f"\n[1/3] Generating {docs} complaints and {docs} payments...")
+    generate_dataset(db, docs)
+    db.analytics.drop()
+    print("   ✓ Dataset ready")
+
+    scopes = {
+        'Admin (all)': ({'role': 'Admin'}, 'A001'),
+        'Owner (B3)': ({'role': 'Owner', 'managed_building': 'B3'}, 'O301'),
+        'Tenant (T305)': ({'role': 'Tenant'}, 'T305'),
+    }
+
+    # load_summary without counters: one $facet pass per collection
+    print(f"\n[2/3] Timing {runs} runs per scope ($facet fallback)...")
+    timings = {}
+    ok = True
+    for label, identity in scopes.items():
+        old_result, old_times = time_runs(old_summary, runs, db, *identity)
+        facet_result, facet_times = time_runs(endpoint_summary, runs, db, *identity)
+        timings[label] = (old_times, facet_times, old_result == facet_result)
+
+    # load_summary with maintained counters
+    print("\n[3/3] Building counters and timing the counter path...\n")
+    DashboardCounters.rebuild(db=db)
+    print(f"{'Scope':<16}{'old p50 ms':>12}{'facet p50 ms':>14}{'counters p50 ms':>17}{'match':>8}")
+    for label, identity in scopes.items():
+        old_result = old_summary(db, *identity)
+        counter_result, counter_times = time_runs(endpoint_summary, runs, db, *identity)
+        old_times, facet_times, facet_match = timings[label]
+        match = facet_match and old_result == counter_result
+        ok = ok and match
+        print(f"{label:<16}{statistics.median(old_times):>12.1f}{statistics.median(facet_times):>14.1f}"
+              f"{statistics.median(counter_times):>17.1f}{str(match):>8}")
+
+    if not keep:
+        client.drop_database(BENCH_DB_NAME)
+    client.close()
+
+    print("\n" + ("✅ Results identical" if ok else "❌ Results differ"))
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--docs', type=int, default=120000)
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--keep', action='store_true', help='keep the scratch database')
+    args = parser.parse_args()
+
+    sys.exit(0 if benchmark(args.docs, args.runs, args.keep) else 1)
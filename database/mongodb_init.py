@@ -3,11 +3,17 @@ MongoDB Initialization Script
 Creates collections, indexes, and imports CSV data
 """
 
-from pymongo import MongoClient, ASCENDING, DESCENDING
+from pymongo import MongoClient
 import pandas as pd
 import json
 from datetime import datetime
 import pickle
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend'))
+
+from models.indexes import ensure_indexes  # noqa: E402
 
 
 # MongoDB configuration
@@ -20,7 +26,9 @@ COLLECTIONS = {
     'complaints': 'complaints',
     'payments': 'payments',
     'prediction_logs': 'prediction_logs',
-    'analytics': 'analytics'
+    'analytics': 'analytics',
+    'counters': 'counters',
+    'defaulters': 'defaulters'
 }
 
 
@@ -47,47 +55,19 @@ def init_mongodb():
         # Create collections with indexes
         print("\n[3/6] Creating collections and indexes...")
         
-        # Apartments collection
-        apartments = db[COLLECTIONS['apartments']]
-        apartments.create_index([("block_no", ASCENDING)])
-        apartments.create_index([("room_no", ASCENDING)])
-        apartments.create_index([("owner_id", ASCENDING)])
-        apartments.create_index([("tenant_id", ASCENDING)])
-        print("   ✓ Created 'apartments' collection")
+        # Indexes come from the registry shared with the app (models/indexes.py)
+        report = ensure_indexes(db)
+        for collection_name in COLLECTIONS.values():
+            created = sum(1 for entry in report
+                          if entry['collection'] == collection_name and entry['action'] == 'created')
+            print(f"   ✓ Created '{collection_name}' collection ({created} indexes)")
         
-        # Complaints collection
+        apartments = db[COLLECTIONS['apartments']]
         complaints = db[COLLECTIONS['complaints']]
-        complaints.create_index([("complaint_id", ASCENDING)], unique=True)
-        complaints.create_index([("tenant_id", ASCENDING)])
-        complaints.create_index([("complaint_category", ASCENDING)])
-        complaints.create_index([("complaint_status", ASCENDING)])
-        complaints.create_index([("priority", ASCENDING)])
-        complaints.create_index([("created_at", DESCENDING)])
-        print("   ✓ Created 'complaints' collection")
-        
-        # Payments collection
         payments = db[COLLECTIONS['payments']]
-        payments.create_index([("payment_id", ASCENDING)], unique=True)
-        payments.create_index([("tenant_id", ASCENDING)])
-        payments.create_index([("payment_status", ASCENDING)])
-        payments.create_index([("payment_date", DESCENDING)])
-        print("   ✓ Created 'payments' collection")
-        
-        # Prediction logs collection
-        prediction_logs = db[COLLECTIONS['prediction_logs']]
-        prediction_logs.create_index([("model_type", ASCENDING)])
-        prediction_logs.create_index([("timestamp", DESCENDING)])
-        print("   ✓ Created 'prediction_logs' collection")
-        
-        # Analytics collection
-        analytics = db[COLLECTIONS['analytics']]
-        analytics.create_index([("metric_type", ASCENDING)])
-        analytics.create_index([("date", DESCENDING)])
-        print("   ✓ Created 'analytics' collection")
         
         # Import CSV data
         print("\n[4/6] Importing data from CSV...")
-        import os
         base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
         csv_path = os.path.join(base_dir, 'apartment_management_dataset_realistic_v2.csv')
         df = pd.read_csv(csv_path)
@@ -143,6 +123,11 @@ def init_mongodb():
         payment_rows = df[df['type'] == 'Payment']
         
         for _, row in payment_rows.iterrows():
+            # Typed date + month bucket for range queries (payment_date is DD-MM-YYYY)
+            try:
+                payment_dt = datetime.strptime(str(row['payment_date']), '%d-%m-%Y')
+            except ValueError:
+                payment_dt = None
             payment_doc = {
                 'payment_id': row['payment_id'],
                 'tenant_id': row['tenant_id'],
@@ -152,6 +137,8 @@ def init_mongodb():
                 'room_no': row['room_no'],
                 'payment_amount': float(row['payment_amount']),
                 'payment_date': row['payment_date'],
+                'payment_dt': payment_dt,
+                'year_month': payment_dt.strftime('%Y-%m') if payment_dt else None,
                 'payment_status': row['payment_status'],
                 'monthly_rent': float(row['monthly_rent']),
                 'delay_risk': None,
@@ -171,6 +158,7 @@ def init_mongodb():
         print(f"\nDatabase: {DB_NAME}")
         print(f"Collections created: {len(COLLECTIONS)}")
         print(f"Total documents: {apartments.count_documents({}) + complaints.count_documents({}) + payments.count_documents({})}")
+        print("\nNext: build the dashboard counters and defaulter tallies with `flask --app app rebuild-counters` (from backend/)")
         
         # Close connection
         client.close()
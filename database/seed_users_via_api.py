@@ -1,6 +1,8 @@
 """
 Seed users via Backend API
-Bypasses direct MySQL connection issues by using the public /register endpoint
+Bypasses direct MySQL connection issues by using the /register/bulk endpoint
+(Admin token), or the public /register endpoint one user at a time when no
+Admin can log in yet (fresh database)
 """
 
 import requests
@@ -8,7 +10,113 @@ import json
 import os
 import time
 
-API_URL = "http://localhost:5000/api/auth/register"
+API_URL = "http://localhost:5000/api/auth/register/bulk"
+REGISTER_URL = "http://localhost:5000/api/auth/register"
+
+
+def build_payload(user):
+    """Registration payload for one seed user"""
+    payload = {
+        "username": user['username'],
+        "email": user['email'],
+        "password": "Password@123", 
+        "full_name": user['full_name'],
+        "role": user['role']
+    }
+    
+    # Add role-specific fields
+    if user['role'] == 'Owner':
+        payload["apartment_name"] = "Office"
+        payload["apartment_no"] = "OFF"
+        if user.get('managed_building'):
+            payload["managed_building"] = user['managed_building']
+    elif user['role'] == 'Tenant':
+        payload["room_no"] = user['room_no']
+        payload["apartment_name"] = user['apartment_name']
+    elif user['role'] == 'Employee':
+        payload["department"] = user['department']
+    
+    return payload
+
+
+def register_bulk(payloads, headers):
+    """POST a batch to the bulk endpoint; returns per-row results"""
+    response = requests.post(API_URL, json={"users": payloads}, headers=headers)
+    if response.status_code not in [200, 201, 400]:
+        print(f" [X] Bulk registration failed: {response.text}")
+        return None
+    return response.json().get('results', [])
+
+
+def register_all_bulk(users, admin_token):
+    """Register everyone in one request; existing accounts are deleted and re-registered"""
+    success_count = skip_count = fail_count = 0
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    
+    # Register everyone in one request
+    results = register_bulk([build_payload(user) for user in users], headers)
+    if results is None:
+        return success_count, skip_count, len(users)
+    
+    conflicts = []
+    for user, result in zip(users, results):
+        if result['status'] == 'created':
+            print(f" [✓] Registered: {user['username']}")
+            success_count += 1
+        elif result['status'] == 'conflict':
+            conflicts.append(user)
+        else:
+            print(f" [X] Failed: {user['username']} - {result.get('message')}")
+            fail_count += 1
+    
+    # Delete existing accounts and re-register them in a second batch
+    retry = []
+    for user in conflicts:
+        del_resp = None
+        if user.get('user_id'):
+            del_url = f"http://localhost:5000/api/auth/users/{user['user_id']}"
+            del_resp = requests.delete(del_url, headers=headers)
+        
+        if del_resp is not None and del_resp.status_code in [200, 204]:
+            print(f" [R] Re-registering: {user['username']} (Deleted old)")
+            retry.append(user)
+        else:
+            print(f" [-] Skipped: {user['username']} (Exists & Delete failed)")
+            skip_count += 1
+    
+    if retry:
+        results = register_bulk([build_payload(user) for user in retry], headers) or []
+        for user, result in zip(retry, results):
+            if result['status'] == 'created':
+                success_count += 1
+            else:
+                print(f" [X] Failed retry: {user['username']} - {result.get('message')}")
+                fail_count += 1
+    
+    return success_count, skip_count, fail_count
+
+
+def register_one_by_one(users):
+    """Fallback without an Admin token: public /register per user, existing users skipped"""
+    success_count = skip_count = fail_count = 0
+    
+    for i, user in enumerate(users):
+        response = requests.post(REGISTER_URL, json=build_payload(user))
+        
+        if response.status_code in [200, 201]:
+            print(f" [✓] Registered: {user['username']}")
+            success_count += 1
+        elif response.status_code == 409:
+            print(f" [-] Skipped: {user['username']} (Exists)")
+            skip_count += 1
+        else:
+            print(f" [X] Failed: {user['username']} - {response.text}")
+            fail_count += 1
+        
+        if i % 10 == 0: time.sleep(0.1)
+    
+    return success_count, skip_count, fail_count
+
 
 def seed_via_api():
     print("=" * 60)
@@ -30,7 +138,7 @@ def seed_via_api():
     skip_count = 0
     fail_count = 0
     
-    # Login as Admin to enable deletions
+    # Login as Admin (required for bulk registration and deletions)
     admin_token = None
     try:
         login_resp = requests.post("http://localhost:5000/api/auth/login", json={
@@ -41,75 +149,22 @@ def seed_via_api():
             admin_token = login_resp.json().get('access_token')
             print(" [✓] Admin authentication successful")
         else:
-            print(" [!] Admin login failed. Cannot delete existing users.")
+            print(" [!] Admin login failed. Existing users can't be replaced.")
     except:
         print(" [!] Admin login error")
 
-    for i, user in enumerate(users):
-        # Prepare payload
-        payload = {
-            "username": user['username'],
-            "email": user['email'],
-            "password": "Password@123", 
-            "full_name": user['full_name'],
-            "role": user['role']
-        }
-        
-        # Add role-specific fields
-        if user['role'] == 'Owner':
-            payload["apartment_name"] = "Office"
-            payload["apartment_no"] = "OFF"
-            if user.get('managed_building'):
-                payload["managed_building"] = user['managed_building']
-        elif user['role'] == 'Tenant':
-            payload["room_no"] = user['room_no']
-            payload["apartment_name"] = user['apartment_name']
-        elif user['role'] == 'Employee':
-            payload["department"] = user['department']
-
-        try:
-            # Attempt Register
-            response = requests.post(API_URL, json=payload)
-            
-            if response.status_code in [200, 201]:
-                print(f" [✓] Registered: {user['username']}")
-                success_count += 1
-                
-            elif response.status_code == 409: # Conflict
-                # Try to delete and re-register if we have admin token
-                if admin_token and user['user_id']:
-                    del_url = f"http://localhost:5000/api/auth/users/{user['user_id']}"
-                    del_headers = {"Authorization": f"Bearer {admin_token}"}
-                    
-                    # Delete
-                    del_resp = requests.delete(del_url, headers=del_headers)
-                    
-                    if del_resp.status_code in [200, 204]:
-                        print(f" [R] Re-registering: {user['username']} (Deleted old)")
-                        # Retry Register
-                        retry_resp = requests.post(API_URL, json=payload)
-                        if retry_resp.status_code in [200, 201]:
-                            success_count += 1
-                        else:
-                            print(f" [X] Failed retry: {retry_resp.text}")
-                            fail_count += 1
-                    else:
-                        print(f" [-] Skipped: {user['username']} (Exists & Delete failed)")
-                        skip_count += 1
-                else:
-                    print(f" [-] Skipped: {user['username']} (Exists)")
-                    skip_count += 1
-            else:
-                print(f" [X] Failed: {user['username']} - {response.text}")
-                fail_count += 1
-                
-        except requests.exceptions.ConnectionError:
-            return
-        except Exception as e:
-            print(f" [X] Error: {e}")
-            fail_count += 1
-            
-        if i % 10 == 0: time.sleep(0.1)
+    try:
+        if admin_token:
+            success_count, skip_count, fail_count = register_all_bulk(users, admin_token)
+        else:
+            print(" [!] No Admin token: registering users one by one")
+            success_count, skip_count, fail_count = register_one_by_one(users)
+    
+    except requests.exceptions.ConnectionError:
+        return
+    except Exception as e:
+        print(f" [X] Error: {e}")
+        fail_count += 1
 
     print("\n" + "=" * 60)
     print(f"SEEDING COMPLETE")
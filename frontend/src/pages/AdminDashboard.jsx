@@ -8,7 +8,7 @@ import PaymentTrendChart from '../components/PaymentTrendChart';
 import BuildingStats from '../components/BuildingStats';
 import UserManagement from '../components/UserManagement';
 import AnalyticsDashboard from '../components/AnalyticsDashboard';
-import { getApartmentSummary, getComplaints, getPaymentRiskAlerts, batchPredictComplaints, getEmployees, updateComplaint } from '../utils/api';
+import { getDashboard, batchPredictComplaints, updateComplaint } from '../utils/api';
 
 const AdminDashboard = () => {
     const [activeTab, setActiveTab] = useState('overview');
@@ -24,17 +24,13 @@ const AdminDashboard = () => {
 
     const fetchData = async () => {
         try {
-            const [summaryRes, complaintsRes, riskRes, empRes] = await Promise.all([
-                getApartmentSummary(),
-                getComplaints({ limit: 10 }),
-                getPaymentRiskAlerts(0.5),
-                getEmployees()
-            ]);
-
-            setSummary(summaryRes.data);
-            setComplaints(complaintsRes.data.complaints);
-            setRiskAlerts(riskRes.data.at_risk_payments);
-            setEmployees(empRes.data.employees);
+            const { data } = await getDashboard(['summary', 'recent_complaints', 'risk_alerts', 'employees']);
+            const { sections } = data;
+
+            setSummary(sections.summary);
+            setComplaints(sections.recent_complaints?.complaints || []);
+            setRiskAlerts(sections.risk_alerts?.at_risk_payments || []);
+            setEmployees(sections.employees?.employees || []);
         } catch (error) {
             console.error('Error fetching data:', error);
         } finally {
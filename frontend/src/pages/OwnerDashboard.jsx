@@ -4,7 +4,7 @@ import Navbar from '../components/Navbar';
 import SummaryCard from '../components/SummaryCard';
 import PriorityTag from '../components/PriorityTag';
 import PaymentTrendChart from '../components/PaymentTrendChart';
-import { getApartmentSummary, getComplaints, getPayments, getEmployees, updateComplaint } from '../utils/api';
+import { getDashboard, updateComplaint } from '../utils/api';
 
 const OwnerDashboard = () => {
     const [summary, setSummary] = useState(null);
@@ -23,17 +23,13 @@ const OwnerDashboard = () => {
 
     const fetchData = async () => {
         try {
-            const [summaryRes, complaintsRes, paymentsRes, employeesRes] = await Promise.all([
-                getApartmentSummary(),
-                getComplaints({ limit: 10 }),
-                getPayments({ limit: 10 }),
-                getEmployees()
-            ]);
+            const { data } = await getDashboard(['summary', 'recent_complaints', 'recent_payments', 'employees']);
+            const { sections } = data;
 
-            setSummary(summaryRes.data);
-            setComplaints(complaintsRes.data.complaints);
-            setPayments(paymentsRes.data.payments);
-            setEmployees(employeesRes.data.employees);
+            setSummary(sections.summary);
+            setComplaints(sections.recent_complaints?.complaints || []);
+            setPayments(sections.recent_payments?.payments || []);
+            setEmployees(sections.employees?.employees || []);
         } catch (error) {
             console.error('Error fetching data:', error);
         } finally {
@@ -3,7 +3,7 @@ import { FaHome, FaExclamationCircle, FaDollarSign, FaPlus } from 'react-icons/f
 import Navbar from '../components/Navbar';
 import SummaryCard from '../components/SummaryCard';
 import PriorityTag from '../components/PriorityTag';
-import { getApartmentSummary, getComplaints, getPayments, createComplaint } from '../utils/api';
+import { getDashboard, createComplaint } from '../utils/api';
 import { getUserInfo } from '../utils/auth';
 
 const TenantDashboard = () => {
@@ -30,15 +30,12 @@ const TenantDashboard = () => {
 
     const fetchData = async () => {
         try {
-            const [summaryRes, complaintsRes, paymentsRes] = await Promise.all([
-                getApartmentSummary(),
-                getComplaints({ limit: 20 }),
-                getPayments({ limit: 10 })
-            ]);
-
-            setSummary(summaryRes.data);
-            setComplaints(complaintsRes.data.complaints);
-            setPayments(paymentsRes.data.payments);
+            const { data } = await getDashboard(['summary', 'recent_complaints', 'recent_payments']);
+            const { sections } = data;
+
+            setSummary(sections.summary);
+            setComplaints(sections.recent_complaints?.complaints || []);
+            setPayments(sections.recent_payments?.payments || []);
         } catch (error) {
             console.error('Error fetching data:', error);
         } finally {
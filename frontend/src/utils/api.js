@@ -86,4 +86,8 @@ export const getBuildingsSummary = () => api.get('/apartments/buildings/summary'
 export const getEmployeePerformance = () => api.get('/analytics/employee-performance');
 export const getPaymentAnalytics = () => api.get('/analytics/payment-analytics');
 
+// Composite dashboard: the role's sections in one request (sections: optional list)
+export const getDashboard = (sections) =>
+    api.get('/dashboard', { params: sections ? { sections: sections.join(',') } : {} });
+
 export default api;